@@ -0,0 +1,98 @@
+"""
+API Call Budget
+Azure DevOps throttles a PAT by how many calls and how much data it uses, and
+that usage changes silently whenever the fetch logic changes. Every request
+is already counted per project and endpoint family in the run profile
+(run_profile.project_usage); this module checks those counts against a
+per-project budget and fails the run (or the benchmark) when one is exceeded:
+
+    API_BUDGET_CALLS_PER_PROJECT=12          # all families together
+    API_BUDGET_BYTES_PER_PROJECT=5000000
+    API_BUDGET_FAMILY_CALLS=wiql=3,teams=3   # per endpoint family
+    API_BUDGET_ENFORCE=false                 # report violations, don't fail
+
+A limit of 0 (the default) is not checked.
+"""
+
+from config import Config
+from report_log import get_logger
+from run_profile import UNATTRIBUTED
+
+log = get_logger(__name__)
+
+
+def parse_family_limits(text):
+    """"wiql=3,workitems=10" → {'wiql': 3, 'workitems': 10}"""
+    limits = {}
+    for part in filter(None, (p.strip() for p in (text or '').split(','))):
+        family, _, limit = part.partition('=')
+        try:
+            limits[family.strip()] = int(limit)
+        except ValueError:
+            raise ValueError(f"API_BUDGET_FAMILY_CALLS: expected FAMILY=CALLS, got {part!r}")
+    return limits
+
+
+def merge_usage(*usages):
+    """Sum several project_usage() dicts (e.g. coordinator + sharded workers)"""
+    merged = {}
+    for usage in usages:
+        for project, stats in (usage or {}).items():
+            total = merged.setdefault(project, {'count': 0, 'bytes': 0, 'families': {}})
+            total['count'] += stats['count']
+            total['bytes'] += stats['bytes']
+            for family, count in stats['families'].items():
+                total['families'][family] = total['families'].get(family, 0) + count
+    return merged
+
+
+def check_api_budget(usage, calls=None, nbytes=None, family_calls=None):
+    """Budget violations in usage, as readable strings (empty when within budget).
+
+    Limits default to the API_BUDGET_* settings.
+    """
+    calls = Config.API_BUDGET_CALLS_PER_PROJECT if calls is None else calls
+    nbytes = Config.API_BUDGET_BYTES_PER_PROJECT if nbytes is None else nbytes
+    family_calls = parse_family_limits(Config.API_BUDGET_FAMILY_CALLS) if family_calls is None else family_calls
+
+    violations = []
+    for project, stats in sorted(usage.items()):
+        if project == UNATTRIBUTED:
+            continue
+        if calls and stats['count'] > calls:
+            violations.append(f"{project}: {stats['count']} calls (budget {calls})")
+        if nbytes and stats['bytes'] > nbytes:
+            violations.append(f"{project}: {stats['bytes']:,} bytes (budget {nbytes:,})")
+        for family, limit in family_calls.items():
+            count = stats['families'].get(family, 0)
+            if limit and count > limit:
+                violations.append(f"{project}: {count} {family} calls (budget {limit})")
+    return violations
+
+
+def format_usage(usage):
+    """One line per project: calls by family and bytes"""
+    lines = []
+    for project, stats in sorted(usage.items()):
+        families = ', '.join(f"{family} {count}" for family, count in sorted(stats['families'].items()))
+        lines.append(f"   {project}: {stats['count']} calls ({families}), {stats['bytes']:,} bytes")
+    return lines
+
+
+def enforce_api_budget(usage):
+    """Log the per-project API usage and any budget violations.
+
+    Returns False when the budget is exceeded and API_BUDGET_ENFORCE is on.
+    """
+    total = sum(stats['count'] for stats in usage.values())
+    log.info(f"\n📞 Azure DevOps API usage: {total} calls")
+    for line in format_usage(usage):
+        log.info(line)
+    violations = check_api_budget(usage)
+    if not violations:
+        return True
+    level = log.error if Config.API_BUDGET_ENFORCE else log.warning
+    level(f"{'❌' if Config.API_BUDGET_ENFORCE else '⚠️'} API call budget exceeded:")
+    for violation in violations:
+        level(f"   {violation}")
+    return not Config.API_BUDGET_ENFORCE
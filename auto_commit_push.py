@@ -9,24 +9,27 @@ import subprocess
 import os
 import sys
 from datetime import datetime
+from report_log import flush_logs, get_logger
+
+log = get_logger(__name__)
 
 def run_command(command, description):
     """Run a shell command and return success status"""
-    print(f"🔄 {description}...")
+    log.info(f"🔄 {description}...")
     try:
         result = subprocess.run(command, shell=True, capture_output=True, text=True)
         if result.returncode == 0:
-            print(f"✅ {description} successful")
+            log.info(f"✅ {description} successful")
             if result.stdout.strip():
-                print(f"   Output: {result.stdout.strip()}")
+                log.info(f"   Output: {result.stdout.strip()}")
             return True
         else:
-            print(f"❌ {description} failed")
+            log.error(f"❌ {description} failed")
             if result.stderr.strip():
-                print(f"   Error: {result.stderr.strip()}")
+                log.error(f"   Error: {result.stderr.strip()}")
             return False
     except Exception as e:
-        print(f"❌ {description} failed with exception: {str(e)}")
+        log.error(f"❌ {description} failed with exception: {str(e)}")
         return False
 
 def get_git_status():
@@ -94,18 +97,18 @@ def should_commit_file(file_path):
 
 def auto_commit_push():
     """Automatically commit and push changes"""
-    print("🚀 Auto Commit and Push Script")
-    print("=" * 40)
+    log.info("🚀 Auto Commit and Push Script")
+    log.info("=" * 40)
     
     # Check if we're in a git repository
     if not os.path.exists('.git'):
-        print("❌ Not in a git repository")
+        log.error("❌ Not in a git repository")
         return False
     
     # Get current git status
     status = get_git_status()
     if not status:
-        print("✅ No changes to commit")
+        log.info("✅ No changes to commit")
         return True
     
     # Filter files to commit
@@ -121,17 +124,17 @@ def auto_commit_push():
                 files_to_ignore.append(file_path)
     
     if files_to_ignore:
-        print(f"📝 Ignoring generated/temporary files:")
+        log.info(f"📝 Ignoring generated/temporary files:")
         for file_path in files_to_ignore:
-            print(f"   ❌ {file_path}")
+            log.info(f"   ❌ {file_path}")
     
     if not files_to_commit:
-        print("✅ No essential files to commit")
+        log.info("✅ No essential files to commit")
         return True
     
-    print(f"📝 Essential files to commit:")
+    log.info(f"📝 Essential files to commit:")
     for file_path in files_to_commit:
-        print(f"   ✅ {file_path}")
+        log.info(f"   ✅ {file_path}")
     
     # Get current timestamp
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -150,15 +153,16 @@ def auto_commit_push():
     if not run_command("git push origin main", "Pushing to remote"):
         return False
     
-    print(f"\n🎉 Auto commit and push completed successfully!")
-    print(f"📅 Timestamp: {timestamp}")
-    print(f"📁 Files committed: {len(files_to_commit)}")
-    print(f"🚫 Files ignored: {len(files_to_ignore)}")
+    log.info(f"\n🎉 Auto commit and push completed successfully!")
+    log.info(f"📅 Timestamp: {timestamp}")
+    log.info(f"📁 Files committed: {len(files_to_commit)}")
+    log.info(f"🚫 Files ignored: {len(files_to_ignore)}")
     return True
 
 def main():
     """Main function"""
     success = auto_commit_push()
+    flush_logs()
     sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
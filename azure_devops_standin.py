@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Azure DevOps Stand-in Server
+A local HTTP server answering the Azure DevOps REST calls made by
+get_sprint_count.py, backed by a deterministic synthetic dataset
+(synthetic_dataset.py). Use it to exercise concurrency, retries and
+throttling without the real service:
+
+    python3 azure_devops_standin.py --port 8089 --latency-ms 80 --throttle-rate 0.05
+    AZURE_DEVOPS_BASE_URL=http://localhost:8089 python3 get_sprint_count.py
+
+Endpoints (any organization / project; configured ones use their team
+names, iteration paths and sprint cadences from organizations.json):
+    GET  /{org}/_apis/projects/{project}/teams                   (core-teams)
+    GET  /{org}/{project}/_apis/teams                            (project-teams)
+    GET  /{org}/{project}/_apis/core/teams                       (legacy-teams)
+    GET  /{org}/{project}/{team}/_apis/work/teamsettings/iterations
+    POST /{org}/{project}/_apis/wit/wiql
+    GET  /{org}/{project}/_apis/wit/workitems?ids=...
+    GET  /_standin/stats                                         request counters (JSON)
+
+Fault injection:
+- latency: --latency-ms plus up to --jitter-ms per request
+- errors: --error-rate fraction answered 500 or 503
+- throttling: --throttle-rate fraction answered 429 with Retry-After, and
+  --rate-limit requests/second across the server, above which callers get
+  429 with the wait until the next free slot
+- caps: WIQL results above --wiql-cap and work item batches above
+  --workitems-cap are rejected with 400, like the real service
+- --break ROUTE[,ROUTE] answers a route with 404 (e.g. core-teams to force
+  the teams fallbacks)
+- outages: --down-orgs ORG[,ORG] answers every call for those organizations
+  with 503, and --hang-orgs ORG[,ORG] holds them for --hang-seconds before
+  answering (to exercise client timeouts and circuit breakers)
+
+Every request needs an "Authorization: Basic ..." header (any PAT works).
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+from synthetic_dataset import engineer_names, generate_work_items
+
+ROUTES = [
+    ('core-teams', 'GET', re.compile(r'^/(?P<org>[^/]+)/_apis/projects/(?P<project>[^/]+)/teams$')),
+    ('legacy-teams', 'GET', re.compile(r'^/(?P<org>[^/]+)/(?P<project>[^/]+)/_apis/core/teams$')),
+    ('project-teams', 'GET', re.compile(r'^/(?P<org>[^/]+)/(?P<project>[^/]+)/_apis/teams$')),
+    ('iterations', 'GET', re.compile(
+        r'^/(?P<org>[^/]+)/(?P<project>[^/]+)/(?P<team>[^/]+)/_apis/work/teamsettings/iterations$')),
+    ('wiql', 'POST', re.compile(r'^/(?P<org>[^/]+)/(?P<project>[^/]+)/_apis/wit/wiql$')),
+    ('workitems', 'GET', re.compile(r'^/(?P<org>[^/]+)/(?P<project>[^/]+)/_apis/wit/workitems$')),
+]
+
+
+def _configured_projects():
+    """{(org name, project key): project config} from the organization config, if it loads"""
+    try:
+        from config import Config
+        return dict(Config.get_org_config().projects_by_org)
+    except ValueError as e:
+        print(f"⚠️ Organization config not loaded, serving generic projects: {e}")
+        return {}
+
+
+def _iso(moment):
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def build_project(org, project, project_config=None, items=300, engineers=12, seed=0, today=None):
+    """Synthetic teams, iterations and work items for one project.
+
+    The same (org, project, seed) always produces the same data.
+    """
+    project_config = project_config or {}
+    rng = random.Random(zlib.crc32(f"{seed}/{org}/{project}".encode()))
+    now = datetime.combine(today, datetime.now().time()) if today else datetime.now()
+    today = now.date()
+
+    team_name = project_config.get('team_name') or f"{project} Team"
+    teams = [{'id': f"{zlib.crc32(f'{org}/{project}/{name}'.encode()):08x}-team", 'name': name,
+              'description': f"Synthetic team for {project}"}
+             for name in (team_name, f"{project} Platform")]
+
+    cadence = project_config.get('fallback_cadence') or {
+        'anchor_start': '2024-01-01', 'anchor_number': 1, 'duration_weeks': 2, 'name_prefix': 'Sprint '}
+    duration = timedelta(weeks=cadence['duration_weeks'])
+    anchor = datetime.strptime(cadence['anchor_start'], '%Y-%m-%d').date()
+    current_number = cadence['anchor_number'] + (today - anchor).days // duration.days
+    # Configured paths look like "IOL_X\\Charlie Backend Team Backlog\\Iteration-29"
+    configured_path = project_config.get('iteration_path')
+    path_root = configured_path.rsplit('\\', 1)[0] if configured_path and '\\' in configured_path else project
+    iterations = []
+    for number in range(current_number - 6, current_number + 3):
+        start = anchor + (number - cadence['anchor_number']) * duration
+        name = f"{cadence.get('name_prefix', 'Sprint ')}{number}"
+        iterations.append({
+            'id': f"{zlib.crc32(f'{org}/{project}/{name}'.encode()):08x}-iteration",
+            'name': name,
+            'path': f"{path_root}\\{name}",
+            'attributes': {
+                'startDate': f"{start.isoformat()}T00:00:00Z",
+                'finishDate': f"{(start + duration - timedelta(days=1)).isoformat()}T00:00:00Z",
+                'timeFrame': 'current' if number == current_number else ('past' if number < current_number else 'future'),
+            },
+        })
+
+    # Most items sit in the current sprint, the rest in recent past ones
+    current = iterations[6]
+    past = iterations[:6]
+    by_path = {iteration['path']: iteration for iteration in iterations}
+
+    def pick_iteration(rng):
+        iteration = current if rng.random() < 0.6 else rng.choice(past)
+        return iteration['path']
+
+    work_items = generate_work_items(rng, project, items, engineer_names(engineers), iteration_path=pick_iteration,
+                                     start_id=1000 + zlib.crc32(f"{org}/{project}".encode()) % 900 * 1000)
+    for item in work_items:
+        # Move each item's last change into its sprint; nothing changes in the future
+        iteration = by_path[item['fields']['System.IterationPath']]
+        start = datetime.fromisoformat(iteration['attributes']['startDate'][:10])
+        changed = min(start + timedelta(seconds=rng.randrange(int(duration.total_seconds()))), now)
+        item['fields']['System.ChangedDate'] = _iso(changed)
+    work_items = {item['id']: item for item in work_items}
+    return {'teams': teams, 'iterations': iterations, 'work_items': work_items}
+
+
+def _matches_date(value, operator, bound):
+    """WIQL date comparison: day precision for 'YYYY-MM-DD' bounds, exact otherwise"""
+    if 'T' not in bound:
+        value = value[:10]
+    return value >= bound if operator == '>=' else value <= bound
+
+
+def run_wiql(query, work_items):
+    """Ids of work items matching the WIQL filters the extractor uses"""
+    exact = re.search(r"\[System\.IterationPath\] = '([^']*)'", query)
+    under = re.search(r"\[System\.IterationPath\] UNDER '([^']*)'", query)
+    dates = re.findall(r"\[System\.ChangedDate\] (>=|<=) '([^']*)'", query)
+    tags = re.findall(r"\[System\.Tags\] CONTAINS WORDS '([^']*)'", query)
+    ids = []
+    for item_id, item in work_items.items():
+        fields = item['fields']
+        path = fields['System.IterationPath']
+        if exact and path != exact.group(1):
+            continue
+        if under and not (path == under.group(1) or path.startswith(under.group(1) + '\\')):
+            continue
+        if not all(_matches_date(fields['System.ChangedDate'], op, bound.rstrip('Z')) for op, bound in dates):
+            continue
+        if tags and not any(tag in fields['System.Tags'].split('; ') for tag in tags):
+            continue
+        ids.append(item_id)
+    return ids
+
+
+class StandinState:
+    """Dataset, fault settings and counters shared by the request handlers"""
+
+    def __init__(self, args):
+        self.args = args
+        self.broken = set(filter(None, (args.broken or '').split(',')))
+        self.down_orgs = set(filter(None, (args.down_orgs or '').split(',')))
+        self.hang_orgs = set(filter(None, (args.hang_orgs or '').split(',')))
+        self.configured = _configured_projects()
+        self.projects = {}
+        self.lock = threading.Lock()
+        self.rng = random.Random(args.fault_seed)
+        self.next_slot = 0.0
+        self.counts = {}
+
+    def project(self, org, project):
+        key = (org, project)
+        with self.lock:
+            if key not in self.projects:
+                self.projects[key] = build_project(org, project, self.configured.get(key), self.args.items,
+                                                   self.args.engineers, self.args.seed)
+            return self.projects[key]
+
+    def count(self, route, status):
+        with self.lock:
+            stats = self.counts.setdefault(route, {})
+            stats[str(status)] = stats.get(str(status), 0) + 1
+
+    def fault(self):
+        """(status, Retry-After seconds or None) to inject instead of answering, or None"""
+        with self.lock:
+            roll = self.rng.random()
+            if self.args.rate_limit:
+                now = time.monotonic()
+                if self.next_slot > now + 1:
+                    # Over the limit: more than a second of requests already admitted
+                    return 429, max(1, round(self.next_slot - now - 1))
+                self.next_slot = max(self.next_slot, now) + 1 / self.args.rate_limit
+            if roll < self.args.throttle_rate:
+                return 429, self.args.retry_after
+            if roll < self.args.throttle_rate + self.args.error_rate:
+                return self.rng.choice((500, 503)), None
+            return None
+
+    def delay(self):
+        with self.lock:
+            jitter = self.rng.uniform(0, self.args.jitter_ms)
+        return (self.args.latency_ms + jitter) / 1000
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    server_version = 'AzureDevOpsStandin/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.state.args.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, route, status, body, retry_after=None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        if retry_after is not None:
+            self.send_header('Retry-After', str(retry_after))
+        self.end_headers()
+        self.wfile.write(payload)
+        self.server.state.count(route, status)
+
+    def _error(self, route, status, message, retry_after=None):
+        self._send(route, status, {'$id': '1', 'message': message, 'typeKey': 'StandinError'}, retry_after)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        state = self.server.state
+        url = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if url.path == '/_standin/stats':
+            return self._send('stats', 200, {'requests': state.counts})
+
+        for route, route_method, pattern in ROUTES:
+            match = pattern.match(url.path)
+            if match and route_method == method:
+                break
+        else:
+            return self._error('unknown', 404, f"No stand-in route for {method} {url.path}")
+
+        time.sleep(state.delay())
+        if not self.headers.get('Authorization', '').startswith('Basic '):
+            return self._error(route, 401, 'Missing Basic authorization header')
+        if route in state.broken:
+            return self._error(route, 404, f"{route} disabled on this stand-in (--break)")
+        org = unquote(match.group('org'))
+        if org in state.hang_orgs:
+            time.sleep(state.args.hang_seconds)
+        if org in state.down_orgs:
+            return self._error(route, 503, f"Organization {org} unavailable (--down-orgs)")
+        fault = state.fault()
+        if fault:
+            status, retry_after = fault
+            message = 'Request was blocked due to exceeding usage of resource' if status == 429 else 'Injected server error'
+            return self._error(route, status, message, retry_after)
+
+        params = {key: unquote(value) for key, value in match.groupdict().items()}
+        data = state.project(params['org'], params['project'])
+        handler = getattr(self, f"_{route.replace('-', '_')}", self._teams)
+        return handler(route, data, params, parse_qs(url.query), body)
+
+    def _teams(self, route, data, params, query, body):
+        self._send(route, 200, {'value': data['teams'], 'count': len(data['teams'])})
+
+    def _iterations(self, route, data, params, query, body):
+        if params['team'] not in {team['id'] for team in data['teams']} | {team['name'] for team in data['teams']}:
+            return self._error(route, 404, f"Team {params['team']} does not exist")
+        self._send(route, 200, {'value': data['iterations'], 'count': len(data['iterations'])})
+
+    def _wiql(self, route, data, params, query, body):
+        try:
+            wiql = json.loads(body or b'{}').get('query', '')
+        except ValueError:
+            return self._error(route, 400, 'Request body is not valid JSON')
+        exact = re.search(r"\[System\.IterationPath\] = '([^']*)'", wiql)
+        if exact and not any(it['path'] == exact.group(1) for it in data['iterations']):
+            return self._error(route, 400, f"TF51011: The specified iteration path does not exist. '{exact.group(1)}'")
+        ids = run_wiql(wiql, data['work_items'])
+        cap = self.server.state.args.wiql_cap
+        if len(ids) > cap:
+            return self._error(route, 400, f"VS402337: The number of work items returned exceeds the size limit of {cap}.")
+        self._send(route, 200, {
+            'queryType': 'flat',
+            'asOf': _iso(datetime.utcnow()),
+            'workItems': [{'id': item_id, 'url': f"/_apis/wit/workItems/{item_id}"} for item_id in ids],
+        })
+
+    def _workitems(self, route, data, params, query, body):
+        try:
+            ids = [int(i) for i in query.get('ids', [''])[0].split(',') if i]
+        except ValueError:
+            return self._error(route, 400, 'ids must be a comma-separated list of integers')
+        cap = self.server.state.args.workitems_cap
+        if not ids or len(ids) > cap:
+            return self._error(route, 400, f"VS403474: Provide between 1 and {cap} work item ids.")
+        wanted = query.get('$fields', [''])[0].split(',') if query.get('$fields') else None
+        items = []
+        for item_id in ids:
+            item = data['work_items'].get(item_id)
+            if item is None:
+                return self._error(route, 404, f"TF401232: Work item {item_id} does not exist.")
+            fields = {k: v for k, v in item['fields'].items() if wanted is None or k in wanted}
+            items.append({**item, 'fields': fields})
+        self._send(route, 200, {'count': len(items), 'value': items})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Azure DevOps stand-in with latency and throttling injection')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--items', type=int, default=300, help='work items per project (default: 300)')
+    parser.add_argument('--engineers', type=int, default=12, help='assignees per project (default: 12)')
+    parser.add_argument('--seed', type=int, default=0, help='dataset seed')
+    parser.add_argument('--latency-ms', type=float, default=0, help='fixed delay per request')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='extra random delay, 0..N ms')
+    parser.add_argument('--error-rate', type=float, default=0, help='fraction of requests answered 500/503')
+    parser.add_argument('--throttle-rate', type=float, default=0, help='fraction of requests answered 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds on injected 429s')
+    parser.add_argument('--rate-limit', type=float, default=0, help='max requests/second before 429 (0 = off)')
+    parser.add_argument('--wiql-cap', type=int, default=20000, help='max WIQL results (default: 20000)')
+    parser.add_argument('--workitems-cap', type=int, default=200, help='max ids per workitems call (default: 200)')
+    parser.add_argument('--break', dest='broken', default='', help='comma-separated routes to answer 404')
+    parser.add_argument('--down-orgs', default='', help='comma-separated organizations answered 503')
+    parser.add_argument('--hang-orgs', default='', help='comma-separated organizations held for --hang-seconds')
+    parser.add_argument('--hang-seconds', type=float, default=120, help='delay for --hang-orgs (default: 120)')
+    parser.add_argument('--fault-seed', type=int, default=None, help='seed for latency/fault injection')
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args()
+
+    unknown = set(filter(None, args.broken.split(','))) - {route for route, _, _ in ROUTES}
+    if unknown:
+        parser.error(f"unknown route(s) for --break: {', '.join(sorted(unknown))}")
+
+    server = ThreadingHTTPServer((args.host, args.port), StandinHandler)
+    server.daemon_threads = True
+    server.state = StandinState(args)
+    print(f"🧪 Azure DevOps stand-in on http://{args.host}:{server.server_port} "
+          f"({len(server.state.configured)} configured projects, {args.items} items each)")
+    print(f"   AZURE_DEVOPS_BASE_URL=http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"📊 Requests served: {json.dumps(server.state.counts)}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
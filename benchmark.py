@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Offline Extraction Benchmark
+Replays a recorded Azure DevOps cassette (see http_cassette.py) through
+get_sprint_count.main and the compact report generator, so performance
+changes can be measured without touching the live API.
+
+For each suite step it reports:
+- median wall-clock time over --runs replays
+- requests issued per run
+- peak Python memory and the top allocation sites (tracemalloc via
+  memory_profile.py, from one extra run so tracing does not skew the timings)
+Results are saved under data/benchmarks/ for run-to-run comparison.
+
+The run fails when Azure DevOps usage per project exceeds the API_BUDGET_*
+limits (see api_budget.py). With --compare it also fails if any project
+needs more calls than in the earlier results, or over 5% more bytes.
+
+Usage:
+    python3 benchmark.py record                      # live run → data/cassettes/azure_devops.json
+    python3 benchmark.py run                         # offline replay benchmark
+    python3 benchmark.py run --runs 10 --compare data/benchmarks/<earlier>.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+DEFAULT_CASSETTE = os.path.join('data', 'cassettes', 'azure_devops.json')
+RESULTS_DIR = os.path.join('data', 'benchmarks')
+
+
+def record_cassette(path=DEFAULT_CASSETTE):
+    """Run the extractor live and save every Azure DevOps response to path"""
+    import get_sprint_count
+    from config import Config
+    from http_cassette import CassetteRecorder
+
+    recorder = CassetteRecorder(get_sprint_count.get_http_session(), Config.AZURE_DEVOPS_PAT)
+    get_sprint_count.set_transport(recorder)
+    try:
+        output_file = get_sprint_count.main()
+    finally:
+        get_sprint_count.set_transport(None)
+    if not output_file or not recorder.interactions:
+        print("❌ Nothing recorded (is AZURE_DEVOPS_PAT set?)")
+        return False
+    recorder.save(path)
+    return True
+
+
+def _extract(workdir):
+    import get_sprint_count
+    return get_sprint_count.main()
+
+
+def _render(workdir, json_file):
+    from generate_html_report_compact import generate_report_outputs, save_report_outputs
+    outputs = generate_report_outputs(json_file)
+    save_report_outputs(outputs, os.path.join(workdir, 'benchmark_report.html'))
+    return outputs
+
+
+def _timed(func, *args, trace_memory=None):
+    """(result, seconds, memory) of one call with stdout silenced.
+
+    With trace_memory=<step name> the call runs under tracemalloc and memory is
+    that step's memory_profile measurement (else None).
+    """
+    from memory_profile import memory_stage, memory_stages, memory_tracing
+    started = time.perf_counter()
+    with memory_tracing(bool(trace_memory)), memory_stage(trace_memory or ''):
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func(*args)
+        seconds = time.perf_counter() - started
+    return result, seconds, memory_stages()[-1] if trace_memory else None
+
+
+def run_benchmark(cassette_path=DEFAULT_CASSETTE, runs=5):
+    """Replay the cassette runs times; returns the results dict"""
+    import get_sprint_count
+    from http_cassette import CassettePlayer
+
+    from run_profile import project_usage, reset_run_profile
+
+    # Offline: the extractor only needs a non-empty PAT to build auth headers
+    os.environ.setdefault('AZURE_DEVOPS_PAT', 'offline-benchmark')
+    # Measure every replay to the end; the budget is checked on the results
+    enforce_setting = os.environ.get('API_BUDGET_ENFORCE')
+    os.environ['API_BUDGET_ENFORCE'] = 'false'
+    player = CassettePlayer(cassette_path)
+    get_sprint_count.set_transport(player)
+    repo_dir = os.getcwd()
+    steps = {'extract': {'seconds': [], 'requests': []}, 'render': {'seconds': []}}
+    api_usage = None
+
+    try:
+        with tempfile.TemporaryDirectory(prefix='sprint_benchmark_') as workdir:
+            # Snapshots, trend history and reports go to a scratch directory
+            os.chdir(workdir)
+            for index in range(runs + 1):
+                trace = index == runs  # the extra last run measures memory
+                player.reset()
+                get_sprint_count.clear_iteration_calendars()
+                reset_run_profile()
+                json_file, seconds, memory = _timed(_extract, workdir, trace_memory=trace and 'extract')
+                if not json_file:
+                    raise RuntimeError("extraction produced no snapshot during replay")
+                if trace:
+                    steps['extract']['memory'] = memory
+                else:
+                    steps['extract']['seconds'].append(seconds)
+                    steps['extract']['requests'].append(player.request_count)
+                    api_usage = api_usage or project_usage()
+
+                _, seconds, memory = _timed(_render, workdir, json_file, trace_memory=trace and 'render')
+                if trace:
+                    steps['render']['memory'] = memory
+                else:
+                    steps['render']['seconds'].append(seconds)
+    finally:
+        os.chdir(repo_dir)
+        get_sprint_count.set_transport(None)
+        if enforce_setting is None:
+            os.environ.pop('API_BUDGET_ENFORCE', None)
+        else:
+            os.environ['API_BUDGET_ENFORCE'] = enforce_setting
+
+    return {
+        'cassette': cassette_path,
+        'recorded_at': player.recorded_at,
+        'measured_at': datetime.now().isoformat(timespec='seconds'),
+        'runs': runs,
+        'loose_matches': player.loose_matches,
+        'misses': player.misses,
+        'api_usage': api_usage,
+        'steps': {
+            name: {
+                'median_seconds': round(statistics.median(step['seconds']), 4),
+                'min_seconds': round(min(step['seconds']), 4),
+                'requests': step['requests'][0] if step.get('requests') else 0,
+                'peak_memory_bytes': step['memory']['peak_bytes'],
+                'top_allocations': step['memory']['top_allocations'],
+            }
+            for name, step in steps.items()
+        },
+    }
+
+
+def api_regressions(results, baseline=None):
+    """Budget violations, plus per-project usage growth against baseline results"""
+    from api_budget import check_api_budget
+    problems = check_api_budget(results['api_usage'] or {})
+    for project, before in ((baseline or {}).get('api_usage') or {}).items():
+        now = (results['api_usage'] or {}).get(project)
+        if now is None:
+            continue
+        if now['count'] > before['count']:
+            problems.append(f"{project}: {now['count']} calls, up from {before['count']}")
+        if now['bytes'] > before['bytes'] * 1.05:
+            problems.append(f"{project}: {now['bytes']:,} bytes, up from {before['bytes']:,}")
+    return problems
+
+
+def save_results(results):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def _delta(current, previous):
+    if not previous:
+        return ''
+    change = (current - previous) / previous * 100
+    return f" ({'+' if change >= 0 else ''}{change:.1f}%)"
+
+
+def print_results(results, baseline=None):
+    print(f"⏱️ Offline benchmark ({results['runs']} runs, cassette recorded {results['recorded_at']})")
+    for name, step in results['steps'].items():
+        before = (baseline or {}).get('steps', {}).get(name, {})
+        print(f"   {name:<8} {step['median_seconds'] * 1000:9.1f} ms{_delta(step['median_seconds'], before.get('median_seconds'))}"
+              f"   {step['requests']:5d} requests{_delta(step['requests'], before.get('requests'))}"
+              f"   {step['peak_memory_bytes'] / 1024 / 1024:7.2f} MiB peak{_delta(step['peak_memory_bytes'], before.get('peak_memory_bytes'))}")
+    for name, step in results['steps'].items():
+        for site in step.get('top_allocations', [])[:3]:
+            print(f"   🧠 {name:<8} {site['bytes'] / 1024 / 1024:7.2f} MiB held from {site['site']}")
+    if results['loose_matches']:
+        print(f"   ℹ️ {results['loose_matches']} request(s) matched by URL only (request body differed from the recording)")
+    if results['misses']:
+        print(f"   ⚠️ {results['misses']} request(s) had no recorded response; re-record the cassette")
+    if results['api_usage']:
+        from api_budget import format_usage
+        print("   📞 API usage per project:")
+        for line in format_usage(results['api_usage']):
+            print(f"   {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record Azure DevOps responses and benchmark extraction offline')
+    parser.add_argument('command', choices=['record', 'run'])
+    parser.add_argument('--cassette', default=DEFAULT_CASSETTE, help=f'cassette path (default: {DEFAULT_CASSETTE})')
+    parser.add_argument('--runs', type=int, default=5, help='timed replays (default: 5)')
+    parser.add_argument('--compare', default=None, help='earlier results file to show deltas against')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        return record_cassette(args.cassette)
+
+    if not os.path.exists(args.cassette):
+        print(f"❌ Cassette not found: {args.cassette} (run: python3 benchmark.py record)")
+        return False
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    results = run_benchmark(args.cassette, args.runs)
+    print_results(results, baseline)
+    print(f"💾 Results saved to: {save_results(results)}")
+    regressions = api_regressions(results, baseline)
+    for problem in regressions:
+        print(f"   ❌ API budget: {problem}")
+    return results['misses'] == 0 and not regressions
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,119 @@
+"""
+Per-Organization Circuit Breakers
+A failing Azure DevOps organization (outage, hung connections, revoked PAT)
+would otherwise be retried through every teams fallback and WIQL fallback
+for each of its projects, each call waiting out its timeout. get_sprint_count
+counts consecutive failures per organization; after AZURE_DEVOPS_BREAKER_FAILURES
+of them the org's circuit opens and its remaining calls fail at once with
+CircuitOpenError instead of going to the network:
+
+    check_circuit(org)              # raises CircuitOpenError while open
+    record_outcome(org, response)   # or record_outcome(org, error=e)
+
+After AZURE_DEVOPS_BREAKER_COOLDOWN_SECONDS one trial call is let through
+(half-open); success closes the circuit, failure opens it again. A failure is
+a timeout, connection error, 5xx, 429, 401 or 403. Other 4xx answers (a
+missing iteration path, a bad WIQL) are about one request, not the org.
+
+CircuitOpenError is a requests RequestException, so existing error handling
+treats a skipped call like a failed one. The state is shared by the detail
+fetch threads and guarded by a lock, so a half-open circuit lets exactly one
+trial call through while the others keep failing fast.
+"""
+
+import threading
+import time
+import requests
+from config import Config
+from report_log import get_logger
+
+log = get_logger(__name__)
+
+# HTTP statuses that say the organization (not the request) is in trouble
+ORG_FAILURE_STATUSES = {401, 403, 429}
+
+# org: {'failures' (consecutive), 'failed_total', 'opened_at' (monotonic or None), 'trial' (bool),
+#       'skipped', 'last_error'}
+_circuits = {}
+_lock = threading.Lock()
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """An Azure DevOps call skipped because its organization's circuit is open"""
+
+
+def reset_circuits():
+    """Close every circuit (start of a run)"""
+    with _lock:
+        _circuits.clear()
+
+
+def org_from_url(url):
+    """Organization segment of an Azure DevOps URL under AZURE_DEVOPS_BASE_URL"""
+    base = Config.AZURE_DEVOPS_BASE_URL
+    path = url[len(base):] if url.startswith(base) else url.split('://', 1)[-1].partition('/')[2]
+    return path.lstrip('/').split('/', 1)[0]
+
+
+def is_transport_failure(error):
+    """True for errors where no answer arrived (timeouts, refused or dropped connections)"""
+    return isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError, CircuitOpenError))
+
+
+def _circuit(org):
+    return _circuits.setdefault(org, {'failures': 0, 'failed_total': 0, 'opened_at': None, 'trial': False,
+                                      'skipped': 0, 'last_error': None})
+
+
+def check_circuit(org):
+    """Raise CircuitOpenError if calls to org should be skipped right now"""
+    with _lock:
+        circuit = _circuits.get(org)
+        if not circuit or circuit['opened_at'] is None:
+            return
+        if not circuit['trial'] and time.monotonic() - circuit['opened_at'] >= Config.AZURE_DEVOPS_BREAKER_COOLDOWN_SECONDS:
+            circuit['trial'] = True
+            log.info(f"   🔌 Retrying organization {org} (circuit half-open)")
+            return
+        circuit['skipped'] += 1
+        last_error = circuit['last_error']
+    raise CircuitOpenError(f"circuit open for organization {org} after repeated failures (last: {last_error})")
+
+
+def record_outcome(org, response=None, error=None):
+    """Count a finished call towards org's circuit; opens it on too many consecutive failures"""
+    if isinstance(error, CircuitOpenError):
+        return
+    with _lock:
+        circuit = _circuit(org)
+        if error is None and response.status_code < 500 and response.status_code not in ORG_FAILURE_STATUSES:
+            if circuit['opened_at'] is not None:
+                log.info(f"   🔌 Organization {org} is answering again (circuit closed)")
+            circuit.update(failures=0, opened_at=None, trial=False)
+            return
+
+        circuit['failures'] += 1
+        circuit['failed_total'] += 1
+        circuit['last_error'] = type(error).__name__ if error is not None else f"HTTP {response.status_code}"
+        if circuit['trial'] or (circuit['opened_at'] is None and circuit['failures'] >= Config.AZURE_DEVOPS_BREAKER_FAILURES):
+            if not circuit['trial']:
+                log.warning(f"   🔌 {circuit['failures']} failed calls to organization {org} ({circuit['last_error']}); "
+                            f"skipping its remaining calls for {Config.AZURE_DEVOPS_BREAKER_COOLDOWN_SECONDS}s")
+            circuit.update(opened_at=time.monotonic(), trial=False)
+
+
+def org_trouble(org):
+    """Failed plus skipped calls to org so far this run (compare before/after a step)"""
+    with _lock:
+        circuit = _circuits.get(org)
+        return circuit['failed_total'] + circuit['skipped'] if circuit else 0
+
+
+def circuit_summary():
+    """{org: {'state', 'failures', 'skipped', 'last_error'}} for every org that had a failure"""
+    with _lock:
+        return {
+            org: {'state': 'open' if circuit['opened_at'] is not None else 'closed',
+                  'failures': circuit['failures'], 'skipped': circuit['skipped'], 'last_error': circuit['last_error']}
+            for org, circuit in _circuits.items() if circuit['failures'] or circuit['skipped']
+        }
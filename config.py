@@ -1,11 +1,42 @@
 import os
-from dotenv import load_dotenv
-from datetime import datetime, timedelta
-import calendar
 
-# Load .env file for local development (if it exists)
-# GitHub Actions will use repository secrets instead
-load_dotenv()
+_environment_loaded = False
+
+def load_environment():
+    """Load the .env file for local development (once, on first setting access).
+
+    GitHub Actions uses repository secrets instead; variables already in the
+    environment always win over .env.
+    """
+    global _environment_loaded
+    if not _environment_loaded:
+        _environment_loaded = True
+        from dotenv import load_dotenv
+        load_dotenv()
+
+def is_true(value):
+    return value.lower() == 'true'
+
+class EnvSetting:
+    """Config attribute read from the environment when accessed, not at import"""
+
+    def __init__(self, name, default='', cast=str):
+        self.name = name
+        self.default = default
+        self.cast = cast
+
+    def __get__(self, instance, owner):
+        load_environment()
+        return self.cast(os.getenv(self.name, self.default))
+
+class OrgSetting:
+    """Config attribute taken from the organization config file (loaded on first access)"""
+
+    def __init__(self, attr):
+        self.attr = attr
+
+    def __get__(self, instance, owner):
+        return getattr(owner.get_org_config(), self.attr)
 
 class Config:
     """Centralized configuration for Azure DevOps and email settings"""
@@ -14,66 +45,131 @@ class Config:
     # Priority: GitHub Secrets > .env file > Default Values
     
     # Personal Access Token for both organizations
-    AZURE_DEVOPS_PAT = os.getenv('AZURE_DEVOPS_PAT', '')
+    AZURE_DEVOPS_PAT = EnvSetting('AZURE_DEVOPS_PAT', '')
+    # Point at a local stand-in (azure_devops_standin.py) for load/throttling tests
+    AZURE_DEVOPS_BASE_URL = EnvSetting('AZURE_DEVOPS_BASE_URL', 'https://dev.azure.com', lambda v: v.rstrip('/'))
+    # Seconds to wait for a connection / for each read of a response, per request
+    AZURE_DEVOPS_CONNECT_TIMEOUT = EnvSetting('AZURE_DEVOPS_CONNECT_TIMEOUT', '5', float)
+    AZURE_DEVOPS_READ_TIMEOUT = EnvSetting('AZURE_DEVOPS_READ_TIMEOUT', '30', float)
+    # Per-organization circuit breaker (see circuit_breaker.py): after this many
+    # consecutive failed calls an org's remaining calls are skipped for the cooldown
+    AZURE_DEVOPS_BREAKER_FAILURES = EnvSetting('AZURE_DEVOPS_BREAKER_FAILURES', '3', int)
+    AZURE_DEVOPS_BREAKER_COOLDOWN_SECONDS = EnvSetting('AZURE_DEVOPS_BREAKER_COOLDOWN_SECONDS', '300', float)
     
     # Email Configuration
     # Priority: GitHub Secrets > .env file > Default Values
-    EMAIL_FROM = os.getenv('EMAIL_FROM', 'gourav8jain@gmail.com')
-    EMAIL_TO = os.getenv('EMAIL_TO', 'gourav.jain@iol.world')
+    EMAIL_FROM = EnvSetting('EMAIL_FROM', 'gourav8jain@gmail.com')
+    EMAIL_TO = EnvSetting('EMAIL_TO', 'gourav.jain@iol.world')
     
     # Multiple Email Recipients (comma-separated)
     # Example: "user1@company.com,user2@company.com,user3@company.com"
-    EMAIL_TO_MULTIPLE = os.getenv('EMAIL_TO_MULTIPLE', '')
-    SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
-    SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
-    SMTP_USERNAME = os.getenv('SMTP_USERNAME', 'gourav8jain@gmail.com')
-    SMTP_PASSWORD = os.getenv('SMTP_PASSWORD', '')
+    EMAIL_TO_MULTIPLE = EnvSetting('EMAIL_TO_MULTIPLE', '')
+    SMTP_SERVER = EnvSetting('SMTP_SERVER', 'smtp.gmail.com')
+    SMTP_PORT = EnvSetting('SMTP_PORT', '587', int)
+    SMTP_USERNAME = EnvSetting('SMTP_USERNAME', 'gourav8jain@gmail.com')
+    SMTP_PASSWORD = EnvSetting('SMTP_PASSWORD', '')
+    # STARTTLS is required by Gmail; disable only for local SMTP stand-ins
+    SMTP_STARTTLS = EnvSetting('SMTP_STARTTLS', 'true', is_true)
+    SMTP_TIMEOUT = EnvSetting('SMTP_TIMEOUT', '30', int)
     
-    # Multi-Organization Configuration
-    ORGANIZATIONS = {
-        'IWTX': {
-            'name': 'IWTX',
-            'projects': {
-                'IOL_X': {
-                    'project_name': 'IOL Pay',  # Display name: IOL Pay
-                    'team_name': 'Charlie Backend Team',
-                    'tags': [],
-                    'sprint_duration_weeks': 3,  # IOL Pay has 3-week sprints
-                    'iteration_path': 'IOL_X\\Charlie Backend Team Backlog\\Iteration-29',  # Base path; last segment auto-updated when API unavailable
-                    'iteration_display': 'Iteration-29 (Nov 4 - Nov 24)',  # Display with dates
-                    # Fallback cadence (used only if Azure DevOps API is unavailable)
-                    # Anchor: Iteration-29 starting Nov 4, 2024, 3-week cadence
-                    'fallback_cadence': {
-                        'anchor_start': '2024-11-04',
-                        'anchor_number': 29,
-                        'duration_weeks': 3,
-                        'name_prefix': 'Iteration-'
-                    }
-                }
-            }
-        },
-        'IOLPulse': {
-            'name': 'IOLPulse', 
-            'projects': {
-                'VCCWallet': {
-                    'project_name': 'VCCWallet',
-                    'team_name': 'VCCWallet Team',
-                    'tags': [],
-                    'sprint_duration_weeks': 2,  # VCC has 2-week sprints
-                    'iteration_path': 'VCCWallet\\Sprint 12',  # Base path; last segment auto-updated when API unavailable
-                    'iteration_display': 'Sprint-12 (Oct 28 - Nov 10)',  # Display with dates
-                    # Fallback cadence (used only if Azure DevOps API is unavailable)
-                    # Anchor: Sprint 12 starting Oct 28, 2024, 2-week cadence
-                    'fallback_cadence': {
-                        'anchor_start': '2024-10-28',
-                        'anchor_number': 12,
-                        'duration_weeks': 2,
-                        'name_prefix': 'Sprint '
-                    }
-                }
-            }
-        }
-    }
+    # Email size budget (bytes of HTML body). Gmail clips messages at ~102 KB,
+    # so larger reports are progressively degraded to fit. 0 disables the budget.
+    EMAIL_MAX_HTML_BYTES = EnvSetting('EMAIL_MAX_HTML_BYTES', str(100 * 1024), int)
+    # Attach the untrimmed report as a .html.gz file when the body was degraded
+    EMAIL_ATTACH_FULL_REPORT = EnvSetting('EMAIL_ATTACH_FULL_REPORT', 'true', is_true)
+    # Minify report HTML; repeated inline styles become <style> classes only if
+    # every client in EMAIL_TARGET_CLIENTS supports them (see html_minify.py)
+    HTML_MINIFY = EnvSetting('HTML_MINIFY', 'true', is_true)
+    EMAIL_TARGET_CLIENTS = EnvSetting('EMAIL_TARGET_CLIENTS', 'gmail,outlook,apple_mail')
+
+    # Personalized reports: recipient → projects/orgs/teams/engineers routing map
+    # (see personalized_reports.py) and worker processes used to render them
+    EMAIL_ROUTING_FILE = EnvSetting('EMAIL_ROUTING_FILE', 'email_routing.json')
+    REPORT_RENDER_WORKERS = EnvSetting('REPORT_RENDER_WORKERS', str(min(4, os.cpu_count() or 1)), int)
+
+    # Durable outbox: built messages are spooled before sending and retried
+    # with exponential backoff when SMTP fails (see outbox.py)
+    EMAIL_OUTBOX_ENABLED = EnvSetting('EMAIL_OUTBOX_ENABLED', 'true', is_true)
+    EMAIL_OUTBOX_DIR = EnvSetting('EMAIL_OUTBOX_DIR', 'outbox')
+    EMAIL_OUTBOX_MAX_ATTEMPTS = EnvSetting('EMAIL_OUTBOX_MAX_ATTEMPTS', '8', int)
+    EMAIL_OUTBOX_RETRY_BASE_SECONDS = EnvSetting('EMAIL_OUTBOX_RETRY_BASE_SECONDS', '60', int)
+    EMAIL_OUTBOX_RETRY_MAX_SECONDS = EnvSetting('EMAIL_OUTBOX_RETRY_MAX_SECONDS', '3600', int)
+    EMAIL_OUTBOX_POLL_SECONDS = EnvSetting('EMAIL_OUTBOX_POLL_SECONDS', '30', int)
+    # Ledger of delivered reports used to skip identical reruns (see send_ledger.py)
+    EMAIL_SEND_LEDGER_FILE = EnvSetting('EMAIL_SEND_LEDGER_FILE', os.path.join('data', 'send_ledger.json'))
+
+    # Scheduler daemon (see report_daemon.py): local HH:MM run times, comma-separated
+    REPORT_SCHEDULE_TIMES = EnvSetting('REPORT_SCHEDULE_TIMES', '10:30')
+    DAEMON_POLL_SECONDS = EnvSetting('DAEMON_POLL_SECONDS', '5', int)
+    DAEMON_TRIGGER_FILE = EnvSetting('DAEMON_TRIGGER_FILE', os.path.join('data', 'run_now.trigger'))
+    DAEMON_AUTO_COMMIT = EnvSetting('DAEMON_AUTO_COMMIT', 'false', is_true)
+    # Each daemon run checkpoints under its own run id; older run directories are pruned
+    DAEMON_KEEP_CHECKPOINT_RUNS = EnvSetting('DAEMON_KEEP_CHECKPOINT_RUNS', '7', int)
+    # How long a fetched team/iteration calendar is reused before refetching
+    ITERATION_CACHE_TTL_SECONDS = EnvSetting('ITERATION_CACHE_TTL_SECONDS', str(6 * 3600), int)
+
+    # Run deadline (see run_deadline.py): local HH:MM and/or seconds from the
+    # start of a run (earliest wins; empty/0 = none). Extraction stops the
+    # reserve earlier so the partial report still renders and sends on time
+    RUN_DEADLINE_AT = EnvSetting('RUN_DEADLINE_AT', '')
+    RUN_DEADLINE_SECONDS = EnvSetting('RUN_DEADLINE_SECONDS', '0', int)
+    RUN_DEADLINE_RESERVE_SECONDS = EnvSetting('RUN_DEADLINE_RESERVE_SECONDS', '120', int)
+
+    # Sharded extraction (see extraction_queue.py): >1 extracts projects in that
+    # many worker processes via a SQLite work queue; 1 extracts in-process
+    EXTRACT_WORKERS = EnvSetting('EXTRACT_WORKERS', '1', int)
+    EXTRACT_QUEUE_DB = EnvSetting('EXTRACT_QUEUE_DB', os.path.join('data', 'extract_queue.sqlite'))
+    EXTRACT_SHARD_DIR = EnvSetting('EXTRACT_SHARD_DIR', os.path.join('data', 'shards'))
+    # A claimed unit is handed to another worker if not finished within the lease
+    EXTRACT_LEASE_SECONDS = EnvSetting('EXTRACT_LEASE_SECONDS', '900', int)
+    EXTRACT_MAX_ATTEMPTS = EnvSetting('EXTRACT_MAX_ATTEMPTS', '2', int)
+
+    # Fetch cost history (see fetch_cost.py): per-project extraction time and
+    # item count of recent runs. The queue hands out the slowest projects
+    # first, and a project expected to exceed EXTRACT_DETAIL_ITEMS_PER_WORKER
+    # items fetches its detail batches on up to EXTRACT_DETAIL_MAX_WORKERS threads
+    FETCH_COST_FILE = EnvSetting('FETCH_COST_FILE', os.path.join('data', 'fetch_costs.json'))
+    FETCH_COST_HISTORY_RUNS = EnvSetting('FETCH_COST_HISTORY_RUNS', '5', int)
+    EXTRACT_DETAIL_ITEMS_PER_WORKER = EnvSetting('EXTRACT_DETAIL_ITEMS_PER_WORKER', '2000', int)
+    EXTRACT_DETAIL_MAX_WORKERS = EnvSetting('EXTRACT_DETAIL_MAX_WORKERS', '4', int)
+
+    # Run profiles (see run_profile.py): per-run JSON timing/request report, and
+    # optionally a Prometheus textfile for node_exporter's textfile collector
+    RUN_PROFILE_ENABLED = EnvSetting('RUN_PROFILE_ENABLED', 'true', is_true)
+    RUN_PROFILE_DIR = EnvSetting('RUN_PROFILE_DIR', os.path.join('data', 'profiles'))
+    RUN_PROFILE_KEEP = EnvSetting('RUN_PROFILE_KEEP', '50', int)
+    PROMETHEUS_TEXTFILE = EnvSetting('PROMETHEUS_TEXTFILE', '')
+
+    # Memory profiling (see memory_profile.py): run the pipeline under tracemalloc
+    # and report peak memory plus the top allocation sites per stage
+    MEMORY_PROFILE = EnvSetting('MEMORY_PROFILE', 'false', is_true)
+    MEMORY_PROFILE_TOP = EnvSetting('MEMORY_PROFILE_TOP', '5', int)
+    # Stack frames kept per allocation: more attribute json/requests allocations
+    # to the repo line that caused them, but slow a traced run down further
+    MEMORY_PROFILE_FRAMES = EnvSetting('MEMORY_PROFILE_FRAMES', '8', int)
+
+    # Azure DevOps API budget per project (see api_budget.py); 0 = unchecked.
+    # Exceeding it fails the run unless API_BUDGET_ENFORCE=false
+    API_BUDGET_CALLS_PER_PROJECT = EnvSetting('API_BUDGET_CALLS_PER_PROJECT', '0', int)
+    API_BUDGET_BYTES_PER_PROJECT = EnvSetting('API_BUDGET_BYTES_PER_PROJECT', '0', int)
+    API_BUDGET_FAMILY_CALLS = EnvSetting('API_BUDGET_FAMILY_CALLS', '')
+    API_BUDGET_ENFORCE = EnvSetting('API_BUDGET_ENFORCE', 'true', is_true)
+
+    # Console logging (see report_log.py): level, per-module overrides
+    # ("get_sprint_count=DEBUG"), quiet production mode, plain or json lines,
+    # and how many lines to buffer before writing (warnings flush at once)
+    LOG_LEVEL = EnvSetting('LOG_LEVEL', 'INFO')
+    LOG_LEVELS = EnvSetting('LOG_LEVELS', '')
+    LOG_QUIET = EnvSetting('LOG_QUIET', 'false', is_true)
+    LOG_FORMAT = EnvSetting('LOG_FORMAT', 'plain')
+    LOG_BUFFER_LINES = EnvSetting('LOG_BUFFER_LINES', '200', int)
+
+    # Multi-Organization Configuration: organizations, projects, teams and
+    # fallback sprint cadences live in a JSON/YAML file (see org_config.py)
+    ORGANIZATIONS_FILE = EnvSetting('ORGANIZATIONS_FILE', 'organizations.json')
+    ORGANIZATIONS = OrgSetting('organizations')
+    # Report / email subject title, e.g. "IOL Pay & VCC"
+    REPORT_TITLE = OrgSetting('report_title')
     
     # Sprint Discovery Configuration
     SPRINT_DISCOVERY = {
@@ -86,239 +182,34 @@ class Config:
         'include_projects': ['IOL_X', 'VCCWallet']  # Updated to new projects
     }
 
-    # Sprint Period (Current Sprint - October 2024)
+    # Sprint periods are looked up in get_sprint_count (next to the Azure DevOps
+    # calls they make); these wrappers keep Config.* callers working and only
+    # import it when called
     @classmethod
     def get_current_sprint_period(cls, project_key=None):
-        """Get the current sprint period for a specific project or all projects.
-        
-        If project_key is provided, returns sprint period for that project.
-        If not provided, returns a default period (for backward compatibility).
-        """
-        if project_key:
-            # Get project-specific sprint period
-            return cls.get_project_sprint_period(project_key)
-        
-        # Default: Return earliest start and latest end across all projects
-        # This is used for backward compatibility
-        all_periods = []
-        for org_key, org_config in cls.ORGANIZATIONS.items():
-            for proj_key, proj_config in org_config['projects'].items():
-                period = cls.get_project_sprint_period(proj_key)
-                if period:
-                    all_periods.append(period)
-        
-        # Filter out fallback periods that don't have dates
-        periods_with_dates = [
-            p for p in all_periods 
-            if not p.get('fallback') and 'start_datetime' in p and 'end_datetime' in p
-        ]
-        
-        if periods_with_dates:
-            earliest_start = min(p['start_datetime'] for p in periods_with_dates)
-            latest_end = max(p['end_datetime'] for p in periods_with_dates)
-            
-            start_date_str = earliest_start.strftime('%d-%b-%Y')
-            end_date_str = latest_end.strftime('%d-%b-%Y')
-            start_iso = earliest_start.strftime('%Y-%m-%dT00:00:00')
-            end_iso = latest_end.strftime('%Y-%m-%dT23:59:59')
-            
-            return {
-                'start_date': start_date_str,
-                'end_date': end_date_str,
-                'start_datetime': earliest_start,
-                'end_datetime': latest_end,
-                'start_iso': start_iso,
-                'end_iso': end_iso
-            }
-        
-        # If we didn't find any non-fallback periods with dates,
-        # try any periods that at least have dates (including fallback-derived ones)
-        any_with_dates = [
-            p for p in all_periods
-            if 'start_datetime' in p and 'end_datetime' in p
-        ]
-        if any_with_dates:
-            earliest_start = min(p['start_datetime'] for p in any_with_dates)
-            latest_end = max(p['end_datetime'] for p in any_with_dates)
+        """See get_sprint_count.get_current_sprint_period"""
+        from get_sprint_count import get_current_sprint_period
+        return get_current_sprint_period(project_key)
 
-            start_date_str = earliest_start.strftime('%d-%b-%Y')
-            end_date_str = latest_end.strftime('%d-%b-%Y')
-            start_iso = earliest_start.strftime('%Y-%m-%dT00:00:00')
-            end_iso = latest_end.strftime('%Y-%m-%dT23:59:59')
-
-            return {
-                'start_date': start_date_str,
-                'end_date': end_date_str,
-                'start_datetime': earliest_start,
-                'end_datetime': latest_end,
-                'start_iso': start_iso,
-                'end_iso': end_iso
-            }
-
-        # Fallback to old hardcoded dates
-        sprint_start = datetime(2024, 10, 14)
-        sprint_end = datetime(2024, 10, 27)
-        
-        start_date_str = sprint_start.strftime('%d-%b-%Y')
-        end_date_str = sprint_end.strftime('%d-%b-%Y')
-        start_iso = sprint_start.strftime('%Y-%m-%dT00:00:00')
-        end_iso = sprint_end.strftime('%Y-%m-%dT23:59:59')
-        
-        return {
-            'start_date': start_date_str,
-            'end_date': end_date_str,
-            'start_datetime': sprint_start,
-            'end_datetime': sprint_end,
-            'start_iso': start_iso,
-            'end_iso': end_iso
-        }
-    
     @classmethod
-    def get_project_sprint_period(cls, project_key):
-        """Get sprint period for a specific project based on current iteration from Azure DevOps"""
-        # Find project configuration
-        project_config = None
-        for org_key, org_config in cls.ORGANIZATIONS.items():
-            if project_key in org_config['projects']:
-                project_config = org_config['projects'][project_key]
-                break
-        
-        if not project_config:
-            return None
-        
-        # Try to fetch current iteration from Azure DevOps
-        from get_sprint_count import get_current_iteration
-        
-        # Get organization and project details
-        org_name = None
-        for org_key, org_config in cls.ORGANIZATIONS.items():
-            if project_key in org_config['projects']:
-                org_name = org_config['name']
-                break
-        
-        if not org_name:
-            return None
-        
-        # Fetch current iteration
-        iteration_info = get_current_iteration(org_name, project_key, project_config.get('team_name'))
-        
-        if iteration_info and iteration_info.get('start_date') and iteration_info.get('end_date'):
-            # Use dates from Azure DevOps
-            start_date = iteration_info['start_date']
-            end_date = iteration_info['end_date']
-            
-            # Parse dates from Azure DevOps format (ISO 8601)
-            if isinstance(start_date, str):
-                # Handle both '2024-10-14T00:00:00Z' and '2024-10-14' formats
-                try:
-                    if 'T' in start_date:
-                        start_date = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-                    else:
-                        start_date = datetime.strptime(start_date, '%Y-%m-%d')
-                except:
-                    start_date = datetime.strptime(start_date.split('T')[0], '%Y-%m-%d')
-                
-                # Convert to datetime object if it's a date
-                if hasattr(start_date, 'date'):
-                    start_date = datetime.combine(start_date.date(), datetime.min.time())
-            elif not isinstance(start_date, datetime):
-                # If it's already a date object, convert to datetime
-                start_date = datetime.combine(start_date, datetime.min.time())
-            
-            if isinstance(end_date, str):
-                try:
-                    if 'T' in end_date:
-                        end_date = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-                    else:
-                        end_date = datetime.strptime(end_date, '%Y-%m-%d')
-                except:
-                    end_date = datetime.strptime(end_date.split('T')[0], '%Y-%m-%d')
-                
-                if hasattr(end_date, 'date'):
-                    end_date = datetime.combine(end_date.date(), datetime.min.time())
-            elif not isinstance(end_date, datetime):
-                end_date = datetime.combine(end_date, datetime.min.time())
-            
-            start_date_str = start_date.strftime('%d-%b-%Y')
-            end_date_str = end_date.strftime('%d-%b-%Y')
-            start_iso = start_date.strftime('%Y-%m-%dT00:00:00')
-            end_iso = end_date.strftime('%Y-%m-%dT23:59:59')
-            
-            return {
-                'start_date': start_date_str,
-                'end_date': end_date_str,
-                'start_datetime': start_date,
-                'end_datetime': end_date,
-                'start_iso': start_iso,
-                'end_iso': end_iso,
-                'iteration_path': iteration_info.get('path'),
-                'iteration_name': iteration_info.get('name')
-            }
-        
-        # Fallback: compute the sprint in which the current date lies, using cadence.
-        # Use configured iteration_path only as a base template (replace last segment with current iteration).
-        cadence = project_config.get('fallback_cadence')
-        base_iteration_path = project_config.get('iteration_path')
-        if cadence:
-            try:
-                anchor_start = datetime.strptime(cadence['anchor_start'], '%Y-%m-%d')
-                duration_days = int(cadence['duration_weeks']) * 7
-                name_prefix = cadence.get('name_prefix', '')
-                anchor_number = int(cadence['anchor_number'])
-                today = datetime.now()
-                # Sprint in which current date lies: find n such that today is in [anchor + n*duration, anchor + (n+1)*duration - 1]
-                delta_days = (today.date() - anchor_start.date()).days
-                n = max(0, delta_days // duration_days)
-                current_start = anchor_start + timedelta(days=n * duration_days)
-                current_end = current_start + timedelta(days=duration_days - 1)
-                current_number = anchor_number + n
-                iteration_name = f"{name_prefix}{current_number}"
-                # Build full iteration_path from base (e.g. IOL_X\...\Iteration-29 -> IOL_X\...\Iteration-32)
-                iteration_path = None
-                if base_iteration_path and '\\' in base_iteration_path:
-                    parts = base_iteration_path.split('\\')
-                    parts[-1] = iteration_name
-                    iteration_path = '\\'.join(parts)
-                return {
-                    'start_date': current_start.strftime('%d-%b-%Y'),
-                    'end_date': current_end.strftime('%d-%b-%Y'),
-                    'start_datetime': current_start,
-                    'end_datetime': current_end,
-                    'start_iso': current_start.strftime('%Y-%m-%dT00:00:00'),
-                    'end_iso': current_end.strftime('%Y-%m-%dT23:59:59'),
-                    'iteration_path': iteration_path,
-                    'iteration_name': iteration_name,
-                    'fallback': True
-                }
-            except Exception as e:
-                print(f"   ⚠️ Error computing sprint from cadence: {e}")
-        # If no cadence or calculation failed, use configured path as-is
-        if base_iteration_path:
-            return {
-                'iteration_path': base_iteration_path,
-                'iteration_name': base_iteration_path.split('\\')[-1],
-                'fallback': True
-            }
-        return None
-    
-    # Sprint Period (Dynamic - will be set by get_current_sprint_period)
-    SPRINT_PERIOD = None
+    def get_project_sprint_period(cls, project_key, org_name=None):
+        """See get_sprint_count.get_project_sprint_period"""
+        from get_sprint_count import get_project_sprint_period
+        return get_project_sprint_period(project_key, org_name)
 
     # Project Specific Configuration
     @classmethod
     def get_projects_config(cls):
-        """Get project configuration with dynamic iteration paths"""
-        sprint_period = cls.get_current_sprint_period()
-        
+        """Get project configuration with dynamic iteration paths, keyed by (org name, project key)
+
+        Two organizations may use the same project key, so the key alone is not unique.
+        """
         return {
-            'IOL_X': {
-                'tags': [],
-                'iteration_path': None
-            },
-            'VCCWallet': {
-                'tags': [],
+            (org_name, project_key): {
+                'tags': project_config['tags'],
                 'iteration_path': None
             }
+            for org_name, project_key, project_config in cls.get_org_config().iter_projects()
         }
     
     PROJECTS = None  # Will be set dynamically
@@ -336,6 +227,8 @@ class Config:
     @classmethod
     def validate_config(cls):
         """Validate that required configuration is present"""
+        from report_log import get_logger
+        log = get_logger('config')
         required_vars = [
             'AZURE_DEVOPS_PAT',
             'EMAIL_FROM',
@@ -349,9 +242,9 @@ class Config:
         # Check if we're running in GitHub Actions
         is_github_actions = os.getenv('GITHUB_ACTIONS') == 'true'
         
-        print(f"🔧 Configuration Validation:")
-        print(f"   Environment: {'GitHub Actions' if is_github_actions else 'Local Development'}")
-        print(f"   .env file loaded: {os.path.exists('.env')}")
+        log.info(f"🔧 Configuration Validation:")
+        log.debug(f"   Environment: {'GitHub Actions' if is_github_actions else 'Local Development'}")
+        log.debug(f"   .env file loaded: {os.path.exists('.env')}")
         
         missing_vars = []
         
@@ -360,54 +253,72 @@ class Config:
             value = getattr(cls, var)
             if not value or value.strip() == '':
                 missing_vars.append(var)
-                print(f"   ❌ {var}: Not set or empty")
+                log.error(f"   ❌ {var}: Not set or empty")
             else:
                 # Show first 10 characters for security
                 display_value = f"{value[:10]}..." if len(value) > 10 else value
-                print(f"   ✅ {var}: {display_value}")
+                log.debug(f"   ✅ {var}: {display_value}")
         
         # Check optional variables
         for var in optional_vars:
             value = getattr(cls, var)
             if not value or value.strip() == '':
-                print(f"   ⚠️ {var}: Not set or empty (optional)")
+                log.warning(f"   ⚠️ {var}: Not set or empty (optional)")
             else:
                 display_value = f"{value[:10]}..." if len(value) > 10 else value
-                print(f"   ✅ {var}: {display_value}")
+                log.debug(f"   ✅ {var}: {display_value}")
+        
+        # Check the organization config file
+        try:
+            org_config = cls.get_org_config()
+            log.debug(f"   ✅ Organizations: {len(org_config.organizations)} orgs, {len(org_config.projects_by_org)} projects ({org_config.source})")
+        except ValueError as e:
+            log.error(f"   ❌ {e}")
+            return False
         
         if missing_vars:
-            print(f"\n⚠️ Missing required environment variables: {', '.join(missing_vars)}")
+            log.warning(f"\n⚠️ Missing required environment variables: {', '.join(missing_vars)}")
             
             if is_github_actions:
-                print("\n🔧 GitHub Actions Configuration:")
-                print("   The workflow is running in GitHub Actions but environment variables are missing.")
-                print("   Please check your repository secrets:")
-                print("   Go to: Settings → Secrets and variables → Actions")
-                print("   Ensure these secrets are set:")
+                log.warning("\n🔧 GitHub Actions Configuration:")
+                log.warning("   The workflow is running in GitHub Actions but environment variables are missing.")
+                log.warning("   Please check your repository secrets:")
+                log.warning("   Go to: Settings → Secrets and variables → Actions")
+                log.warning("   Ensure these secrets are set:")
                 for var in missing_vars:
-                    print(f"     - {var}")
-                print("\n   Note: Repository secrets are automatically available as environment variables")
-                print("   in GitHub Actions workflows.")
+                    log.warning(f"     - {var}")
+                log.warning("\n   Note: Repository secrets are automatically available as environment variables")
+                log.warning("   in GitHub Actions workflows.")
             else:
-                print("\n🔧 Local Development Configuration:")
-                print("   1. Copy .env.example to .env:")
-                print("      cp .env.example .env")
-                print("   2. Edit .env with your actual credentials")
-                print("   3. Or set environment variables:")
-                print("      export EMAIL_FROM=your_email@gmail.com")
-                print("      export EMAIL_TO=recipient@gmail.com")
-                print("      # etc...")
+                log.warning("\n🔧 Local Development Configuration:")
+                log.warning("   1. Copy .env.example to .env:")
+                log.warning("      cp .env.example .env")
+                log.warning("   2. Edit .env with your actual credentials")
+                log.warning("   3. Or set environment variables:")
+                log.warning("      export EMAIL_FROM=your_email@gmail.com")
+                log.warning("      export EMAIL_TO=recipient@gmail.com")
+                log.warning("      # etc...")
             
             return False
         
-        print(f"\n✅ Configuration validation passed!")
+        log.info(f"\n✅ Configuration validation passed!")
         return True
     
     @classmethod
-    def get_project_config(cls, project_name):
-        """Get configuration for a specific project"""
-        projects_config = cls.get_projects_config()
-        return projects_config.get(project_name)
+    def get_org_config(cls):
+        """Validated, indexed organization config (org_config.OrgConfig); reloaded when the file changes"""
+        from org_config import load_org_config
+        return load_org_config(cls.ORGANIZATIONS_FILE)
+    
+    @classmethod
+    def get_project_config(cls, project_name, org_name=None):
+        """Get configuration for a specific project.
+
+        org_name picks the organization when the project key is defined in more than one
+        (default: the first organization defining it).
+        """
+        org_name = org_name or cls.get_org_config().org_for_project(project_name)
+        return cls.get_projects_config().get((org_name, project_name))
     
     @classmethod
     def get_state_category(cls, state):
@@ -417,6 +328,11 @@ class Config:
                 return category
         return 'Other'
     
+    @classmethod
+    def get_email_target_clients(cls):
+        """Get the mail clients the report HTML must render in"""
+        return [client.strip() for client in cls.EMAIL_TARGET_CLIENTS.split(',') if client.strip()]
+    
     @classmethod
     def get_email_recipients(cls):
         """Get email recipients - either single or multiple"""
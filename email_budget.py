@@ -0,0 +1,78 @@
+"""
+Email Size Budget
+Keeps the HTML email body under a byte budget (Gmail clips messages at
+roughly 102 KB) by progressively degrading the compact report.
+"""
+
+import gzip
+from report_log import get_logger
+
+log = get_logger(__name__)
+
+# Gmail clips bodies at ~102 KB; leave headroom for MIME headers and encoding
+GMAIL_CLIP_BYTES = 102 * 1024
+DEFAULT_MAX_HTML_BYTES = 100 * 1024
+
+# Ordered from richest to smallest; each entry is passed as render keyword options
+DEGRADATION_LEVELS = [
+    ('full', {}),
+    ('collapse_completed', {'collapse_completed': True}),
+    ('cap_tasks_10', {'collapse_completed': True, 'max_tasks_per_engineer': 10}),
+    ('cap_tasks_5', {'collapse_completed': True, 'max_tasks_per_engineer': 5}),
+    ('cap_tasks_2', {'collapse_completed': True, 'max_tasks_per_engineer': 2}),
+    ('drop_engineers', {'include_engineer_breakdown': False}),
+]
+
+
+def html_size_bytes(html_content):
+    """Size of the HTML body as sent (UTF-8 bytes, not characters)"""
+    return len(html_content.encode('utf-8'))
+
+
+def render_within_budget(render, max_bytes=None):
+    """Render with progressively smaller options until the output fits max_bytes.
+
+    render is called as render(**options) for each degradation level. Returns a
+    dict with the chosen html, level name, sizes and whether the budget was met.
+    If even the smallest level is too large, that smallest rendering is returned
+    with within_budget False.
+    """
+    full_html = render()
+    full_size = html_size_bytes(full_html)
+    result = {
+        'html': full_html,
+        'level': 'full',
+        'size_bytes': full_size,
+        'full_html': full_html,
+        'full_size_bytes': full_size,
+        'within_budget': True
+    }
+    if not max_bytes or full_size <= max_bytes:
+        return result
+
+    log.warning(f"   ⚠️ Report is {full_size:,} bytes, over the {max_bytes:,} byte email budget; degrading...")
+    for level, options in DEGRADATION_LEVELS[1:]:
+        html_content = render(**options)
+        size = html_size_bytes(html_content)
+        result.update({'html': html_content, 'level': level, 'size_bytes': size})
+        log.info(f"      📉 {level}: {size:,} bytes")
+        if size <= max_bytes:
+            return result
+
+    result['within_budget'] = False
+    log.warning(f"   ⚠️ Smallest rendering is still {result['size_bytes']:,} bytes (budget {max_bytes:,})")
+    return result
+
+
+def compress_report(html_content):
+    """Gzip the HTML report for attachment"""
+    return gzip.compress(html_content.encode('utf-8'), compresslevel=9)
+
+
+def build_full_report_attachment(html_content, html_filename):
+    """Build a gzip MIME attachment carrying the untrimmed report"""
+    from email.mime.application import MIMEApplication
+    payload = compress_report(html_content)
+    attachment = MIMEApplication(payload, _subtype='gzip')
+    attachment.add_header('Content-Disposition', 'attachment', filename=f"{html_filename}.gz")
+    return attachment, len(payload)
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Sharded Extraction Queue
+Splits work item extraction into one unit per organization/project so it
+can run across several worker processes, or several runners that share the
+queue database:
+
+    coordinator: resolve sprints → enqueue one unit per project
+    workers:     claim a unit → extract it → write data/shards/<run>/<unit>.json
+    merge:       combine finished shards into the standard sprint snapshot
+
+The queue is a SQLite file (EXTRACT_QUEUE_DB). Each claim carries a lease.
+A unit whose worker died is reclaimed once the lease expires. A failed unit
+is retried up to EXTRACT_MAX_ATTEMPTS times and then given up. Either way,
+a slow or failing project only occupies one worker; the others carry on.
+Units are handed out slowest first, by each project's fetch time in recent
+runs (fetch_cost.py), so the longest project does not start last; the
+snapshot keeps plan order.
+
+Usage:
+    python3 extraction_queue.py run --workers 4        # all steps on this machine
+    python3 extraction_queue.py enqueue --run-id R     # coordinator
+    python3 extraction_queue.py worker --run-id R      # on any runner sharing the queue
+    python3 extraction_queue.py merge --run-id R       # write data/sprint_count_*.json
+    python3 extraction_queue.py status --run-id R
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from config import Config
+from api_budget import merge_usage
+from fetch_cost import estimate_cost, load_fetch_costs, longest_first, predicted_makespan, record_fetch_costs
+from report_log import flush_logs, get_logger
+from run_deadline import (DEADLINE_REASON, extraction_expired, extraction_time_left, get_deadline, set_deadline,
+                          start_run_deadline)
+from run_profile import project_usage, write_run_profile
+
+log = get_logger(__name__)
+
+# How long past the extraction cut-off a worker may take to finish its last unit
+DEADLINE_GRACE_SECONDS = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    run_id TEXT NOT NULL,
+    unit_key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    entry TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_expires REAL,
+    finished_at TEXT,
+    error TEXT,
+    api_usage TEXT,
+    fetch_cost TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (run_id, unit_key)
+)
+"""
+
+
+def unit_key(entry):
+    """Snapshot key of a plan entry ("<org>_<project>")"""
+    return f"{entry['org_name']}_{entry['project_name']}"
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def connect(db_path=None):
+    """Open the queue database (autocommit; writes take explicit transactions)"""
+    db_path = db_path or Config.EXTRACT_QUEUE_DB
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute(SCHEMA)
+    # Queue files created before API usage, fetch costs and priorities were tracked
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(units)")}
+    for column, definition in (('api_usage', 'TEXT'), ('fetch_cost', 'TEXT'), ('priority', 'INTEGER NOT NULL DEFAULT 0')):
+        if column not in columns:
+            conn.execute(f"ALTER TABLE units ADD COLUMN {column} {definition}")
+    return conn
+
+
+def shard_path(run_id, key, shard_dir=None):
+    return os.path.join(shard_dir or Config.EXTRACT_SHARD_DIR, run_id, f"{key}.json")
+
+
+def enqueue_plan(run_id, plan, db_path=None):
+    """Add one unit per plan entry; units already queued for run_id are kept.
+
+    Units are claimed slowest first according to the fetch cost history.
+    """
+    order = longest_first([unit_key(entry) for entry in plan], load_fetch_costs())
+    priority = {key: rank for rank, key in enumerate(order)}
+    conn = connect(db_path)
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        for position, entry in enumerate(plan):
+            key = unit_key(entry)
+            conn.execute("INSERT OR IGNORE INTO units (run_id, unit_key, position, entry, priority) VALUES (?, ?, ?, ?, ?)",
+                         (run_id, key, position, json.dumps(entry, default=str), priority[key]))
+        conn.execute('COMMIT')
+    finally:
+        conn.close()
+    log.info(f"📥 Queued {len(plan)} extraction units for run {run_id} (claim order: {', '.join(order)})")
+
+
+def claim_unit(conn, run_id, worker_id, lease_seconds=None, max_attempts=None):
+    """Atomically claim the next runnable unit; returns a row or None.
+
+    Runnable: pending, or claimed by a worker whose lease has expired, with
+    attempts left.
+    """
+    lease_seconds = lease_seconds or Config.EXTRACT_LEASE_SECONDS
+    max_attempts = max_attempts or Config.EXTRACT_MAX_ATTEMPTS
+    now = time.time()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        row = conn.execute(
+            """SELECT * FROM units WHERE run_id = ? AND attempts < ?
+               AND (status = 'pending' OR (status = 'claimed' AND lease_expires < ?))
+               ORDER BY priority, position LIMIT 1""", (run_id, max_attempts, now)).fetchone()
+        if row:
+            conn.execute("UPDATE units SET status = 'claimed', worker = ?, attempts = attempts + 1, lease_expires = ? "
+                         "WHERE run_id = ? AND unit_key = ?", (worker_id, now + lease_seconds, run_id, row['unit_key']))
+        conn.execute('COMMIT')
+        return row
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+
+def finish_unit(conn, run_id, key, worker_id, error=None, max_attempts=None, api_usage=None, fetch_cost=None):
+    """Record a unit's outcome. A failure goes back to pending until attempts run out.
+
+    api_usage: this attempt's Azure DevOps requests (run_profile.project_usage entry);
+    it is added to the usage of earlier attempts.
+    fetch_cost: {'seconds', 'items'} of a complete result (see fetch_cost.py).
+    """
+    max_attempts = max_attempts or Config.EXTRACT_MAX_ATTEMPTS
+    if error is None:
+        status_sql = "'done'"
+    else:
+        status_sql = f"CASE WHEN attempts >= {int(max_attempts)} THEN 'failed' ELSE 'pending' END"
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        if api_usage:
+            # Counted even when another worker took over the lease: the requests were made
+            row = conn.execute("SELECT api_usage FROM units WHERE run_id = ? AND unit_key = ?", (run_id, key)).fetchone()
+            earlier = {key: json.loads(row['api_usage'])} if row and row['api_usage'] else {}
+            conn.execute("UPDATE units SET api_usage = ? WHERE run_id = ? AND unit_key = ?",
+                         (json.dumps(merge_usage(earlier, {key: api_usage})[key]), run_id, key))
+        # Only the current lease holder may finish the unit
+        conn.execute(f"UPDATE units SET status = {status_sql}, lease_expires = NULL, finished_at = ?, error = ?, "
+                     "fetch_cost = ? WHERE run_id = ? AND unit_key = ? AND worker = ? AND status = 'claimed'",
+                     (datetime.now().isoformat(timespec='seconds'), error,
+                      json.dumps(fetch_cost) if fetch_cost else None, run_id, key, worker_id))
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+
+def _attempt_usage(before, after):
+    """Requests made between two project_usage entries of the same project (None if none)"""
+    if not after:
+        return None
+    before = before or {'count': 0, 'bytes': 0, 'families': {}}
+    families = {family: count - before['families'].get(family, 0) for family, count in after['families'].items()}
+    usage = {'count': after['count'] - before['count'], 'bytes': after['bytes'] - before['bytes'],
+             'families': {family: count for family, count in families.items() if count}}
+    return usage if usage['count'] else None
+
+
+def release_worker_units(run_id, worker_id, db_path=None):
+    """Return units still claimed by a dead worker to the queue"""
+    conn = connect(db_path)
+    try:
+        conn.execute("UPDATE units SET status = 'pending', lease_expires = NULL "
+                     "WHERE run_id = ? AND worker = ? AND status = 'claimed'", (run_id, worker_id))
+    finally:
+        conn.close()
+
+
+def write_shard(run_id, key, result, shard_dir=None):
+    path = shard_path(run_id, key, shard_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def extract_unit(entry):
+    """Extract one project; returns (snapshot entry or None, fetch cost or None)"""
+    from get_sprint_count import extract_sprint_data
+    costs = {}
+    key = unit_key(entry)
+    return extract_sprint_data([entry], costs).get(key), costs.get(key)
+
+
+def run_worker(run_id, worker_id=None, db_path=None, shard_dir=None):
+    """Claim and extract units until none are runnable; returns units completed"""
+    from get_sprint_count import failure_reason
+    worker_id = worker_id or default_worker_id()
+    conn = connect(db_path)
+    completed = 0
+    try:
+        while True:
+            if extraction_expired():
+                # Unclaimed units stay pending; merge_shards marks them timed out
+                log.warning(f"⏰ [{worker_id}] Run deadline reached; not claiming more units")
+                break
+            row = claim_unit(conn, run_id, worker_id)
+            if row is None:
+                break
+            key = row['unit_key']
+            log.info(f"🔧 [{worker_id}] Extracting {key} (attempt {row['attempts'] + 1})")
+            started = time.perf_counter()
+            # This process may have tried the unit before; only this attempt's requests are added
+            usage_before = project_usage().get(key)
+            try:
+                entry = json.loads(row['entry'])
+                result, fetch_cost = extract_unit(entry)
+                error = None if result else failure_reason(entry['org_name'])
+            except Exception as e:
+                result, fetch_cost, error = None, None, f"{type(e).__name__}: {e}"
+            if result:
+                write_shard(run_id, key, result, shard_dir)
+                completed += 1
+            finish_unit(conn, run_id, key, worker_id, error, api_usage=_attempt_usage(usage_before, project_usage().get(key)),
+                        fetch_cost=fetch_cost)
+            outcome = f"failed ({error})" if error else f"{result['total_items']} items"
+            (log.warning if error else log.info)(f"   {'❌' if error else '✅'} [{worker_id}] {key}: {outcome} in {time.perf_counter() - started:.1f}s")
+            # One unit's lines at a time, so concurrent workers do not interleave mid-unit
+            flush_logs()
+    finally:
+        conn.close()
+    if completed:
+        # Requests made in this worker process are not in the coordinator's profile
+        write_run_profile('extract_worker')
+    return completed
+
+
+def queue_status(run_id, db_path=None):
+    """{status: count} for run_id"""
+    conn = connect(db_path)
+    try:
+        rows = conn.execute("SELECT status, COUNT(*) AS n FROM units WHERE run_id = ? GROUP BY status", (run_id,))
+        return {row['status']: row['n'] for row in rows}
+    finally:
+        conn.close()
+
+
+def unit_api_usage(run_id, db_path=None):
+    """Azure DevOps usage recorded by workers: {unit key: project_usage entry}"""
+    conn = connect(db_path)
+    try:
+        rows = conn.execute("SELECT unit_key, api_usage FROM units WHERE run_id = ? AND api_usage IS NOT NULL",
+                            (run_id,)).fetchall()
+    finally:
+        conn.close()
+    return {row['unit_key']: json.loads(row['api_usage']) for row in rows}
+
+
+def merge_shards(run_id, db_path=None, shard_dir=None):
+    """Combine finished shards in plan order.
+
+    Returns (sprint_data, missing) where missing lists unit keys without a
+    result; those are in sprint_data as partial-marked placeholders. The
+    units' fetch costs are added to the fetch cost history.
+    """
+    from get_sprint_count import mark_failed_projects
+    conn = connect(db_path)
+    try:
+        rows = conn.execute("SELECT unit_key, entry, status, error, fetch_cost FROM units WHERE run_id = ? "
+                            "ORDER BY position", (run_id,)).fetchall()
+    finally:
+        conn.close()
+    sprint_data, missing, reasons = {}, [], {}
+    for row in rows:
+        path = shard_path(run_id, row['unit_key'], shard_dir)
+        if row['status'] == 'done' and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                sprint_data[row['unit_key']] = json.load(f)
+        else:
+            missing.append(row['unit_key'])
+            if row['status'] != 'failed' and extraction_expired():
+                reasons[row['unit_key']] = DEADLINE_REASON
+            else:
+                reasons[row['unit_key']] = row['error'] or f"extraction unit {row['status']}"
+            log.warning(f"   ⚠️ No result for {row['unit_key']} ({row['status']}{': ' + row['error'] if row['error'] else ''})")
+    mark_failed_projects(sprint_data, [json.loads(row['entry']) for row in rows], reasons)
+    record_fetch_costs({row['unit_key']: json.loads(row['fetch_cost']) for row in rows if row['fetch_cost']}, run_id)
+    return sprint_data, missing
+
+
+def _log_predicted_makespan(plan, workers):
+    """Compare slowest-first and plan-order finish times, when every project has history"""
+    history = load_fetch_costs()
+    estimates = {unit_key(entry): estimate_cost(history, unit_key(entry)) for entry in plan}
+    if workers < 2 or not all(estimates.values()):
+        return
+    seconds = {key: estimate['seconds'] for key, estimate in estimates.items()}
+    ordered = [seconds[key] for key in longest_first(list(seconds), history)]
+    log.info(f"📐 Predicted extraction time on {workers} workers: {predicted_makespan(ordered, workers):.1f}s "
+             f"slowest first ({predicted_makespan(list(seconds.values()), workers):.1f}s in plan order)")
+
+
+def _worker_process(run_id, worker_id, db_path, shard_dir, deadline):
+    # Spawned workers share the coordinator's deadline rather than starting their own
+    set_deadline(deadline)
+    run_worker(run_id, worker_id, db_path, shard_dir)
+
+
+def run_sharded_extraction(plan, workers=None, run_id=None, db_path=None, shard_dir=None):
+    """Enqueue plan, extract it with local worker processes and merge.
+
+    Returns (sprint_data, missing). Workers still running DEADLINE_GRACE_SECONDS
+    after the run deadline's extraction cut-off are stopped (see run_deadline.py).
+    """
+    import multiprocessing
+    workers = max(1, min(workers or Config.EXTRACT_WORKERS, len(plan)))
+    run_id = run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+    enqueue_plan(run_id, plan, db_path)
+    _log_predicted_makespan(plan, workers)
+    # Workers write to the same console; get our lines out first
+    flush_logs()
+
+    # spawn: workers must not inherit the parent's open HTTP connections
+    context = multiprocessing.get_context('spawn')
+    processes = []
+    for index in range(workers):
+        worker_id = f"{socket.gethostname()}-{os.getpid()}-w{index}"
+        process = context.Process(target=_worker_process, args=(run_id, worker_id, db_path, shard_dir, get_deadline()))
+        process.start()
+        processes.append((worker_id, process))
+    log.info(f"👷 {workers} extraction workers started for run {run_id}")
+
+    for worker_id, process in processes:
+        time_left = extraction_time_left()
+        process.join(None if time_left is None else max(0, time_left) + DEADLINE_GRACE_SECONDS)
+        if process.is_alive():
+            log.warning(f"   ⏰ Worker {worker_id} still running at the run deadline; stopping it")
+            process.terminate()
+            process.join()
+        if process.exitcode != 0:
+            log.warning(f"   ⚠️ Worker {worker_id} exited with code {process.exitcode}; requeueing its unit")
+            release_worker_units(run_id, worker_id, db_path)
+    # Pick up anything a crashed worker left behind
+    if queue_status(run_id, db_path).get('pending'):
+        run_worker(run_id, f"{socket.gethostname()}-{os.getpid()}-sweep", db_path, shard_dir)
+
+    return merge_shards(run_id, db_path, shard_dir)
+
+
+def _resolve_plan():
+    from get_sprint_count import resolve_sprints
+    return resolve_sprints()
+
+
+def _save(sprint_data, missing):
+    from get_sprint_count import print_sprint_summary, save_sprint_data
+    if len(missing) == len(sprint_data):
+        log.error("❌ No sprint data extracted")
+        return None
+    output_file = save_sprint_data(sprint_data)
+    print_sprint_summary(sprint_data)
+    if missing:
+        log.warning(f"⚠️ Snapshot is missing {len(missing)} project(s): {', '.join(missing)}")
+    return output_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sharded work item extraction through a local SQLite queue')
+    parser.add_argument('command', choices=['run', 'enqueue', 'worker', 'merge', 'status'])
+    parser.add_argument('--run-id', default=None, help='queue run id (default: now, for run/enqueue)')
+    parser.add_argument('--workers', type=int, default=None, help='local worker processes for "run"')
+    parser.add_argument('--worker-id', default=None, help='worker name (default: host-pid)')
+    args = parser.parse_args()
+
+    if args.command in ('worker', 'merge', 'status') and not args.run_id:
+        parser.error(f"{args.command} needs --run-id")
+    run_id = args.run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+    if args.command in ('run', 'worker'):
+        start_run_deadline()
+
+    if args.command == 'run':
+        return _save(*run_sharded_extraction(_resolve_plan(), args.workers, run_id)) is not None
+    if args.command == 'enqueue':
+        enqueue_plan(run_id, _resolve_plan())
+        log.info(f"   Start workers with: python3 extraction_queue.py worker --run-id {run_id}")
+        return True
+    if args.command == 'worker':
+        log.info(f"✅ Worker finished: {run_worker(run_id, args.worker_id)} unit(s) extracted")
+        return True
+    if args.command == 'merge':
+        return _save(*merge_shards(run_id)) is not None
+    status = queue_status(run_id)
+    log.info(f"📋 Run {run_id}: " + (', '.join(f"{n} {s}" for s, n in sorted(status.items())) or 'no units'))
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
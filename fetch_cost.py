@@ -0,0 +1,90 @@
+"""
+Fetch Cost History
+How long each project took to extract, and how many work items it had, over
+the last few runs (FETCH_COST_FILE, FETCH_COST_HISTORY_RUNS per project).
+Extraction records it; the next run uses it in two ways:
+
+- the sharded queue hands out the slowest projects first (longest processing
+  time first), so a big project does not start last and hold up the run
+  while the other workers sit idle
+- a project expected to have more than EXTRACT_DETAIL_ITEMS_PER_WORKER items
+  fetches its work item detail batches on several threads (up to
+  EXTRACT_DETAIL_MAX_WORKERS)
+
+Projects without history are scheduled first, as if they were the slowest.
+Partial results are not recorded, since their timing says little about a
+full fetch.
+"""
+
+import heapq
+import json
+import math
+import os
+import statistics
+from datetime import datetime
+from config import Config
+from report_log import get_logger
+
+log = get_logger(__name__)
+
+
+def load_fetch_costs(path=None):
+    """{project key: [{'run_id', 'seconds', 'items'}, ...]} (oldest first)"""
+    try:
+        with open(path or Config.FETCH_COST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get('projects', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def record_fetch_costs(costs, run_id=None, path=None):
+    """Add one run's {project key: {'seconds', 'items'}} to the history file.
+
+    Recording the same run_id again replaces that run's entries.
+    """
+    if not costs:
+        return
+    path = path or Config.FETCH_COST_FILE
+    run_id = run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+    history = load_fetch_costs(path)
+    for key, cost in costs.items():
+        runs = [run for run in history.get(key, []) if run['run_id'] != run_id]
+        runs.append({'run_id': run_id, 'seconds': round(cost['seconds'], 3), 'items': cost['items']})
+        history[key] = runs[-Config.FETCH_COST_HISTORY_RUNS:]
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'projects': history}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    log.debug(f"   📐 Recorded fetch cost for {len(costs)} project(s) in {path}")
+
+
+def estimate_cost(history, key):
+    """Median {'seconds', 'items'} of key's recorded runs, or None without history"""
+    runs = history.get(key)
+    if not runs:
+        return None
+    return {'seconds': statistics.median(run['seconds'] for run in runs),
+            'items': statistics.median(run['items'] for run in runs)}
+
+
+def detail_workers(estimate):
+    """Threads for a project's work item detail batches, from its estimated item count"""
+    if not estimate:
+        return 1
+    wanted = math.ceil(estimate['items'] / max(1, Config.EXTRACT_DETAIL_ITEMS_PER_WORKER))
+    return max(1, min(wanted, Config.EXTRACT_DETAIL_MAX_WORKERS))
+
+
+def longest_first(keys, history):
+    """keys reordered slowest first; keys without history go first, in their given order"""
+    estimates = {key: estimate_cost(history, key) for key in keys}
+    return sorted(keys, key=lambda key: -estimates[key]['seconds'] if estimates[key] else -math.inf)
+
+
+def predicted_makespan(seconds, workers):
+    """Finish time of durations handed out in order to the first free of `workers`"""
+    finish = [0.0] * max(1, workers)
+    for duration in seconds:
+        heapq.heapreplace(finish, finish[0] + duration)
+    return max(finish)
@@ -1,64 +1,160 @@
 import json
 import os
-from datetime import datetime
 from config import Config
+from email_budget import render_within_budget
+from html_minify import minify_html
+from report_metadata import build_report_metadata, save_report
+from report_model import build_report_model
+from report_renderers import render_json_summary, render_tasks_csv, render_text_digest
+from report_log import flush_logs, get_logger
+from run_profile import span, write_run_profile
+
+log = get_logger(__name__)
 
 def generate_compact_html_report(json_file):
     """Generate a compact HTML report optimized for email rendering"""
+    html_content, _ = generate_compact_html_report_with_metadata(json_file)
+    return html_content
+
+def generate_compact_html_report_with_metadata(json_file):
+    """Generate the compact HTML report plus its sidecar metadata (counts and content hash)"""
+    outputs = generate_report_outputs(json_file)
+    if outputs is None:
+        return None, None
+    return outputs['html'], outputs['metadata']
+
+def generate_compact_html_report_for_email(json_file, max_bytes=None):
+    """Generate the compact report degraded to fit max_bytes (UTF-8) for email delivery.
+
+    Returns (html_content, metadata, full_html_content). full_html_content is None
+    unless the body had to be degraded, in which case it holds the untrimmed report.
+    """
+    outputs = generate_report_outputs(json_file, max_bytes)
+    if outputs is None:
+        return None, None, None
+    return outputs['html'], outputs['metadata'], outputs['full_html']
+
+def generate_report_outputs(json_file, max_bytes=None):
+    """Load and aggregate the snapshot once, then render every output format from that model.
+
+    Returns a dict with 'html' (within max_bytes when given), 'metadata',
+    'full_html' (None unless the HTML was degraded), 'text', 'csv' and 'summary',
+    or None if the snapshot is unusable.
+    """
+    sprint_data = load_sprint_data(json_file)
+    if sprint_data is None:
+        return None
+    return render_report_outputs(sprint_data, max_bytes, source_json=json_file)
+
+def render_report_outputs(sprint_data, max_bytes=None, source_json=None, model=None):
+    """Render every output format from already-loaded sprint data (see generate_report_outputs).
+
+    model is the report model of sprint_data if the caller already built it.
+    """
+    if model is None:
+        with span('render.model'):
+            model = build_report_model(sprint_data)
+    
+    minify_stats = {}
+    def render(**options):
+        with span('render.html'):
+            html_content = render_compact_html(model, **options)
+        html_content, minify_stats['last'] = finalize_html(html_content)
+        return html_content
+    
+    with span('render.within_budget'):
+        budget = render_within_budget(render, max_bytes)
+    html_content = budget['html']
+    metadata = build_report_metadata(sprint_data, html_content, source_json=source_json)
+    metadata['minify'] = minify_stats['last']
+    metadata['size_budget'] = {
+        'max_bytes': max_bytes,
+        'level': budget['level'],
+        'size_bytes': budget['size_bytes'],
+        'full_size_bytes': budget['full_size_bytes'],
+        'within_budget': budget['within_budget']
+    }
+    return {
+        'html': html_content,
+        'metadata': metadata,
+        'full_html': budget['full_html'] if budget['level'] != 'full' else None,
+        'text': render_text_digest(model),
+        'csv': render_tasks_csv(model),
+        'summary': render_json_summary(model)
+    }
+
+def save_report_outputs(outputs, output_file=None):
+    """Write the HTML report (with sidecar) and its .txt / .csv / .summary.json siblings.
+
+    The untrimmed report is kept as .full.html when the body was degraded, so
+    a later step can still attach it without re-rendering.
+    """
+    html_file = save_report(outputs['html'], outputs['metadata'], output_file)
+    base, _ = os.path.splitext(html_file)
+    paths = {'html': html_file, 'full_html': None}
+    if outputs.get('full_html'):
+        paths['full_html'] = base + '.full.html'
+        with open(paths['full_html'], 'w', encoding='utf-8') as f:
+            f.write(outputs['full_html'])
+    for key, suffix in (('text', '.txt'), ('csv', '.csv'), ('summary', '.summary.json')):
+        path = base + suffix
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(outputs[key])
+        paths[key] = path
+    return paths
+
+def finalize_html(html_content):
+    """Post-process rendered HTML (minification); returns (html_content, minify_stats or None)"""
+    if not Config.HTML_MINIFY:
+        return html_content, None
+    with span('render.minify'):
+        html_content, stats = minify_html(html_content, Config.get_email_target_clients())
+    log.info(f"   🗜️ Minified report: {stats['original_bytes']:,} → {stats['minified_bytes']:,} bytes "
+             f"(saved {stats['saved_bytes']:,}, {stats['saved_percent']}%)")
+    return html_content, stats
+
+def load_sprint_data(json_file):
+    """Load and validate a sprint_count_*.json snapshot; returns None when unusable"""
     
     # Load sprint data
     try:
         with open(json_file, 'r', encoding='utf-8') as f:
             sprint_data = json.load(f)
     except Exception as e:
-        print(f"❌ Error loading JSON file: {e}")
+        log.error(f"❌ Error loading JSON file: {e}")
         return None
     
     # Validate sprint_data is not empty
     if not sprint_data:
-        print(f"❌ JSON file contains no sprint data")
+        log.error(f"❌ JSON file contains no sprint data")
         return None
     
     # Validate sprint_data structure and check for actual work items
     total_work_items = 0
     for project_key, result in sprint_data.items():
         if not isinstance(result, dict):
-            print(f"❌ Invalid data structure for project {project_key}")
+            log.error(f"❌ Invalid data structure for project {project_key}")
             return None
         if 'total_items' not in result or 'engineer_metrics' not in result:
-            print(f"❌ Missing required fields in project {project_key}")
+            log.error(f"❌ Missing required fields in project {project_key}")
             return None
         total_work_items += result.get('total_items', 0)
     
     if total_work_items == 0:
-        print(f"❌ JSON file contains no work items (all zeros)")
+        log.error(f"❌ JSON file contains no work items (all zeros)")
         return None
     
-    print(f"✅ Loaded sprint data: {len(sprint_data)} projects, {total_work_items} total work items")
-    
-    # Use sprint period from loaded JSON so header matches the data in the report
-    periods = [r.get('sprint_period') for r in sprint_data.values() if r.get('sprint_period') and r['sprint_period'].get('start_date') and r['sprint_period'].get('end_date')]
-    if periods:
-        try:
-            parsed_starts = [datetime.strptime(p['start_date'], '%d-%b-%Y') for p in periods]
-            parsed_ends = [datetime.strptime(p['end_date'], '%d-%b-%Y') for p in periods]
-            sprint_start = min(parsed_starts).strftime('%d-%b-%Y')
-            sprint_end = max(parsed_ends).strftime('%d-%b-%Y')
-        except (ValueError, TypeError):
-            sprint_start = periods[0]['start_date']
-            sprint_end = max(p['end_date'] for p in periods)
-    else:
-        overall_sprint_period = Config.get_current_sprint_period()
-        sprint_start = overall_sprint_period.get('start_date', '')
-        sprint_end = overall_sprint_period.get('end_date', '')
+    log.info(f"✅ Loaded sprint data: {len(sprint_data)} projects, {total_work_items} total work items")
     
-    # Calculate global status summary
-    global_status_counts = {}
-    for result in sprint_data.values():
-        for engineer_metrics in result['engineer_metrics'].values():
-            for state, count in engineer_metrics.get('states', {}).items():
-                category = Config.get_state_category(state)
-                global_status_counts[category] = global_status_counts.get(category, 0) + count
+    return sprint_data
+
+def render_compact_html(model, collapse_completed=False, max_tasks_per_engineer=None, include_engineer_breakdown=True):
+    """Render the compact HTML report from the aggregated report model.
+
+    The keyword options are the degradation steps used by email_budget to keep
+    large sprints under the email size limit.
+    """
+    generated_at = model['generated_at']
     
     # Generate compact HTML content with inline styles
     html_content = f"""
@@ -67,7 +163,7 @@ def generate_compact_html_report(json_file):
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Sprint Report - {datetime.now().strftime('%B %d, %Y')} - IOL Pay & VCC</title>
+    <title>Sprint Report - {generated_at.strftime('%B %d, %Y')} - {model['report_title']}</title>
     <style>
         @media only screen and (max-width: 600px) {{
             .mobile-stack {{ display: block !important; width: 100% !important; }}
@@ -82,8 +178,8 @@ def generate_compact_html_report(json_file):
         <!-- Header -->
         <tr>
             <td style="background: #0078d4; color: white; padding: 20px; text-align: center;">
-                <h1 style="margin: 0; font-size: 24px; font-weight: 600;">Sprint Report - {datetime.now().strftime('%B %d, %Y')} - IOL Pay & VCC</h1>
-                <p style="margin: 5px 0 0 0; font-size: 14px;">Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>
+                <h1 style="margin: 0; font-size: 24px; font-weight: 600;">Sprint Report - {generated_at.strftime('%B %d, %Y')} - {model['report_title']}</h1>
+                <p style="margin: 5px 0 0 0; font-size: 14px;">Generated on {generated_at.strftime('%B %d, %Y at %I:%M %p')}</p>
             </td>
         </tr>
         
@@ -95,21 +191,21 @@ def generate_compact_html_report(json_file):
                         <td style="width: 33.33%; padding: 10px; text-align: center; vertical-align: top;" class="mobile-stack">
                             <div style="background: #f8f9fa; padding: 20px; border: 2px solid #0078d4; border-radius: 8px; margin-bottom: 10px;">
                                 <h3 style="color: #333; font-size: 16px; margin: 0 0 10px 0; font-weight: 600;" class="mobile-text">Total Work Items</h3>
-                                <div style="font-size: 28px; font-weight: 700; color: #0078d4; margin-bottom: 5px;">{sum(result['total_items'] for result in sprint_data.values())}</div>
+                                <div style="font-size: 28px; font-weight: 700; color: #0078d4; margin-bottom: 5px;">{model['total_work_items']}</div>
                                 <div style="color: #333; font-size: 14px; font-weight: 500;" class="mobile-text">Across all projects</div>
                             </div>
                         </td>
                         <td style="width: 33.33%; padding: 10px; text-align: center; vertical-align: top;" class="mobile-stack">
                             <div style="background: #f8f9fa; padding: 20px; border: 2px solid #0078d4; border-radius: 8px; margin-bottom: 10px;">
                                 <h3 style="color: #333; font-size: 16px; margin: 0 0 10px 0; font-weight: 600;" class="mobile-text">Projects</h3>
-                                <div style="font-size: 28px; font-weight: 700; color: #0078d4; margin-bottom: 5px;">{len(sprint_data)}</div>
+                                <div style="font-size: 28px; font-weight: 700; color: #0078d4; margin-bottom: 5px;">{model['project_count']}</div>
                                 <div style="color: #333; font-size: 14px; font-weight: 500;" class="mobile-text">Active projects in sprint</div>
                             </div>
                         </td>
                         <td style="width: 33.33%; padding: 10px; text-align: center; vertical-align: top;" class="mobile-stack">
                             <div style="background: #f8f9fa; padding: 20px; border: 2px solid #0078d4; border-radius: 8px; margin-bottom: 10px;">
                                 <h3 style="color: #333; font-size: 16px; margin: 0 0 10px 0; font-weight: 600;" class="mobile-text">Engineers</h3>
-                                <div style="font-size: 28px; font-weight: 700; color: #0078d4; margin-bottom: 5px;">{sum(len(result['engineer_metrics']) for result in sprint_data.values())}</div>
+                                <div style="font-size: 28px; font-weight: 700; color: #0078d4; margin-bottom: 5px;">{model['engineer_count']}</div>
                                 <div style="color: #333; font-size: 14px; font-weight: 500;" class="mobile-text">Team members involved</div>
                             </div>
                         </td>
@@ -120,91 +216,14 @@ def generate_compact_html_report(json_file):
 """
     
     # Add project sections
-    for project_key, result in sprint_data.items():
-        # Extract organization and project from key (format: "IWTX_IOL_X" or "IOLPulse_VCCWallet")
-        org_project = project_key.split('_', 1)
-        if len(org_project) == 2:
-            org_name, project_id = org_project
-        else:
-            org_name = "Unknown"
-            project_id = project_key
-        
-        # Get project configuration from organizations
-        project_config = None
-        iteration_display = "Current Sprint"
-        
-        for org_key, org_config in Config.ORGANIZATIONS.items():
-            if org_config['name'] == org_name:
-                for proj_key, proj_config in org_config['projects'].items():
-                    if proj_key == project_id:
-                        project_config = proj_config
-                        break
-                break
-        
-        # Get display name and iteration info
-        display_name = project_config['project_name'] if project_config else project_id
-        tags = project_config['tags'] if project_config else []
-        tag_display = f"Filtered by: {', '.join(tags)}" if tags else "All work items"
-        
-        # Get iteration display - prefer from sprint_period in result data
-        if result.get('sprint_period'):
-            sprint_info = result['sprint_period']
-            if sprint_info.get('iteration_name'):
-                iteration_name = sprint_info['iteration_name']
-                start_date = sprint_info.get('start_date', '')
-                end_date = sprint_info.get('end_date', '')
-                iteration_display = f"{iteration_name} ({start_date} to {end_date})"
-            else:
-                start_date = sprint_info.get('start_date', '')
-                end_date = sprint_info.get('end_date', '')
-                iteration_display = f"Current Sprint ({start_date} to {end_date})"
-        else:
-            iteration_display = project_config.get('iteration_display', 'Current Sprint') if project_config else "Current Sprint"
-        
-        # Calculate status-level summary using abstraction mapping
-        status_counts = {}
-        for engineer_metrics in result['engineer_metrics'].values():
-            for state, count in engineer_metrics.get('states', {}).items():
-                category = Config.get_state_category(state)
-                status_counts[category] = status_counts.get(category, 0) + count
-        
-        # Calculate values for template placeholders
-        total_items = result['total_items']
-        
-        # Sort status counts by preferred display order first, then by count
-        preferred_order = ['In Progress', 'To Do', 'Done', 'Ready for QA', 'QA in Progress', 'Ready for Release']
-        def status_sort_key(item):
-            status, count = item
-            return (preferred_order.index(status) if status in preferred_order else len(preferred_order), -count, status)
-        sorted_status_counts = sorted(status_counts.items(), key=status_sort_key)
-        
-        # Build status summary HTML (prepend Total card)
-        status_html = ""
-        total_status = sum(count for _, count in sorted_status_counts)
-        status_html += f"""
-                        <td style=\"width: 33.33%; padding: 0; text-align: center; vertical-align: top;\">
-                            <div style=\"background: #e9f5ff; padding: 15px; border-radius: 8px; box-shadow: 0 2px 6px rgba(0,0,0,0.1); border-left: 3px solid #1976d2; min-height: 70px;\">
-                                <div style=\"font-size: 14px; font-weight: 600; color: #1976d2; margin-bottom: 8px; text-align: center;\">Total</div>
-                                <div style=\"font-size: 20px; font-weight: 700; color: #0b5cab; text-align: center;\">{total_status}</div>
-                            </div>
-                        </td>"""
-        for i, (status, count) in enumerate(sorted_status_counts):
-            cells_in_row = (i + 1)  # +1 because Total card already added at start
-            if cells_in_row % 3 == 0:
-                status_html += "</tr><tr>"
-            status_html += f"""
-                        <td style=\"width: 33.33%; padding: 0; text-align: center; vertical-align: top;\">
-                            <div style=\"background: white; padding: 15px; border-radius: 8px; box-shadow: 0 2px 6px rgba(0,0,0,0.1); border-left: 3px solid #0078d4; min-height: 70px;\">
-                                <div style=\"font-size: 14px; font-weight: 600; color: #333; margin-bottom: 8px; text-align: center;\">{status}</div>
-                                <div style=\"font-size: 20px; font-weight: 700; color: #0078d4; text-align: center;\">{count}</div>
-                            </div>
-                        </td>"""
-        # Fill remaining cells if needed (considering Total)
-        total_cells = 1 + len(sorted_status_counts)
-        remaining_cells = 3 - (total_cells % 3)
-        if remaining_cells < 3:
-            for _ in range(remaining_cells):
-                status_html += '<td style="width: 33.33%; padding: 0;"></td>'
+    for project in model['projects']:
+        display_name = project['display_name']
+        tag_display = project['tag_display']
+        iteration_display = project['iteration_display']
+        sorted_status_counts = project['status_counts']
+        total_items = project['total_items']
+        partial_notice = f'''
+                            <div style="background: #fff3cd; color: #856404; padding: 8px 15px; border-radius: 8px; font-size: 14px; font-weight: 500; border: 1px solid #ffeaa7; margin-top: 5px;" class="mobile-text">⚠️ Incomplete data: {project['partial']['reason']}</div>''' if project['partial'] else ''
         
         html_content += f"""
         <!-- Project Section: {display_name} -->
@@ -215,7 +234,7 @@ def generate_compact_html_report(json_file):
                         <td style="padding-bottom: 15px; border-bottom: 2px solid #0078d4;">
                             <h2 style="margin: 0 0 10px 0; color: #0078d4; font-size: 22px; font-weight: 600;" class="mobile-text">{display_name}</h2>
                             <div style="background: #e3f2fd; color: #1976d2; padding: 8px 15px; border-radius: 20px; font-size: 14px; font-weight: 500; display: inline-block; margin-right: 10px; margin-bottom: 5px;" class="mobile-text">{tag_display}</div>
-                            <div style="background: #f3e5f5; color: #7b1fa2; padding: 8px 15px; border-radius: 20px; font-size: 14px; font-weight: 500; display: inline-block; margin-bottom: 5px;" class="mobile-text">{iteration_display}</div>
+                            <div style="background: #f3e5f5; color: #7b1fa2; padding: 8px 15px; border-radius: 20px; font-size: 14px; font-weight: 500; display: inline-block; margin-bottom: 5px;" class="mobile-text">{iteration_display}</div>{partial_notice}
                         </td>
                     </tr>
                     <tr>
@@ -243,42 +262,39 @@ def generate_compact_html_report(json_file):
                             </div>
                         </td>
                     </tr>
+"""
+        
+        if include_engineer_breakdown:
+            html_content += """
                     <tr>
                         <td style="padding: 20px 0;">
                             <h3 style="color: #333; font-size: 18px; margin: 0 0 15px 0; font-weight: 600;" class="mobile-text">Engineer Breakdown with Task Details</h3>
                             <table style="width: 100%; border-collapse: collapse;">
 """
+        else:
+            html_content += """
+                    <tr>
+                        <td style="padding: 10px 0; font-size: 13px; color: #666;" class="mobile-text">Engineer breakdown omitted to keep this email within size limits.</td>
+                    </tr>
+"""
         
         # Generate engineer cards in compact 2x4 grid
-        engineer_list = list(result['engineer_metrics'].items())
+        engineer_list = project['engineers'] if include_engineer_breakdown else []
         
         # Generate engineer rows (mobile-friendly: 1 per row on mobile, 2 per row on desktop)
         for row_start in range(0, len(engineer_list), 2):
             html_content += "<tr>"
             for i in range(row_start, min(row_start + 2, len(engineer_list))):
-                engineer, metrics = engineer_list[i]
-                total_items = metrics.get('total_items', 0)
-                states = metrics.get('states', {})
-                
-                # Generate state breakdown with abstraction mapping
-                abstracted_engineer_states = {}
-                for state, count in states.items():
-                    category = Config.get_state_category(state)
-                    abstracted_engineer_states[category] = abstracted_engineer_states.get(category, 0) + count
-                
-                # Sort abstracted states by count (include all statuses)
-                sorted_abstracted_states = sorted(abstracted_engineer_states.items(), key=lambda x: x[1], reverse=True)
-                
-                # Calculate task completion percentage
-                completed_tasks = abstracted_engineer_states.get('Done', 0)
-                completion_percentage = round((completed_tasks / total_items * 100)) if total_items > 0 else 0
+                engineer_data = engineer_list[i]
+                engineer = engineer_data['name']
+                total_items = engineer_data['total_items']
+                sorted_abstracted_states = engineer_data['status_counts']
                 
                 # Create comprehensive task details
-                task_details = f"Total Tasks: {total_items} | Completion: {completion_percentage}%"
-                if len(sorted_abstracted_states) > 0:
-                    top_status = sorted_abstracted_states[0]
+                task_details = f"Total Tasks: {total_items} | Completion: {engineer_data['completion_percentage']}%"
+                if engineer_data['top_status']:
+                    top_status = engineer_data['top_status']
                     task_details += f" | Top Status: {top_status[0]} ({top_status[1]})"
-                
                 # Create detailed status breakdown with highlighted numbers (include all statuses)
                 status_breakdown = ""
                 # Prepend Total chip
@@ -312,42 +328,26 @@ def generate_compact_html_report(json_file):
                         </div>'''
                 
                 # Create pending-focused task lists for leadership visibility
-                tasks = metrics.get('tasks', [])
                 pending_summary = ""
                 pending_list_html = ""
                 completed_list_html = ""
-                if tasks:
-                    # Split tasks into pending (not Done) and completed (Done)
-                    pending_categories = ['To Do', 'In Progress', 'Ready for QA', 'QA in Progress', 'Ready for Release']
-                    pending_tasks = []
-                    completed_tasks = []
-                    pending_counts = {cat: 0 for cat in pending_categories}
-                    for t in tasks:
-                        cat = Config.get_state_category(t['state'])
-                        if cat == 'Done':
-                            completed_tasks.append(t)
-                        else:
-                            pending_tasks.append(t)
-                            if cat in pending_counts:
-                                pending_counts[cat] += 1
+                completed_heading = ""
+                if engineer_data['has_tasks']:
+                    pending_tasks_sorted = engineer_data['pending_tasks']
+                    completed_tasks_sorted = engineer_data['completed_tasks']
 
                     # Build pending summary like: Pending: N — In Progress 3, To Do 2, QA in Progress 1
-                    total_pending = len(pending_tasks)
-                    parts = [f"{cat} {count}" for cat, count in pending_counts.items() if count > 0]
-                    pending_summary = f"Pending: {total_pending}" + (" — " + ", ".join(parts) if parts else "")
-
-                    # Sort lists for readability
-                    def by_title(t):
-                        return t['title'].lower()
-                    pending_tasks_sorted = sorted(pending_tasks, key=by_title)
-                    completed_tasks_sorted = sorted(completed_tasks, key=by_title)
+                    parts = [f"{cat} {count}" for cat, count in engineer_data['pending_counts'].items()]
+                    pending_summary = f"Pending: {len(pending_tasks_sorted)}" + (" — " + ", ".join(parts) if parts else "")
 
                     if pending_tasks_sorted:
-                        items = [f"• {t['title']} ({Config.get_state_category(t['state'])})" for t in pending_tasks_sorted]
-                        pending_list_html = "<br>".join(items)
+                        pending_list_html = format_task_list(pending_tasks_sorted, max_tasks_per_engineer)
                     if completed_tasks_sorted:
-                        items = [f"• {t['title']} ({Config.get_state_category(t['state'])})" for t in completed_tasks_sorted]
-                        completed_list_html = "<br>".join(items)
+                        if collapse_completed:
+                            completed_heading = f"Completed ({len(completed_tasks_sorted)})"
+                        else:
+                            completed_heading = "Completed"
+                            completed_list_html = format_task_list(completed_tasks_sorted, max_tasks_per_engineer)
                 else:
                     pending_summary = "No task details available"
                 
@@ -364,7 +364,7 @@ def generate_compact_html_report(json_file):
                                     <div style="font-size: 16px; color: #1976d2; font-weight: 600; margin-bottom: 6px;" class="mobile-text">Key Tasks</div>
                                     <div style="font-size: 13px; color: #0b5cab; font-weight: 600; margin-bottom: 6px;" class="mobile-text">{pending_summary}</div>
                                     {f'<div style="font-size: 13px; color: #333; line-height: 1.4; margin-bottom: 8px;" class="mobile-text">{pending_list_html}</div>' if pending_list_html else ''}
-                                    {f'<div style="font-size: 13px; color: #2e7d32; font-weight: 600; margin-top: 4px;" class="mobile-text">Completed</div>' if completed_list_html else ''}
+                                    {f'<div style="font-size: 13px; color: #2e7d32; font-weight: 600; margin-top: 4px;" class="mobile-text">{completed_heading}</div>' if completed_heading else ''}
                                     {f'<div style="font-size: 13px; color: #333; line-height: 1.4;" class="mobile-text">{completed_list_html}</div>' if completed_list_html else ''}
                                 </div>
                             </div>
@@ -376,10 +376,12 @@ def generate_compact_html_report(json_file):
             
             html_content += "</tr>"
         
-        html_content += """
+        if include_engineer_breakdown:
+            html_content += """
                             </table>
                         </td>
-                    </tr>
+                    </tr>"""
+        html_content += """
                 </table>
             </td>
         </tr>
@@ -398,10 +400,19 @@ def generate_compact_html_report(json_file):
     
     return html_content
 
+def format_task_list(tasks, limit=None):
+    """Render task bullets joined by <br>, truncated to limit with a "+N more" line"""
+    shown = tasks if limit is None else tasks[:limit]
+    items = [f"• {t['title']} ({Config.get_state_category(t['state'])})" for t in shown]
+    hidden = len(tasks) - len(shown)
+    if hidden > 0:
+        items.append(f"+{hidden} more")
+    return "<br>".join(items)
+
 def main():
     """Main function to generate compact HTML report"""
-    print("🎨 Compact HTML Report Generator")
-    print("=" * 40)
+    log.info("🎨 Compact HTML Report Generator")
+    log.info("=" * 40)
     
     # Find the most recent sprint count file
     data_dir = 'data'
@@ -415,7 +426,7 @@ def main():
         json_files = [f for f in os.listdir('.') if f.startswith('sprint_count_') and f.endswith('.json')]
     
     if not json_files:
-        print("❌ No sprint count files found. Run get_sprint_count.py first.")
+        log.error("❌ No sprint count files found. Run get_sprint_count.py first.")
         return
     
     # Get the latest file with full path
@@ -425,25 +436,26 @@ def main():
     if os.path.exists(os.path.join(data_dir, latest_file)):
         latest_file = os.path.join(data_dir, latest_file)
     
-    print(f"📁 Using data from: {latest_file}")
+    log.info(f"📁 Using data from: {latest_file}")
     
     # Generate compact HTML report
-    html_content = generate_compact_html_report(latest_file)
+    outputs = generate_report_outputs(latest_file)
     
-    if html_content:
-        # Save HTML report
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_file = f'compact_sprint_report_{timestamp}.html'
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+    if outputs:
+        # Save HTML report with its metadata sidecar plus text/CSV/JSON outputs
+        paths = save_report_outputs(outputs)
+        output_file = paths['html']
+        html_content = outputs['html']
         
-        print(f"✅ Compact HTML report generated: {output_file}")
-        print(f"📊 Report size: {len(html_content)} characters")
-        print(f"🌐 Open {output_file} in your browser to view the report")
-        print(f"📧 Ready to send via email!")
+        log.info(f"✅ Compact HTML report generated: {output_file}")
+        log.info(f"📊 Report size: {len(html_content)} characters")
+        log.info(f"🌐 Open {output_file} in your browser to view the report")
+        log.info(f"📄 Also written: {paths['text']}, {paths['csv']}, {paths['summary']}")
+        log.info(f"📧 Ready to send via email!")
+        write_run_profile('render')
     else:
-        print("❌ Failed to generate HTML report")
+        log.error("❌ Failed to generate HTML report")
 
 if __name__ == "__main__":
     main()
+    flush_logs()
@@ -1,8 +1,176 @@
 import requests
 import json
 import base64
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from config import Config
+from trend_history import HISTORY_FILE, record_run_aggregate
+from work_item_store import get_work_item_store, utc_now
+from run_profile import endpoint_family, project_usage, record_request, span, write_run_profile
+from api_budget import enforce_api_budget
+from fetch_cost import detail_workers, estimate_cost, load_fetch_costs, record_fetch_costs
+from circuit_breaker import (
+    CircuitOpenError, check_circuit, circuit_summary, is_transport_failure, org_from_url, org_trouble,
+    record_outcome, reset_circuits,
+)
+from report_log import flush_logs, get_logger
+from run_deadline import (
+    DEADLINE_REASON, deadline_share, extraction_expired, extraction_time_left, start_run_deadline,
+)
+
+log = get_logger(__name__)
+
+# One keep-alive session for every Azure DevOps call (TLS set up once per host)
+_http_session = None
+
+# Optional replacement for session.request(method, url, **kwargs), e.g. the
+# cassette recorder/replayer in http_cassette.py
+_transport = None
+
+# Team + iteration calendars by (organization, project, team_name):
+# (fetched_at monotonic seconds, team, iterations). The current sprint is
+# re-selected from the cached calendar on every call, so only the HTTP is cached.
+_iteration_calendars = {}
+
+# Fraction of the run deadline's extraction time that resolving sprints may use;
+# each organization gets its part of it (see resolve_sprints)
+RESOLVE_DEADLINE_SHARE = 0.5
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """An Azure DevOps call refused because the run's extraction time is used up"""
+
+def get_http_session():
+    """Shared requests.Session, created on first use"""
+    global _http_session
+    if _http_session is None:
+        _http_session = requests.Session()
+    return _http_session
+
+def set_transport(transport):
+    """Route Azure DevOps requests through transport(method, url, **kwargs); None restores the session"""
+    global _transport
+    _transport = transport
+
+def _request(method, url, **kwargs):
+    """Issue an Azure DevOps HTTP request on the shared session, recording its timing.
+
+    Every call has connect/read timeouts, capped to the time left before the
+    run deadline (see run_deadline.py). Calls are refused with DeadlineExceeded
+    once that is used up, and with CircuitOpenError while the organization's
+    circuit is open (see circuit_breaker.py).
+    """
+    org = org_from_url(url)
+    time_left = extraction_time_left()
+    if time_left is not None and time_left <= 0:
+        raise DeadlineExceeded(f"run deadline reached; not calling {org}")
+    check_circuit(org)
+    timeout = (Config.AZURE_DEVOPS_CONNECT_TIMEOUT, Config.AZURE_DEVOPS_READ_TIMEOUT)
+    if time_left is not None:
+        timeout = tuple(min(limit, time_left) for limit in timeout)
+    kwargs.setdefault('timeout', timeout)
+    started = time.perf_counter()
+    response = None
+    try:
+        response = (_transport or get_http_session().request)(method, url, **kwargs)
+        record_outcome(org, response)
+        return response
+    except requests.exceptions.RequestException as e:
+        # A call cut short by the deadline says nothing about the organization
+        if not (isinstance(e, requests.exceptions.Timeout) and extraction_expired()):
+            record_outcome(org, error=e)
+        raise
+    finally:
+        record_request(endpoint_family(url), method, response.status_code if response is not None else None,
+                       time.perf_counter() - started, len(response.content) if response is not None else 0)
+
+def clear_iteration_calendars():
+    """Drop cached team/iteration calendars (next lookup refetches)"""
+    _iteration_calendars.clear()
+
+def _get_iteration_calendar(organization, project, team_name, headers):
+    """Return (team, iterations) for a project, reusing a cached calendar while it is fresh"""
+    cache_key = (organization, project, team_name)
+    cached = _iteration_calendars.get(cache_key)
+    if cached and time.monotonic() - cached[0] < Config.ITERATION_CACHE_TTL_SECONDS:
+        _, target_team, all_iterations = cached
+        log.debug(f"   ♻️ Using cached iteration calendar for {target_team.get('name')} ({len(all_iterations)} iterations)")
+        return target_team, all_iterations
+    
+    # First, get teams for the project - try multiple API endpoints
+    teams = []
+    target_team = None
+    
+    # Try Core API first (more reliable)
+    try:
+        core_teams_url = f"{Config.AZURE_DEVOPS_BASE_URL}/{organization}/_apis/projects/{project}/teams?api-version=7.0"
+        response = _request('GET', core_teams_url, headers=headers)
+        response.raise_for_status()
+        teams_data = response.json()
+        teams = teams_data.get('value', [])
+        log.debug(f"   ✅ Found {len(teams)} teams via Core API")
+    except requests.exceptions.RequestException as e:
+        log.warning(f"   ⚠️ Core API failed: {str(e)}")
+        if is_transport_failure(e):
+            # The fallbacks are on the same unreachable host; use the cadence fallback instead
+            raise
+        # Fallback to project-scoped teams API
+        try:
+            teams_url = f"{Config.AZURE_DEVOPS_BASE_URL}/{organization}/{project}/_apis/teams?api-version=7.0"
+            response = _request('GET', teams_url, headers=headers)
+            response.raise_for_status()
+            teams_data = response.json()
+            teams = teams_data.get('value', [])
+            log.debug(f"   ✅ Found {len(teams)} teams via Teams API")
+        except requests.exceptions.RequestException as e2:
+            log.warning(f"   ⚠️ Teams API also failed: {str(e2)}")
+            if is_transport_failure(e2):
+                raise
+            # Last resort: try to get default team
+            try:
+                default_team_url = f"{Config.AZURE_DEVOPS_BASE_URL}/{organization}/{project}/_apis/core/teams?api-version=7.0"
+                response = _request('GET', default_team_url, headers=headers)
+                if response.status_code == 200:
+                    teams_data = response.json()
+                    teams = teams_data.get('value', [])
+                    log.debug(f"   ✅ Found {len(teams)} teams via Core Teams API")
+            except:
+                pass
+    
+    # Find the team by name if provided
+    if team_name:
+        for team in teams:
+            if team.get('name') == team_name:
+                target_team = team
+                break
+    
+    # Use first team if no specific team found
+    if not target_team and teams:
+        target_team = teams[0]
+    
+    if not target_team:
+        log.warning(f"   ⚠️ No team found for project {project}")
+        log.warning(f"   💡 Will use fallback iteration path from configuration")
+        return None, None
+    
+    team_id = target_team.get('id')
+    log.debug(f"   ✅ Using team: {target_team.get('name')} (ID: {team_id})")
+    
+    # Get ALL iterations for the team (not just current)
+    iterations_url = f"{Config.AZURE_DEVOPS_BASE_URL}/{organization}/{project}/{team_id}/_apis/work/teamsettings/iterations?api-version=7.0"
+    response = _request('GET', iterations_url, headers=headers)
+    response.raise_for_status()
+    iterations_data = response.json()
+    all_iterations = iterations_data.get('value', [])
+    
+    log.debug(f"   📋 Found {len(all_iterations)} total iterations/sprints")
+    
+    if not all_iterations:
+        log.warning(f"   ⚠️ No iterations found for team {target_team.get('name')}")
+        return target_team, None
+    
+    _iteration_calendars[cache_key] = (time.monotonic(), target_team, all_iterations)
+    return target_team, all_iterations
 
 def get_current_iteration(organization, project, team_name=None):
     """Fetch the iteration/sprint in which the current date lies from Azure DevOps.
@@ -19,78 +187,15 @@ def get_current_iteration(organization, project, team_name=None):
     }
     
     try:
-        # First, get teams for the project - try multiple API endpoints
-        teams = []
-        target_team = None
-        
-        # Try Core API first (more reliable)
-        try:
-            core_teams_url = f"https://dev.azure.com/{organization}/_apis/projects/{project}/teams?api-version=7.0"
-            response = requests.get(core_teams_url, headers=headers)
-            response.raise_for_status()
-            teams_data = response.json()
-            teams = teams_data.get('value', [])
-            print(f"   ✅ Found {len(teams)} teams via Core API")
-        except requests.exceptions.RequestException as e:
-            print(f"   ⚠️ Core API failed: {str(e)}")
-            # Fallback to project-scoped teams API
-            try:
-                teams_url = f"https://dev.azure.com/{organization}/{project}/_apis/teams?api-version=7.0"
-                response = requests.get(teams_url, headers=headers)
-                response.raise_for_status()
-                teams_data = response.json()
-                teams = teams_data.get('value', [])
-                print(f"   ✅ Found {len(teams)} teams via Teams API")
-            except requests.exceptions.RequestException as e2:
-                print(f"   ⚠️ Teams API also failed: {str(e2)}")
-                # Last resort: try to get default team
-                try:
-                    default_team_url = f"https://dev.azure.com/{organization}/{project}/_apis/core/teams?api-version=7.0"
-                    response = requests.get(default_team_url, headers=headers)
-                    if response.status_code == 200:
-                        teams_data = response.json()
-                        teams = teams_data.get('value', [])
-                        print(f"   ✅ Found {len(teams)} teams via Core Teams API")
-                except:
-                    pass
-        
-        # Find the team by name if provided
-        if team_name:
-            for team in teams:
-                if team.get('name') == team_name:
-                    target_team = team
-                    break
-        
-        # Use first team if no specific team found
-        if not target_team and teams:
-            target_team = teams[0]
-        
-        if not target_team:
-            print(f"   ⚠️ No team found for project {project}")
-            print(f"   💡 Will use fallback iteration path from configuration")
-            return None
-        
-        team_id = target_team.get('id')
-        print(f"   ✅ Using team: {target_team.get('name')} (ID: {team_id})")
-        
-        # Get ALL iterations for the team (not just current)
-        iterations_url = f"https://dev.azure.com/{organization}/{project}/{team_id}/_apis/work/teamsettings/iterations?api-version=7.0"
-        response = requests.get(iterations_url, headers=headers)
-        response.raise_for_status()
-        iterations_data = response.json()
-        all_iterations = iterations_data.get('value', [])
-        
-        print(f"   📋 Found {len(all_iterations)} total iterations/sprints")
-        
+        target_team, all_iterations = _get_iteration_calendar(organization, project, team_name, headers)
         if not all_iterations:
-            print(f"   ⚠️ No iterations found for team {target_team.get('name')}")
             return None
         
         # Find the iteration in which the current date lies (start <= today <= end)
         today = datetime.now().date()
         current_iteration = None
 
-        print(f"   📋 Finding sprint in which current date ({today}) lies...")
+        log.debug(f"   📋 Finding sprint in which current date ({today}) lies...")
         for iteration in all_iterations:
             attrs = iteration.get('attributes', {})
             start_date_str = attrs.get('startDate')
@@ -99,7 +204,7 @@ def get_current_iteration(organization, project, team_name=None):
             iteration_path = iteration.get('path', 'Unknown')
 
             if not start_date_str or not end_date_str:
-                print(f"      ⚠️ Skipping {iteration_name} (missing dates)")
+                log.debug(f"      ⚠️ Skipping {iteration_name} (missing dates)")
                 continue
 
             # Parse dates from Azure DevOps format
@@ -110,7 +215,7 @@ def get_current_iteration(organization, project, team_name=None):
                     else:
                         start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
                 except Exception as e:
-                    print(f"      ⚠️ Skipping {iteration_name} (date parse error: {e})")
+                    log.debug(f"      ⚠️ Skipping {iteration_name} (date parse error: {e})")
                     continue
             else:
                 continue
@@ -122,7 +227,7 @@ def get_current_iteration(organization, project, team_name=None):
                     else:
                         end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
                 except Exception as e:
-                    print(f"      ⚠️ Skipping {iteration_name} (end date parse error: {e})")
+                    log.debug(f"      ⚠️ Skipping {iteration_name} (end date parse error: {e})")
                     continue
             else:
                 continue
@@ -136,29 +241,230 @@ def get_current_iteration(organization, project, team_name=None):
                     'start_date': start_date_str,
                     'end_date': end_date_str
                 }
-                print(f"   ✅ Current date lies in: {iteration_name} ({start_date} to {end_date})")
-                print(f"      📋 Path: {iteration_path}")
+                log.debug(f"   ✅ Current date lies in: {iteration_name} ({start_date} to {end_date})")
+                log.debug(f"      📋 Path: {iteration_path}")
                 break
             else:
-                print(f"      📅 {iteration_name} ({start_date} to {end_date})")
+                log.debug(f"      📅 {iteration_name} ({start_date} to {end_date})")
 
         if not current_iteration:
-            print(f"   ⚠️ No iteration contains current date ({today}). Will use cadence fallback if configured.")
+            log.warning(f"   ⚠️ No iteration contains current date ({today}). Will use cadence fallback if configured.")
         else:
-            print(f"   ✅ Selected iteration: {current_iteration['name']} (Path: {current_iteration['path']})")
+            log.info(f"   ✅ Selected iteration: {current_iteration['name']} (Path: {current_iteration['path']})")
         return current_iteration
     except requests.exceptions.RequestException as e:
-        print(f"   ⚠️ Error fetching iteration from Azure DevOps: {str(e)}")
+        log.warning(f"   ⚠️ Error fetching iteration from Azure DevOps: {str(e)}")
         return None
     except Exception as e:
-        print(f"   ⚠️ Unexpected error fetching iteration: {str(e)}")
+        log.warning(f"   ⚠️ Unexpected error fetching iteration: {str(e)}")
         return None
 
-def get_work_item_count(organization, project, tags=None, sprint_start=None, sprint_end=None, iteration_path=None):
+def get_current_sprint_period(project_key=None):
+    """Get the current sprint period for a specific project or all projects.
+    
+    If project_key is provided, returns sprint period for that project.
+    If not provided, returns a default period (for backward compatibility).
+    """
+    if project_key:
+        # Get project-specific sprint period
+        return get_project_sprint_period(project_key)
+    
+    # Default: Return earliest start and latest end across all projects
+    # This is used for backward compatibility
+    all_periods = []
+    for org_name, proj_key, proj_config in Config.get_org_config().iter_projects():
+        period = get_project_sprint_period(proj_key, org_name)
+        if period:
+            all_periods.append(period)
+    
+    # Filter out fallback periods that don't have dates
+    periods_with_dates = [
+        p for p in all_periods 
+        if not p.get('fallback') and 'start_datetime' in p and 'end_datetime' in p
+    ]
+    
+    if periods_with_dates:
+        earliest_start = min(p['start_datetime'] for p in periods_with_dates)
+        latest_end = max(p['end_datetime'] for p in periods_with_dates)
+        
+        start_date_str = earliest_start.strftime('%d-%b-%Y')
+        end_date_str = latest_end.strftime('%d-%b-%Y')
+        start_iso = earliest_start.strftime('%Y-%m-%dT00:00:00')
+        end_iso = latest_end.strftime('%Y-%m-%dT23:59:59')
+        
+        return {
+            'start_date': start_date_str,
+            'end_date': end_date_str,
+            'start_datetime': earliest_start,
+            'end_datetime': latest_end,
+            'start_iso': start_iso,
+            'end_iso': end_iso
+        }
+    
+    # If we didn't find any non-fallback periods with dates,
+    # try any periods that at least have dates (including fallback-derived ones)
+    any_with_dates = [
+        p for p in all_periods
+        if 'start_datetime' in p and 'end_datetime' in p
+    ]
+    if any_with_dates:
+        earliest_start = min(p['start_datetime'] for p in any_with_dates)
+        latest_end = max(p['end_datetime'] for p in any_with_dates)
+
+        start_date_str = earliest_start.strftime('%d-%b-%Y')
+        end_date_str = latest_end.strftime('%d-%b-%Y')
+        start_iso = earliest_start.strftime('%Y-%m-%dT00:00:00')
+        end_iso = latest_end.strftime('%Y-%m-%dT23:59:59')
+
+        return {
+            'start_date': start_date_str,
+            'end_date': end_date_str,
+            'start_datetime': earliest_start,
+            'end_datetime': latest_end,
+            'start_iso': start_iso,
+            'end_iso': end_iso
+        }
+
+    # Fallback to old hardcoded dates
+    sprint_start = datetime(2024, 10, 14)
+    sprint_end = datetime(2024, 10, 27)
+    
+    start_date_str = sprint_start.strftime('%d-%b-%Y')
+    end_date_str = sprint_end.strftime('%d-%b-%Y')
+    start_iso = sprint_start.strftime('%Y-%m-%dT00:00:00')
+    end_iso = sprint_end.strftime('%Y-%m-%dT23:59:59')
+    
+    return {
+        'start_date': start_date_str,
+        'end_date': end_date_str,
+        'start_datetime': sprint_start,
+        'end_datetime': sprint_end,
+        'start_iso': start_iso,
+        'end_iso': end_iso
+    }
+
+def get_project_sprint_period(project_key, org_name=None):
+    """Get sprint period for a specific project based on current iteration from Azure DevOps.
+
+    org_name picks the organization when the project key is defined in more than one.
+    """
+    # Find project configuration
+    org_config = Config.get_org_config()
+    org_name = org_name or org_config.org_for_project(project_key)
+    project_config = org_config.find_project(org_name, project_key)
+    
+    if not project_config:
+        return None
+    
+    # Fetch current iteration
+    with span('azure.get_current_iteration', project=project_key, org=org_name):
+        iteration_info = get_current_iteration(org_name, project_key, project_config.get('team_name'))
+    
+    if iteration_info and iteration_info.get('start_date') and iteration_info.get('end_date'):
+        # Use dates from Azure DevOps
+        start_date = iteration_info['start_date']
+        end_date = iteration_info['end_date']
+        
+        # Parse dates from Azure DevOps format (ISO 8601)
+        if isinstance(start_date, str):
+            # Handle both '2024-10-14T00:00:00Z' and '2024-10-14' formats
+            try:
+                if 'T' in start_date:
+                    start_date = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
+                else:
+                    start_date = datetime.strptime(start_date, '%Y-%m-%d')
+            except:
+                start_date = datetime.strptime(start_date.split('T')[0], '%Y-%m-%d')
+            
+            # Convert to datetime object if it's a date
+            if hasattr(start_date, 'date'):
+                start_date = datetime.combine(start_date.date(), datetime.min.time())
+        elif not isinstance(start_date, datetime):
+            # If it's already a date object, convert to datetime
+            start_date = datetime.combine(start_date, datetime.min.time())
+        
+        if isinstance(end_date, str):
+            try:
+                if 'T' in end_date:
+                    end_date = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+                else:
+                    end_date = datetime.strptime(end_date, '%Y-%m-%d')
+            except:
+                end_date = datetime.strptime(end_date.split('T')[0], '%Y-%m-%d')
+            
+            if hasattr(end_date, 'date'):
+                end_date = datetime.combine(end_date.date(), datetime.min.time())
+        elif not isinstance(end_date, datetime):
+            end_date = datetime.combine(end_date, datetime.min.time())
+        
+        start_date_str = start_date.strftime('%d-%b-%Y')
+        end_date_str = end_date.strftime('%d-%b-%Y')
+        start_iso = start_date.strftime('%Y-%m-%dT00:00:00')
+        end_iso = end_date.strftime('%Y-%m-%dT23:59:59')
+        
+        return {
+            'start_date': start_date_str,
+            'end_date': end_date_str,
+            'start_datetime': start_date,
+            'end_datetime': end_date,
+            'start_iso': start_iso,
+            'end_iso': end_iso,
+            'iteration_path': iteration_info.get('path'),
+            'iteration_name': iteration_info.get('name')
+        }
+    
+    # Fallback: compute the sprint in which the current date lies, using cadence.
+    # Use configured iteration_path only as a base template (replace last segment with current iteration).
+    cadence = project_config.get('fallback_cadence')
+    base_iteration_path = project_config.get('iteration_path')
+    if cadence:
+        try:
+            anchor_start = datetime.strptime(cadence['anchor_start'], '%Y-%m-%d')
+            duration_days = int(cadence['duration_weeks']) * 7
+            name_prefix = cadence.get('name_prefix', '')
+            anchor_number = int(cadence['anchor_number'])
+            today = datetime.now()
+            # Sprint in which current date lies: find n such that today is in [anchor + n*duration, anchor + (n+1)*duration - 1]
+            delta_days = (today.date() - anchor_start.date()).days
+            n = max(0, delta_days // duration_days)
+            current_start = anchor_start + timedelta(days=n * duration_days)
+            current_end = current_start + timedelta(days=duration_days - 1)
+            current_number = anchor_number + n
+            iteration_name = f"{name_prefix}{current_number}"
+            # Build full iteration_path from base (e.g. IOL_X\...\Iteration-29 -> IOL_X\...\Iteration-32)
+            iteration_path = None
+            if base_iteration_path and '\\' in base_iteration_path:
+                parts = base_iteration_path.split('\\')
+                parts[-1] = iteration_name
+                iteration_path = '\\'.join(parts)
+            return {
+                'start_date': current_start.strftime('%d-%b-%Y'),
+                'end_date': current_end.strftime('%d-%b-%Y'),
+                'start_datetime': current_start,
+                'end_datetime': current_end,
+                'start_iso': current_start.strftime('%Y-%m-%dT00:00:00'),
+                'end_iso': current_end.strftime('%Y-%m-%dT23:59:59'),
+                'iteration_path': iteration_path,
+                'iteration_name': iteration_name,
+                'fallback': True
+            }
+        except Exception as e:
+            log.warning(f"   ⚠️ Error computing sprint from cadence: {e}")
+    # If no cadence or calculation failed, use configured path as-is
+    if base_iteration_path:
+        return {
+            'iteration_path': base_iteration_path,
+            'iteration_name': base_iteration_path.split('\\')[-1],
+            'fallback': True
+        }
+    return None
+
+def get_work_item_count(organization, project, tags=None, sprint_start=None, sprint_end=None, iteration_path=None,
+                        detail_workers=1):
     """Get work item count for a specific project and sprint period"""
     
     if not Config.AZURE_DEVOPS_PAT:
-        print("❌ Azure DevOps PAT not configured")
+        log.error("❌ Azure DevOps PAT not configured")
         return None
     
     # Encode PAT for Basic Auth
@@ -168,7 +474,7 @@ def get_work_item_count(organization, project, tags=None, sprint_start=None, spr
         'Content-Type': 'application/json'
     }
     
-    print(f"\n🔍 Querying {organization}/{project} project...")
+    log.info(f"\n🔍 Querying {organization}/{project} project...")
     
     wiql_query = {
         'query': f"""
@@ -185,7 +491,7 @@ def get_work_item_count(organization, project, tags=None, sprint_start=None, spr
         wiql_query["query"] += f"""
         AND [System.IterationPath] = '{iteration_path}'
         """
-        print(f"   📋 Iteration path filtering (exact match): {iteration_path}")
+        log.debug(f"   📋 Iteration path filtering (exact match): {iteration_path}")
         
         # If we also have date range, add it as additional filter for safety
         if sprint_start and sprint_end:
@@ -195,7 +501,7 @@ def get_work_item_count(organization, project, tags=None, sprint_start=None, spr
         AND [System.ChangedDate] >= '{date_start}'
         AND [System.ChangedDate] <= '{date_end}'
         """
-            print(f"   📅 Also using date filtering: {date_start} to {date_end}")
+            log.debug(f"   📅 Also using date filtering: {date_start} to {date_end}")
     elif sprint_start and sprint_end:
         # Add date range filtering as fallback (when no iteration path available)
         date_start = sprint_start.split('T', 1)[0]
@@ -204,10 +510,10 @@ def get_work_item_count(organization, project, tags=None, sprint_start=None, spr
         AND [System.ChangedDate] >= '{date_start}'
         AND [System.ChangedDate] <= '{date_end}'
         """
-        print(f"   📅 Date filtering: {date_start} to {date_end}")
+        log.debug(f"   📅 Date filtering: {date_start} to {date_end}")
     else:
         # No filtering - will get all work items (not recommended but handled)
-        print(f"   ⚠️ No iteration path or date range specified - fetching all work items")
+        log.warning(f"   ⚠️ No iteration path or date range specified - fetching all work items")
 
     # Add tag filtering if specified
     if tags:
@@ -217,29 +523,29 @@ def get_work_item_count(organization, project, tags=None, sprint_start=None, spr
 
         if tag_conditions:
             wiql_query["query"] += f" AND ({' OR '.join(tag_conditions)})"
-            print(f"   🏷️ Filtering by tags: {', '.join(tags)}")
+            log.debug(f"   🏷️ Filtering by tags: {', '.join(tags)}")
     else:
-        print(f"   ℹ️ No tags specified for filtering")
+        log.debug(f"   ℹ️ No tags specified for filtering")
 
     # Execute WIQL query
-    wiql_url = f"https://dev.azure.com/{organization}/{project}/_apis/wit/wiql?api-version=7.0"
+    wiql_url = f"{Config.AZURE_DEVOPS_BASE_URL}/{organization}/{project}/_apis/wit/wiql?api-version=7.0"
     
     # Print the full query for debugging
-    print(f"   🔍 Full WIQL Query:")
-    print(f"      {wiql_query['query']}")
+    log.debug(f"   🔍 Full WIQL Query:")
+    log.debug(f"      {wiql_query['query']}")
     
     try:
-        response = requests.post(wiql_url, headers=headers, json=wiql_query)
+        response = _request('POST', wiql_url, headers=headers, json=wiql_query)
         response.raise_for_status()
         
         wiql_result = response.json()
         work_item_ids = [item['id'] for item in wiql_result.get('workItems', [])]
         
-        print(f"   📊 Found {len(work_item_ids)} work items")
+        log.info(f"   📊 Found {len(work_item_ids)} work items")
         
         # If no work items found with exact match and we have iteration path, try UNDER clause
         if not work_item_ids and iteration_path:
-            print(f"   ⚠️ No work items found with exact match, trying UNDER clause...")
+            log.warning(f"   ⚠️ No work items found with exact match, trying UNDER clause...")
             wiql_query_under = wiql_query.copy()
             # Replace the iteration path condition with UNDER
             original_query = wiql_query_under["query"]
@@ -250,21 +556,21 @@ def get_work_item_count(organization, project, tags=None, sprint_start=None, spr
             original_query = re.sub(r'AND \[System\.ChangedDate\].*?\n', '', original_query)
             # Add UNDER clause
             wiql_query_under["query"] = original_query + f"\n        AND [System.IterationPath] UNDER '{iteration_path}'"
-            print(f"   🔍 Trying WIQL Query with UNDER:")
-            print(f"      {wiql_query_under['query']}")
+            log.debug(f"   🔍 Trying WIQL Query with UNDER:")
+            log.debug(f"      {wiql_query_under['query']}")
             
             try:
-                response_under = requests.post(wiql_url, headers=headers, json=wiql_query_under)
+                response_under = _request('POST', wiql_url, headers=headers, json=wiql_query_under)
                 response_under.raise_for_status()
                 wiql_result_under = response_under.json()
                 work_item_ids = [item['id'] for item in wiql_result_under.get('workItems', [])]
-                print(f"   📊 Found {len(work_item_ids)} work items with UNDER clause")
+                log.info(f"   📊 Found {len(work_item_ids)} work items with UNDER clause")
             except Exception as e:
-                print(f"   ⚠️ UNDER clause also failed: {str(e)}")
+                log.warning(f"   ⚠️ UNDER clause also failed: {str(e)}")
         
         # If still no work items and we have iteration path, try date-only filtering as fallback
         if not work_item_ids and iteration_path and sprint_start and sprint_end:
-            print(f"   ⚠️ Iteration path '{iteration_path}' may not exist, trying date-only filtering...")
+            log.warning(f"   ⚠️ Iteration path '{iteration_path}' may not exist, trying date-only filtering...")
             date_start = sprint_start.split('T', 1)[0]
             date_end = sprint_end.split('T', 1)[0]
             wiql_query_date = {
@@ -284,24 +590,24 @@ def get_work_item_count(organization, project, tags=None, sprint_start=None, spr
                     wiql_query_date["query"] += f" AND ({' OR '.join(tag_conditions)})"
             
             try:
-                response_date = requests.post(wiql_url, headers=headers, json=wiql_query_date)
+                response_date = _request('POST', wiql_url, headers=headers, json=wiql_query_date)
                 response_date.raise_for_status()
                 wiql_result_date = response_date.json()
                 work_item_ids = [item['id'] for item in wiql_result_date.get('workItems', [])]
-                print(f"   📊 Found {len(work_item_ids)} work items with date-only filtering")
+                log.info(f"   📊 Found {len(work_item_ids)} work items with date-only filtering")
             except Exception as e:
-                print(f"   ⚠️ Date-only filtering also failed: {str(e)}")
+                log.warning(f"   ⚠️ Date-only filtering also failed: {str(e)}")
         
         if not work_item_ids:
             if iteration_path:
-                print(f"   ⚠️ No work items found for iteration path: {iteration_path}")
-                print(f"   💡 The iteration path may not exist in Azure DevOps. Please verify it exists.")
+                log.warning(f"   ⚠️ No work items found for iteration path: {iteration_path}")
+                log.warning(f"   💡 The iteration path may not exist in Azure DevOps. Please verify it exists.")
             else:
-                print(f"   ⚠️ No work items found for the specified criteria")
+                log.warning(f"   ⚠️ No work items found for the specified criteria")
             return {'total_items': 0, 'engineer_metrics': {}}
         
         # Get detailed work item information
-        return get_engineer_metrics(organization, project, work_item_ids, headers)
+        return get_engineer_metrics(organization, project, work_item_ids, headers, detail_workers)
         
     except requests.exceptions.RequestException as e:
         error_message = str(e)
@@ -313,10 +619,10 @@ def get_work_item_count(organization, project, tags=None, sprint_start=None, spr
                 error_message_detail = error_response.get('message', '')
                 # Check if it's an iteration path error
                 if 'iteration path does not exist' in error_message_detail.lower() or 'TF51011' in str(error_response):
-                    print(f"   ⚠️ Iteration path does not exist: {iteration_path}")
+                    log.warning(f"   ⚠️ Iteration path does not exist: {iteration_path}")
                     # Try date-only filtering as fallback
                     if iteration_path and sprint_start and sprint_end:
-                        print(f"   💡 Falling back to date-only filtering...")
+                        log.warning(f"   💡 Falling back to date-only filtering...")
                         date_start = sprint_start.split('T', 1)[0]
                         date_end = sprint_end.split('T', 1)[0]
                         wiql_query_date = {
@@ -336,51 +642,156 @@ def get_work_item_count(organization, project, tags=None, sprint_start=None, spr
                                 wiql_query_date["query"] += f" AND ({' OR '.join(tag_conditions)})"
                         
                         try:
-                            response_date = requests.post(wiql_url, headers=headers, json=wiql_query_date)
+                            response_date = _request('POST', wiql_url, headers=headers, json=wiql_query_date)
                             response_date.raise_for_status()
                             wiql_result_date = response_date.json()
                             work_item_ids = [item['id'] for item in wiql_result_date.get('workItems', [])]
-                            print(f"   ✅ Found {len(work_item_ids)} work items using date-only filtering")
+                            log.info(f"   ✅ Found {len(work_item_ids)} work items using date-only filtering")
                             if work_item_ids:
-                                return get_engineer_metrics(organization, project, work_item_ids, headers)
+                                return get_engineer_metrics(organization, project, work_item_ids, headers,
+                                                            detail_workers)
                         except Exception as e2:
-                            print(f"   ⚠️ Date-only fallback also failed: {str(e2)}")
+                            log.warning(f"   ⚠️ Date-only fallback also failed: {str(e2)}")
                     return {'total_items': 0, 'engineer_metrics': {}}
             except:
                 pass
         
-        print(f"   ❌ Error querying work items: {error_message}")
+        log.error(f"   ❌ Error querying work items: {error_message}")
         if error_response:
-            print(f"   ❌ Error details: {error_response}")
+            log.error(f"   ❌ Error details: {error_response}")
         elif hasattr(e, 'response') and e.response is not None:
-            print(f"   ❌ Error response: {e.response.text}")
+            log.error(f"   ❌ Error response: {e.response.text}")
         return None
 
-def get_engineer_metrics(organization, project, work_item_ids, headers):
-    """Get engineer-wise metrics for work items"""
+def _query_changed_ids(organization, project, headers, since):
+    """Ids of work items in the project changed since `since` (UTC), or None if unknown"""
+    wiql_url = f"{Config.AZURE_DEVOPS_BASE_URL}/{organization}/{project}/_apis/wit/wiql?timePrecision=true&api-version=7.0"
+    wiql_query = {
+        'query': f"""
+        SELECT [System.Id]
+        FROM WorkItems 
+        WHERE [System.TeamProject] = @project
+        AND [System.ChangedDate] >= '{since.strftime('%Y-%m-%dT%H:%M:%SZ')}'
+        """
+    }
+    try:
+        response = _request('POST', wiql_url, headers=headers, json=wiql_query)
+        response.raise_for_status()
+        return {item['id'] for item in response.json().get('workItems', [])}
+    except requests.exceptions.RequestException as e:
+        log.warning(f"   ⚠️ Could not query changed work items, refetching all: {str(e)}")
+        return None
+
+def _batch_outcomes(fetch, batches, workers=1, stop=None):
+    """Yield (result, error) of fetch(batch) for each batch, in order.
+
+    With workers > 1 up to that many batches are fetched at once on threads.
+    Once an error matches stop(error), batches not started yet are skipped and
+    yield (None, None); batches already fetched or in flight keep their outcome.
+    """
+    def outcome(batch):
+        try:
+            return fetch(batch), None
+        except requests.exceptions.RequestException as e:
+            return None, e
+
+    stop = stop or (lambda error: False)
+    if workers <= 1:
+        stopped = False
+        for batch in batches:
+            if stopped:
+                yield None, None
+                continue
+            result, error = outcome(batch)
+            stopped = error is not None and stop(error)
+            yield result, error
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(outcome, batch) for batch in batches]
+        try:
+            for future in futures:
+                if future.cancelled():
+                    yield None, None
+                    continue
+                result, error = future.result()
+                if error is not None and stop(error):
+                    for pending in futures:
+                        pending.cancel()
+                yield result, error
+        finally:
+            for future in futures:
+                future.cancel()
+
+def get_engineer_metrics(organization, project, work_item_ids, headers, detail_workers=1):
+    """Get engineer-wise metrics for work items.
+
+    detail_workers > 1 fetches that many detail batches at once (see fetch_cost.py).
+    """
+    
+    # With the work item store enabled (daemon mode), only fetch new or changed items
+    store = get_work_item_store()
+    ids_to_fetch = work_item_ids
+    sync_started_at = utc_now()
+    if store is not None:
+        since = store.synced_at(organization, project)
+        changed_ids = _query_changed_ids(organization, project, headers, since) if since else None
+        ids_to_fetch = store.ids_to_fetch(organization, project, work_item_ids, changed_ids)
+        log.debug(f"   ♻️ Work item store: {len(work_item_ids) - len(ids_to_fetch)} cached, {len(ids_to_fetch)} to fetch")
     
     # Get work item details in batches
     batch_size = 200
     all_work_items = []
+    batches = [ids_to_fetch[i:i + batch_size] for i in range(0, len(ids_to_fetch), batch_size)]
+    batch_count = len(batches)
+    failed_batches = 0
+    workers = min(detail_workers, batch_count)
+    if workers > 1:
+        log.info(f"   ⚡ Fetching {batch_count} detail batches on {workers} threads")
     
-    for i in range(0, len(work_item_ids), batch_size):
-        batch_ids = work_item_ids[i:i + batch_size]
+    def fetch_batch(batch_ids):
         ids_param = ','.join(map(str, batch_ids))
-        
-        work_items_url = f"https://dev.azure.com/{organization}/{project}/_apis/wit/workitems?ids={ids_param}&$fields=System.Id,System.AssignedTo,System.State,System.Tags,System.Title&api-version=7.0"
-        
-        try:
-            response = requests.get(work_items_url, headers=headers)
-            response.raise_for_status()
-            
-            batch_result = response.json()
-            all_work_items.extend(batch_result.get('value', []))
-            
-        except requests.exceptions.RequestException as e:
-            print(f"   ❌ Error getting work item details: {str(e)}")
-            continue
+        work_items_url = f"{Config.AZURE_DEVOPS_BASE_URL}/{organization}/{project}/_apis/wit/workitems?ids={ids_param}&$fields=System.Id,System.AssignedTo,System.State,System.Tags,System.Title&api-version=7.0"
+        response = _request('GET', work_items_url, headers=headers)
+        response.raise_for_status()
+        return response.json().get('value', [])
+    
+    # An open circuit or the deadline stops the batches not started yet; finished ones are kept
+    skipped_batches = 0
+    outcomes = _batch_outcomes(fetch_batch, batches, workers,
+                               stop=lambda e: isinstance(e, (CircuitOpenError, DeadlineExceeded)))
+    for batch_items, e in outcomes:
+        if e is None and batch_items is None:
+            skipped_batches += 1
+        elif e is None:
+            all_work_items.extend(batch_items)
+        else:
+            log.error(f"   ❌ Error getting work item details: {str(e)}")
+            failed_batches += 1
+    if skipped_batches:
+        log.error(f"   ❌ Skipped the remaining {skipped_batches} batch(es) for {organization}")
+        failed_batches += skipped_batches
+    if failed_batches:
+        # Items from these batches are missing; force a full fetch next time
+        sync_started_at = None
     
-    # Process work items to get engineer metrics
+    if store is not None:
+        store.update(organization, project, all_work_items, sync_started_at)
+        # Items that left the sprint would otherwise stay in a resident process forever
+        store.retain(organization, project, work_item_ids)
+        all_work_items = store.get_many(organization, project, work_item_ids)
+    
+    result = summarize_work_items(all_work_items)
+    if failed_batches:
+        result['partial'] = {
+            'reason': f"{failed_batches} of {batch_count} work item batches failed",
+            'missing_items': len(work_item_ids) - result['total_items'],
+        }
+        if extraction_expired():
+            result['partial']['timed_out'] = True
+    return result
+
+def summarize_work_items(all_work_items):
+    """Per-engineer metrics for raw work items: {'total_items', 'engineer_metrics'}"""
     engineer_metrics = {}
     total_items = len(all_work_items)
     
@@ -427,87 +838,171 @@ def get_engineer_metrics(organization, project, work_item_ids, headers):
         'engineer_metrics': engineer_metrics
     }
 
-def main():
-    """Main function to get sprint counts"""
-    print("🚀 Azure DevOps Sprint Count Extractor")
-    print("=" * 50)
-    
-    # Validate configuration
-    if not Config.validate_config():
-        print("❌ Configuration validation failed")
-        return
-    
-    print(f"📅 Sprint calculated based on current date: {datetime.now().strftime('%d-%b-%Y')}")
+def resolve_project_sprint(project_key, project_config, org_name=None):
+    """Work out the sprint window and iteration path used to query one project.
+
+    Returns {'sprint_period', 'sprint_start_iso', 'sprint_end_iso', 'iteration_path', 'fallback'};
+    fallback is True when the window was computed rather than read from Azure DevOps.
+    """
+    # Get project-specific sprint period
+    sprint_period = get_project_sprint_period(project_key, org_name)
+    fallback = not sprint_period or bool(sprint_period.get('fallback'))
     
-    # Get counts for each organization and project
-    all_results = {}
+    if not fallback:
+        # Got actual dates from Azure DevOps
+        sprint_start_iso = sprint_period.get('start_iso') or sprint_period['start_datetime'].strftime('%Y-%m-%dT00:00:00')
+        sprint_end_iso = sprint_period.get('end_iso') or sprint_period['end_datetime'].strftime('%Y-%m-%dT23:59:59')
+        iteration_path = sprint_period.get('iteration_path') or project_config.get('iteration_path')
+        
+        log.debug(f"   📅 Sprint Period: {sprint_period['start_date']} to {sprint_period['end_date']}")
+        if sprint_period.get('iteration_name'):
+            log.debug(f"   📋 Iteration: {sprint_period['iteration_name']}")
+    elif sprint_period and sprint_period.get('fallback'):
+        # Fallback: Use calculated iteration path with date filtering if available
+        iteration_path = sprint_period.get('iteration_path') or project_config.get('iteration_path')
+        # Use date filtering as well if we have dates from fallback calculation
+        if sprint_period.get('start_datetime') and sprint_period.get('end_datetime'):
+            sprint_start_iso = sprint_period.get('start_iso') or sprint_period['start_datetime'].strftime('%Y-%m-%dT00:00:00')
+            sprint_end_iso = sprint_period.get('end_iso') or sprint_period['end_datetime'].strftime('%Y-%m-%dT23:59:59')
+            log.warning(f"   ⚠️ Using fallback iteration path: {iteration_path}")
+            log.debug(f"   📅 Sprint Period: {sprint_period['start_date']} to {sprint_period['end_date']}")
+            log.debug(f"   📋 Iteration: {sprint_period.get('iteration_name', 'Unknown')}")
+            log.warning(f"   ⚠️ Will use BOTH iteration path and date filtering")
+        else:
+            sprint_start_iso = None
+            sprint_end_iso = None
+            log.warning(f"   ⚠️ Using fallback iteration path: {iteration_path}")
+            log.warning(f"   ⚠️ Will filter by iteration path only (no date filtering)")
+    else:
+        # Fallback to config values if nothing works
+        sprint_period = get_current_sprint_period()
+        sprint_start_iso = sprint_period.get('start_iso') or sprint_period['start_datetime'].strftime('%Y-%m-%dT00:00:00')
+        sprint_end_iso = sprint_period.get('end_iso') or sprint_period['end_datetime'].strftime('%Y-%m-%dT23:59:59')
+        iteration_path = project_config.get('iteration_path')
+        log.warning(f"   ⚠️ Using default sprint period: {sprint_period['start_date']} to {sprint_period['end_date']}")
     
-    for org_key, org_config in Config.ORGANIZATIONS.items():
+    return {
+        'sprint_period': sprint_period,
+        'sprint_start_iso': sprint_start_iso,
+        'sprint_end_iso': sprint_end_iso,
+        'iteration_path': iteration_path,
+        'fallback': fallback
+    }
+
+def resolve_sprints():
+    """Resolve the sprint for every configured project.
+
+    Returns a list of plan entries (org_name, project_name, tags + resolve_project_sprint fields).
+    An entry whose fallback window was forced by a failed or skipped call (open circuit,
+    run deadline) also has 'degraded' set, so callers can avoid caching it.
+    """
+    plan = []
+    # A new run gives every organization a fresh chance
+    reset_circuits()
+    orgs = list(Config.ORGANIZATIONS.values())
+    for index, org_config in enumerate(orgs):
         org_name = org_config['name']
-        print(f"\n🏢 Processing organization: {org_name}")
+        log.info(f"\n🏢 Processing organization: {org_name}")
         
-        for project_key, project_config in org_config['projects'].items():
-            project_name = project_key
-            tags = project_config['tags']
-            
-            print(f"\n   📋 Processing project: {project_name}")
-            
-            # Get project-specific sprint period
-            sprint_period = Config.get_current_sprint_period(project_key)
-            
-            if sprint_period and not sprint_period.get('fallback'):
-                # Got actual dates from Azure DevOps
-                sprint_start_iso = sprint_period.get('start_iso') or sprint_period['start_datetime'].strftime('%Y-%m-%dT00:00:00')
-                sprint_end_iso = sprint_period.get('end_iso') or sprint_period['end_datetime'].strftime('%Y-%m-%dT23:59:59')
-                iteration_path = sprint_period.get('iteration_path') or project_config.get('iteration_path')
-                
-                print(f"   📅 Sprint Period: {sprint_period['start_date']} to {sprint_period['end_date']}")
-                if sprint_period.get('iteration_name'):
-                    print(f"   📋 Iteration: {sprint_period['iteration_name']}")
-            elif sprint_period and sprint_period.get('fallback'):
-                # Fallback: Use calculated iteration path with date filtering if available
-                iteration_path = sprint_period.get('iteration_path') or project_config.get('iteration_path')
-                # Use date filtering as well if we have dates from fallback calculation
-                if sprint_period.get('start_datetime') and sprint_period.get('end_datetime'):
-                    sprint_start_iso = sprint_period.get('start_iso') or sprint_period['start_datetime'].strftime('%Y-%m-%dT00:00:00')
-                    sprint_end_iso = sprint_period.get('end_iso') or sprint_period['end_datetime'].strftime('%Y-%m-%dT23:59:59')
-                    print(f"   ⚠️ Using fallback iteration path: {iteration_path}")
-                    print(f"   📅 Sprint Period: {sprint_period['start_date']} to {sprint_period['end_date']}")
-                    print(f"   📋 Iteration: {sprint_period.get('iteration_name', 'Unknown')}")
-                    print(f"   ⚠️ Will use BOTH iteration path and date filtering")
-                else:
-                    sprint_start_iso = None
-                    sprint_end_iso = None
-                    print(f"   ⚠️ Using fallback iteration path: {iteration_path}")
-                    print(f"   ⚠️ Will filter by iteration path only (no date filtering)")
-            else:
-                # Fallback to config values if nothing works
-                sprint_period = Config.get_current_sprint_period()
-                sprint_start_iso = sprint_period.get('start_iso') or sprint_period['start_datetime'].strftime('%Y-%m-%dT00:00:00')
-                sprint_end_iso = sprint_period.get('end_iso') or sprint_period['end_datetime'].strftime('%Y-%m-%dT23:59:59')
-                iteration_path = project_config.get('iteration_path')
-                print(f"   ⚠️ Using default sprint period: {sprint_period['start_date']} to {sprint_period['end_date']}")
-            
-            result = get_work_item_count(org_name, project_name, tags, sprint_start_iso, sprint_end_iso, iteration_path)
-            
-            if result:
-                # Store with organization prefix to avoid naming conflicts
-                project_key = f"{org_name}_{project_name}"
-                # Store sprint period info with the result
-                if sprint_period:
-                    result['sprint_period'] = {
-                        'start_date': sprint_period.get('start_date'),
-                        'end_date': sprint_period.get('end_date'),
-                        'iteration_name': sprint_period.get('iteration_name'),
-                        'iteration_path': sprint_period.get('iteration_path')
-                    }
-                all_results[project_key] = result
-                print(f"      ✅ {project_name}: {result['total_items']} work items")
+        # Half of the time left, split over the orgs still to go; the rest is kept for extraction
+        with deadline_share(RESOLVE_DEADLINE_SHARE / (len(orgs) - index)):
+            for project_key, project_config in org_config['projects'].items():
+                log.debug(f"\n   📋 Processing project: {project_key}")
+                trouble = org_trouble(org_name)
+                entry = resolve_project_sprint(project_key, project_config, org_name)
+                entry.update({'org_name': org_name, 'project_name': project_key, 'tags': project_config['tags']})
+                if entry['fallback'] and (org_trouble(org_name) > trouble or extraction_expired()):
+                    entry['degraded'] = True
+                    log.warning(f"   ⚠️ {org_name}/{project_key}: sprint computed after failed calls; not cacheable")
+                plan.append(entry)
+    return plan
+
+def _snapshot_sprint_period(sprint_period):
+    """The sprint fields stored with a project in the snapshot"""
+    return {
+        'start_date': sprint_period.get('start_date'),
+        'end_date': sprint_period.get('end_date'),
+        'iteration_name': sprint_period.get('iteration_name'),
+        'iteration_path': sprint_period.get('iteration_path')
+    }
+
+def extract_sprint_data(plan, costs=None):
+    """Fetch work items for every resolved project; returns the snapshot dict.
+
+    costs, if given, is filled with {project key: {'seconds', 'items'}} for
+    each complete result (see fetch_cost.py).
+    """
+    history = load_fetch_costs()
+    all_results = {}
+    for index, entry in enumerate(plan):
+        if extraction_expired():
+            # Left out here; mark_failed_projects records them as timed out
+            log.warning(f"   ⏰ Run deadline reached; skipping {len(plan) - index} remaining project(s)")
+            break
+        org_name = entry['org_name']
+        project_name = entry['project_name']
+        sprint_period = entry['sprint_period']
+        # Store with organization prefix to avoid naming conflicts
+        project_key = f"{org_name}_{project_name}"
+        
+        started = time.perf_counter()
+        with span('azure.get_work_item_count', project=project_name, org=org_name):
+            result = get_work_item_count(org_name, project_name, entry['tags'], entry['sprint_start_iso'],
+                                         entry['sprint_end_iso'], entry['iteration_path'],
+                                         detail_workers(estimate_cost(history, project_key)))
+        
+        if result:
+            if costs is not None and not result.get('partial'):
+                costs[project_key] = {'seconds': time.perf_counter() - started, 'items': result['total_items']}
+            # Store sprint period info with the result
+            if sprint_period:
+                result['sprint_period'] = _snapshot_sprint_period(sprint_period)
+            all_results[project_key] = result
+            if result.get('partial'):
+                log.warning(f"      ⚠️ {project_name}: {result['total_items']} work items (partial: {result['partial']['reason']})")
             else:
-                print(f"      ❌ Failed to get data for {project_name}")
-    
-    # Save results to JSON file
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                log.info(f"      ✅ {project_name}: {result['total_items']} work items")
+        else:
+            log.error(f"      ❌ Failed to get data for {project_name}")
+    for org, circuit in circuit_summary().items():
+        log.warning(f"   🔌 {org}: circuit {circuit['state']}, {circuit['failures']} failed and "
+                    f"{circuit['skipped']} skipped call(s) (last: {circuit['last_error']})")
+    return all_results
+
+def failure_reason(org_name):
+    """Why a project in org_name produced no data, as recorded in its partial marker"""
+    if extraction_expired():
+        return DEADLINE_REASON
+    circuit = circuit_summary().get(org_name)
+    if circuit and circuit['state'] == 'open':
+        return f"organization {org_name} unavailable (circuit open after {circuit['last_error']})"
+    return f"Azure DevOps query failed ({circuit['last_error']})" if circuit else "Azure DevOps query failed"
+
+def mark_failed_projects(all_results, plan, reasons=None):
+    """Add a partial-marked placeholder for every planned project without a result.
+
+    The snapshot then records which projects are missing, and why, instead of
+    silently leaving them out. reasons maps project keys to an explanation.
+    """
+    for entry in plan:
+        org_name = entry['org_name']
+        project_key = f"{org_name}_{entry['project_name']}"
+        if project_key in all_results:
+            continue
+        reason = (reasons or {}).get(project_key) or failure_reason(org_name)
+        all_results[project_key] = {
+            'total_items': 0,
+            'engineer_metrics': {},
+            'sprint_period': _snapshot_sprint_period(entry['sprint_period'] or {}),
+            'partial': {'reason': reason, 'failed': True},
+        }
+        if reason == DEADLINE_REASON:
+            all_results[project_key]['partial']['timed_out'] = True
+    return all_results
+
+def save_sprint_data(all_results, timestamp=None):
+    """Write the snapshot to data/ and record its trend aggregate; returns the file path"""
+    timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
     output_file = f'data/sprint_count_{timestamp}.json'
     
     # Create data directory if it doesn't exist
@@ -517,11 +1012,21 @@ def main():
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(all_results, f, indent=2, ensure_ascii=False)
     
-    print(f"\n💾 Results saved to: {output_file}")
+    log.info(f"\n💾 Results saved to: {output_file}")
+    
+    # Record the small per-run aggregate used by trend_report.py
+    try:
+        record_run_aggregate(all_results, datetime.strptime(timestamp, '%Y%m%d_%H%M%S'))
+        log.info(f"📈 Trend history updated: {HISTORY_FILE}")
+    except Exception as e:
+        log.warning(f"   ⚠️ Could not update trend history: {e}")
     
-    # Print summary
-    print(f"\n📊 Sprint Summary:")
-    print(f"=" * 30)
+    return output_file
+
+def print_sprint_summary(all_results):
+    """Print per-project and total work item counts"""
+    log.info(f"\n📊 Sprint Summary:")
+    log.info(f"=" * 30)
     
     total_work_items = 0
     for project_key, result in all_results.items():
@@ -529,10 +1034,40 @@ def main():
         total_work_items += count
         org_project = project_key.split('_', 1)
         display_name = f"{org_project[0]}/{org_project[1]}" if len(org_project) > 1 else project_key
-        print(f"   {project_key}: {display_name}: {count} work items")
+        partial = f" ⚠️ partial: {result['partial']['reason']}" if result.get('partial') else ''
+        log.info(f"   {project_key}: {display_name}: {count} work items{partial}")
+    
+    log.info(f"   {'Total':>20}: {total_work_items} work items")
+
+def main():
+    """Main function to get sprint counts; returns the saved snapshot path"""
+    log.info("🚀 Azure DevOps Sprint Count Extractor")
+    log.info("=" * 50)
     
-    print(f"   {'Total':>20}: {total_work_items} work items")
-    print(f"\n🎯 Ready to generate HTML report!")
+    # Validate configuration
+    if not Config.validate_config():
+        log.error("❌ Configuration validation failed")
+        return
+    
+    log.info(f"📅 Sprint calculated based on current date: {datetime.now().strftime('%d-%b-%Y')}")
+    start_run_deadline()
+    
+    # Get counts for each organization and project
+    plan = resolve_sprints()
+    costs = {}
+    all_results = mark_failed_projects(extract_sprint_data(plan, costs), plan)
+    if not enforce_api_budget(project_usage()):
+        write_run_profile('extract')
+        flush_logs()
+        return None
+    output_file = save_sprint_data(all_results)
+    record_fetch_costs(costs)
+    print_sprint_summary(all_results)
+    write_run_profile('extract')
+    log.info(f"\n🎯 Ready to generate HTML report!")
+    flush_logs()
+    return output_file
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import sys
+    sys.exit(0 if main() else 1)
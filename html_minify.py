@@ -0,0 +1,261 @@
+"""
+HTML Minification for Email Reports
+Collapses template whitespace and, for mail clients that honour <style>
+blocks, factors repeated inline style="..." strings into short classes.
+
+Run directly to check the minifier against a corpus of generated reports:
+    python3 html_minify.py                      # all compact_sprint_report_*.html
+    python3 html_minify.py report1.html ...     # specific files
+"""
+
+import os
+import re
+import sys
+from html.parser import HTMLParser
+
+# Whether each client applies class rules from a <style> block in <head>.
+# Clients not listed here are treated as inline-only.
+STYLE_BLOCK_SUPPORT = {
+    'gmail': True,
+    'gmail_mobile': True,
+    'gmail_imap': False,  # Gmail apps showing non-Google (IMAP/POP) accounts strip <style>
+    'outlook': True,
+    'outlook_web': True,
+    'apple_mail': True,
+    'yahoo': True,
+    'samsung_mail': True,
+}
+
+CLASS_PREFIX = 'c'
+GENERATED_CLASS_RE = re.compile(rf'^{CLASS_PREFIX}\d+$')
+MIN_FACTORED_STYLE_LENGTH = 20
+
+TAG_RE = re.compile(r'<([a-zA-Z][a-zA-Z0-9]*)(\s[^<>]*?)?(/?)>')
+STYLE_ATTR_RE = re.compile(r'\sstyle="([^"]*)"')
+CLASS_ATTR_RE = re.compile(r'\sclass="([^"]*)"')
+GENERATED_STYLE_BLOCK_RE = re.compile(rf'<style>(?:\.{CLASS_PREFIX}\d+\{{[^}}]*\}})+</style>')
+# Whitespace next to these tags never renders, so it can be dropped entirely
+STRUCTURAL_TAGS = r'(?:!DOCTYPE|html|head|body|meta|title|style|table|tbody|tr|td|th)\b'
+GAP_BEFORE_TAG_RE = re.compile(rf'\s+(?=</?{STRUCTURAL_TAGS})', re.IGNORECASE)
+GAP_AFTER_TAG_RE = re.compile(rf'(</?{STRUCTURAL_TAGS}[^<>]*>)\s+', re.IGNORECASE)
+STRUCTURAL_TAG_START_RE = re.compile(rf'<(?=/?{STRUCTURAL_TAGS})', re.IGNORECASE)
+# SMTP limits lines to 998 octets (RFC 5321); minified output is folded below this
+MAX_LINE_LENGTH = 900
+
+
+def clients_support_style_blocks(target_clients):
+    """True only if every target client applies <style> class rules"""
+    if not target_clients:
+        return False
+    return all(STYLE_BLOCK_SUPPORT.get(client.strip().lower(), False) for client in target_clients)
+
+
+def normalize_style(style):
+    """Canonical form of an inline style: single spaces, no padding around ':' / ';'"""
+    style = ' '.join(style.split())
+    style = re.sub(r'\s*([:;])\s*', r'\1', style)
+    return style.strip(';')
+
+
+def _collapse_whitespace(html_content):
+    """Collapse whitespace runs to one space, then drop gaps next to structural tags"""
+    html_content = re.sub(r'\s+', ' ', html_content).strip()
+    html_content = GAP_BEFORE_TAG_RE.sub('', html_content)
+    return GAP_AFTER_TAG_RE.sub(r'\1', html_content)
+
+
+def _fold_lines(html_content, width=MAX_LINE_LENGTH):
+    """Break long lines where a newline cannot change rendering.
+
+    Prefers the gap before a structural tag, then a text space outside any tag.
+    """
+    lines = []
+    while len(html_content) > width:
+        window = html_content[:width]
+        cut = max((m.start() for m in STRUCTURAL_TAG_START_RE.finditer(window) if m.start() > 0), default=-1)
+        skip = 0
+        if cut < 0:
+            space = window.rfind(' ')
+            while space > 0 and window.rfind('<', 0, space) > window.rfind('>', 0, space):
+                # Inside a tag's attributes; step back out of the tag
+                space = window.rfind(' ', 0, window.rfind('<', 0, space))
+            if space > 0:
+                cut, skip = space, 1
+        if cut < 0:
+            # No safe break point in the window; take the next one after it
+            match = STRUCTURAL_TAG_START_RE.search(html_content, width)
+            if not match:
+                break
+            cut = match.start()
+        lines.append(html_content[:cut])
+        html_content = html_content[cut + skip:]
+    lines.append(html_content)
+    return '\n'.join(lines)
+
+
+def _rewrite_tag_styles(html_content, replace_style):
+    """Apply replace_style(tag, attrs) -> attrs to every start tag"""
+    def repl(match):
+        name, attrs, closing = match.group(1), match.group(2) or '', match.group(3)
+        return f"<{name}{replace_style(name, attrs)}{closing}>"
+    return TAG_RE.sub(repl, html_content)
+
+
+def minify_html(html_content, target_clients=None):
+    """Minify a generated report.
+
+    Styles are normalized and whitespace collapsed for every client; repeated
+    inline styles are moved into <style> classes only when all target_clients
+    support it. Returns (minified_html, stats).
+    """
+    original_bytes = len(html_content.encode('utf-8'))
+
+    def normalize_attrs(_name, attrs):
+        return STYLE_ATTR_RE.sub(lambda m: f' style="{normalize_style(m.group(1))}"', attrs)
+    html_content = _rewrite_tag_styles(html_content, normalize_attrs)
+
+    classes = {}
+    if clients_support_style_blocks(target_clients):
+        counts = {}
+        for match in TAG_RE.finditer(html_content):
+            style = STYLE_ATTR_RE.search(match.group(2) or '')
+            if style and len(style.group(1)) >= MIN_FACTORED_STYLE_LENGTH:
+                counts[style.group(1)] = counts.get(style.group(1), 0) + 1
+        repeated = sorted((s for s, n in counts.items() if n > 1), key=lambda s: (-counts[s], s))
+        classes = {style: f"{CLASS_PREFIX}{i}" for i, style in enumerate(repeated)}
+
+    if classes and '</head>' in html_content:
+        def factor_attrs(_name, attrs):
+            style = STYLE_ATTR_RE.search(attrs)
+            if not style or style.group(1) not in classes:
+                return attrs
+            class_name = classes[style.group(1)]
+            attrs = STYLE_ATTR_RE.sub('', attrs, count=1)
+            existing = CLASS_ATTR_RE.search(attrs)
+            if existing:
+                return CLASS_ATTR_RE.sub(f' class="{class_name} {existing.group(1)}"', attrs, count=1)
+            return f' class="{class_name}"{attrs}'
+        html_content = _rewrite_tag_styles(html_content, factor_attrs)
+        rules = ''.join(f".{name}{{{style}}}" for style, name in classes.items())
+        html_content = html_content.replace('</head>', f"<style>{rules}</style></head>", 1)
+    else:
+        classes = {}
+
+    html_content = _fold_lines(_collapse_whitespace(html_content))
+    minified_bytes = len(html_content.encode('utf-8'))
+    stats = {
+        'original_bytes': original_bytes,
+        'minified_bytes': minified_bytes,
+        'saved_bytes': original_bytes - minified_bytes,
+        'saved_percent': round((original_bytes - minified_bytes) / original_bytes * 100, 1) if original_bytes else 0.0,
+        'factored_styles': len(classes)
+    }
+    return html_content, stats
+
+
+def expand_factored_styles(html_content):
+    """Inverse of the class factoring: put generated class rules back inline"""
+    rules = dict(
+        (name, style) for name, style in
+        re.findall(rf'\.({CLASS_PREFIX}\d+)\{{([^}}]*)\}}', html_content)
+    )
+
+    def inline_attrs(_name, attrs):
+        existing = CLASS_ATTR_RE.search(attrs)
+        if not existing:
+            return attrs
+        names = existing.group(1).split()
+        generated = [n for n in names if GENERATED_CLASS_RE.match(n) and n in rules]
+        if not generated:
+            return attrs
+        kept = [n for n in names if n not in generated]
+        attrs = CLASS_ATTR_RE.sub(f' class="{" ".join(kept)}"' if kept else '', attrs, count=1)
+        return f' style="{rules[generated[0]]}"{attrs}'
+    html_content = GENERATED_STYLE_BLOCK_RE.sub('', html_content)
+    return _rewrite_tag_styles(html_content, inline_attrs)
+
+
+class _SignatureParser(HTMLParser):
+    """Reduce a document to (tags with normalized attributes, visible text)"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.items = []
+        self._in_style = False
+
+    def handle_starttag(self, tag, attrs):
+        self._in_style = tag == 'style'
+        normalized = []
+        for key, value in attrs:
+            if key == 'style':
+                value = normalize_style(value or '')
+            elif key == 'class':
+                value = ' '.join(sorted(value.split()))
+            normalized.append((key, value))
+        self.items.append(('start', tag, tuple(sorted(normalized))))
+
+    def handle_endtag(self, tag):
+        self._in_style = False
+        self.items.append(('end', tag))
+
+    def handle_data(self, data):
+        text = ' '.join(data.split())
+        if text and not self._in_style:
+            self.items.append(('text', text))
+
+    def handle_comment(self, data):
+        self.items.append(('comment', ' '.join(data.split())))
+
+
+def document_signature(html_content):
+    """Structural signature used to prove minification did not change the report"""
+    parser = _SignatureParser()
+    parser.feed(html_content)
+    parser.close()
+    return parser.items
+
+
+def check_equivalent(original_html, minified_html):
+    """True if the minified report renders the same elements, styles and text"""
+    return document_signature(original_html) == document_signature(expand_factored_styles(minified_html))
+
+
+def main():
+    """Check the minifier against a corpus of generated reports and report savings"""
+    from config import Config
+
+    files = sys.argv[1:] or sorted(
+        f for f in os.listdir('.') if f.startswith('compact_sprint_report_') and f.endswith('.html') and not f.endswith('.full.html')
+    )
+    if not files:
+        print("❌ No generated reports found. Run generate_html_report_compact.py first.")
+        return False
+
+    target_clients = Config.get_email_target_clients()
+    print("🗜️ HTML Minifier Corpus Check")
+    print("=" * 40)
+    print(f"   Target clients: {', '.join(target_clients)}")
+
+    all_ok = True
+    total_original = total_minified = 0
+    for html_file in files:
+        with open(html_file, 'r', encoding='utf-8') as f:
+            original = f.read()
+        minified, stats = minify_html(original, target_clients)
+        ok = check_equivalent(original, minified)
+        all_ok = all_ok and ok
+        total_original += stats['original_bytes']
+        total_minified += stats['minified_bytes']
+        print(f"   {'✅' if ok else '❌'} {html_file}: {stats['original_bytes']:,} → {stats['minified_bytes']:,} bytes "
+              f"(-{stats['saved_percent']}%, {stats['factored_styles']} classes)")
+
+    if total_original:
+        saved = total_original - total_minified
+        print(f"\n📊 Corpus: {len(files)} reports, {total_original:,} → {total_minified:,} bytes "
+              f"(saved {saved:,} bytes, {saved / total_original * 100:.1f}%)")
+    print("✅ All reports equivalent after minification" if all_ok else "❌ Some reports changed after minification")
+    return all_ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
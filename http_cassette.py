@@ -0,0 +1,137 @@
+"""
+HTTP Cassettes
+Record the Azure DevOps responses a run receives (teams, iterations, WIQL,
+work items) to a JSON cassette, and replay them later without network
+access. Plug either into get_sprint_count.set_transport().
+
+Secrets never reach the cassette: request headers are not stored, and the
+PAT (raw or Basic-auth encoded) is replaced with "<redacted>" anywhere it
+appears in URLs or bodies.
+
+Replay matches on method + URL + JSON body, in recorded order. When the
+body differs, it falls back to method + URL alone. This happens, for
+example, when a WIQL date window moved because the replay runs on a later
+day. A request the cassette cannot answer raises CassetteMiss.
+"""
+
+import base64
+import json
+import os
+from collections import defaultdict, deque
+from datetime import datetime
+from http import HTTPStatus
+
+REDACTED = '<redacted>'
+# Response headers worth keeping (everything else is noise or identifying)
+KEPT_RESPONSE_HEADERS = ('Content-Type', 'Retry-After')
+
+
+class CassetteMiss(LookupError):
+    """A replayed request has no recorded response"""
+
+
+def _secrets(pat):
+    if not pat:
+        return []
+    return [pat, base64.b64encode(f":{pat}".encode()).decode()]
+
+
+def scrub(text, secrets):
+    for secret in secrets:
+        text = text.replace(secret, REDACTED)
+    return text
+
+
+def _body_key(kwargs):
+    """Canonical request body (JSON payloads only; that is all the extractor sends)"""
+    if kwargs.get('json') is None:
+        return None
+    return json.dumps(kwargs['json'], sort_keys=True, separators=(',', ':'))
+
+
+def build_response(method, url, status, body, headers=None):
+    """A requests.Response carrying a recorded interaction"""
+    import requests
+    response = requests.Response()
+    response.status_code = status
+    response._content = body.encode('utf-8')
+    response.headers.update(headers or {})
+    response.url = url
+    response.encoding = 'utf-8'
+    try:
+        response.reason = HTTPStatus(status).phrase
+    except ValueError:
+        response.reason = ''
+    response.request = requests.Request(method, url).prepare()
+    return response
+
+
+class CassetteRecorder:
+    """Transport that forwards to a real session and keeps every interaction"""
+
+    def __init__(self, session, pat=None):
+        self.session = session
+        self.secrets = _secrets(pat)
+        self.interactions = []
+
+    def __call__(self, method, url, **kwargs):
+        response = self.session.request(method, url, **kwargs)
+        body = _body_key(kwargs)
+        self.interactions.append({
+            'method': method,
+            'url': scrub(url, self.secrets),
+            'request_body': scrub(body, self.secrets) if body else None,
+            'status': response.status_code,
+            'headers': {k: response.headers[k] for k in KEPT_RESPONSE_HEADERS if k in response.headers},
+            'body': scrub(response.text, self.secrets),
+        })
+        return response
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        cassette = {'recorded_at': datetime.now().isoformat(timespec='seconds'), 'interactions': self.interactions}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cassette, f, indent=1, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        print(f"📼 Recorded {len(self.interactions)} interactions to {path}")
+
+
+class CassettePlayer:
+    """Transport that answers requests from a cassette"""
+
+    def __init__(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            cassette = json.load(f)
+        self.recorded_at = cassette.get('recorded_at')
+        self.interactions = cassette['interactions']
+        self.reset()
+
+    def reset(self):
+        """Rewind so the cassette can be replayed again"""
+        self.exact = defaultdict(deque)
+        self.loose = defaultdict(deque)
+        for interaction in self.interactions:
+            self.exact[(interaction['method'], interaction['url'], interaction['request_body'])].append(interaction)
+            self.loose[(interaction['method'], interaction['url'])].append(interaction)
+        self.request_count = 0
+        self.loose_matches = 0
+        self.misses = 0
+
+    def _take(self, queues, key):
+        queue = queues.get(key)
+        if not queue:
+            return None
+        # The last recorded answer keeps serving repeats beyond what was recorded
+        return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def __call__(self, method, url, **kwargs):
+        self.request_count += 1
+        interaction = self._take(self.exact, (method, url, _body_key(kwargs)))
+        if interaction is None:
+            interaction = self._take(self.loose, (method, url))
+            if interaction is None:
+                self.misses += 1
+                raise CassetteMiss(f"No recorded response for {method} {url}")
+            self.loose_matches += 1
+        return build_response(method, url, interaction['status'], interaction['body'], interaction['headers'])
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Import-Time Benchmark
+Imports each entry point in fresh interpreters under `python -X importtime`
+and checks two things:
+
+- the median import time stays under the module's budget
+- importing has no side effects: os.environ is unchanged, .env is not
+  loaded (python-dotenv is not imported) and heavy modules the entry point
+  does not need (requests, the fetch stack, smtplib) are not pulled in
+
+Exits non-zero on any regression, so short-lived commands stay fast.
+
+Usage:
+    python3 import_benchmark.py                # check every entry point
+    python3 import_benchmark.py --runs 9       # more samples per module
+    python3 import_benchmark.py --scale 2      # loosen budgets on a slow machine
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Always lazy: loading .env is not an import side effect, and these are only
+# needed by code paths that actually talk to Azure DevOps
+NEVER_AT_IMPORT = ['dotenv', 'requests', 'get_sprint_count']
+
+# module: (budget in ms, modules that must not be loaded by importing it)
+# Budgets are about three times what the modules take on a typical CI runner,
+# so they catch an eager heavy import (tens of ms) rather than machine noise
+# or a few more settings; the forbidden-module checks are exact
+IMPORT_BUDGETS = {
+    'config': (20, NEVER_AT_IMPORT + ['smtplib', 'email']),
+    'pipeline': (90, NEVER_AT_IMPORT + ['smtplib']),
+    'run_complete_workflow': (90, NEVER_AT_IMPORT + ['smtplib']),
+    'report_daemon': (75, NEVER_AT_IMPORT + ['smtplib']),
+    'trend_report': (90, NEVER_AT_IMPORT + ['smtplib']),
+    'generate_html_report_compact': (120, NEVER_AT_IMPORT + ['smtplib', 'email.mime']),
+    'personalized_reports': (90, NEVER_AT_IMPORT + ['smtplib', 'multiprocessing']),
+    'send_email_direct': (250, NEVER_AT_IMPORT),
+    'outbox': (250, NEVER_AT_IMPORT),
+    'get_sprint_count': (600, ['dotenv']),
+}
+
+PROBE = """
+import json, os, sys
+before = dict(os.environ)
+import {module}
+print(json.dumps({{
+    'env_changed': sorted(k for k in set(before) | set(os.environ) if before.get(k) != os.environ.get(k)),
+    'loaded': [m for m in {forbidden!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure_import(module, forbidden, repo_dir):
+    """Import module once in a fresh interpreter.
+
+    Returns (cumulative import microseconds, probe result dict).
+    """
+    code = PROBE.format(module=module, forbidden=forbidden)
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                               cwd=repo_dir, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+
+    cumulative_us = None
+    for line in completed.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if line.startswith('import time:') and line.rsplit('|', 1)[-1].strip() == module:
+            cumulative_us = int(line.split('|')[1])
+    return cumulative_us or 0, json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(modules=None, runs=5, scale=1.0, repo_dir=None):
+    """Measure every module; returns a list of result dicts"""
+    repo_dir = repo_dir or os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for module in modules or IMPORT_BUDGETS:
+        budget_ms, forbidden = IMPORT_BUDGETS[module]
+        # First import compiles bytecode; don't count it
+        measure_import(module, forbidden, repo_dir)
+        samples = []
+        probe = None
+        for _ in range(runs):
+            cumulative_us, probe = measure_import(module, forbidden, repo_dir)
+            samples.append(cumulative_us / 1000)
+        median_ms = statistics.median(samples)
+        results.append({
+            'module': module,
+            'median_ms': median_ms,
+            'budget_ms': budget_ms * scale,
+            'env_changed': probe['env_changed'],
+            'loaded': probe['loaded'],
+            'ok': median_ms <= budget_ms * scale and not probe['env_changed'] and not probe['loaded'],
+        })
+    return results
+
+
+def print_results(results):
+    print("⏱️ Import times (median):")
+    for r in results:
+        print(f"   {'✅' if r['ok'] else '❌'} {r['module']:<30} {r['median_ms']:7.1f} ms  (budget {r['budget_ms']:.0f} ms)")
+        if r['env_changed']:
+            print(f"      ⚠️ changed os.environ at import: {', '.join(r['env_changed'])}")
+        if r['loaded']:
+            print(f"      ⚠️ loaded at import: {', '.join(r['loaded'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check entry point import time and import side effects')
+    parser.add_argument('modules', nargs='*', help='modules to check (default: all budgeted entry points)')
+    parser.add_argument('--runs', type=int, default=5, help='samples per module (default: 5)')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiply every budget (slow machines)')
+    args = parser.parse_args()
+
+    unknown = [m for m in args.modules if m not in IMPORT_BUDGETS]
+    if unknown:
+        parser.error(f"no budget for: {', '.join(unknown)}")
+
+    results = run_benchmark(args.modules or None, runs=args.runs, scale=args.scale)
+    print_results(results)
+    failed = [r['module'] for r in results if not r['ok']]
+    if failed:
+        print(f"\n❌ Import regression in: {', '.join(failed)}")
+        return False
+    print("\n✅ All entry points within import budget")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,153 @@
+"""
+Memory Profile
+Runs the pipeline (or a benchmark step) under tracemalloc and reports, per
+stage, the peak traced memory while it ran (including what earlier stages
+still hold), what it added, and the lines of this repo that allocated the
+memory held when it ends, plus the peak of the whole run:
+
+    with memory_tracing(True):
+        with memory_stage('extract'):
+            ...
+    print_memory_report(memory_stages())
+
+Allocations made inside the standard library or dependencies (json, requests,
+re) are attributed to the innermost frame in this repo that led to them, so
+a site reads "get_sprint_count.py:512" rather than "json/decoder.py:353".
+That needs several frames per allocation (MEMORY_PROFILE_FRAMES, default 8),
+which makes a traced run several times slower; tracing is off unless
+MEMORY_PROFILE=true or run_complete_workflow.py --memory-profile.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from report_log import get_logger
+
+log = get_logger(__name__)
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_stages = []
+
+# Highest traced memory since tracing started, across stages and the gaps between them
+_run_peak = 0
+
+
+def _is_repo_file(filename):
+    return filename.startswith(REPO_DIR) and 'site-packages' not in filename and filename != __file__
+
+
+@contextmanager
+def memory_tracing(enabled=True, frames=None):
+    """Trace allocations inside the block (a no-op when disabled or already tracing).
+
+    frames defaults to MEMORY_PROFILE_FRAMES.
+    """
+    global _run_peak
+    import tracemalloc
+    if tracemalloc.is_tracing():
+        yield
+        return
+    _stages.clear()
+    _run_peak = 0
+    if not enabled:
+        yield
+        return
+    from config import Config
+    tracemalloc.start(Config.MEMORY_PROFILE_FRAMES if frames is None else frames)
+    try:
+        yield
+    finally:
+        tracemalloc.stop()
+
+
+def memory_stages():
+    """Stages measured since tracing last started: list of dicts (see memory_stage)"""
+    return list(_stages)
+
+
+def top_allocations(snapshot, limit):
+    """Largest allocations in a snapshot, grouped by repo source line.
+
+    Returns [{'site': 'file.py:123', 'bytes': n, 'blocks': n}], biggest first.
+    """
+    import tracemalloc
+    # The profiler's own bookkeeping is left out (a string check per site,
+    # much cheaper than Snapshot.filter_traces' fnmatch per frame)
+    ignore = {tracemalloc.__file__, __file__}
+    sites = {}
+    for stat in snapshot.statistics('traceback'):
+        # Module code loaded by imports stays held for the whole run; it is not a stage's data
+        if any(f.filename in ignore or f.filename.startswith('<frozen importlib') for f in stat.traceback):
+            continue
+        # Innermost repo frame; tracebacks are ordered oldest call first
+        frame = next((f for f in reversed(stat.traceback) if _is_repo_file(f.filename)), stat.traceback[-1])
+        name = os.path.relpath(frame.filename, REPO_DIR) if _is_repo_file(frame.filename) else frame.filename
+        site = f"{name}:{frame.lineno}"
+        entry = sites.setdefault(site, {'site': site, 'bytes': 0, 'blocks': 0})
+        entry['bytes'] += stat.size
+        entry['blocks'] += stat.count
+    return sorted(sites.values(), key=lambda e: e['bytes'], reverse=True)[:limit]
+
+
+@contextmanager
+def memory_stage(name, top=None):
+    """Measure one stage while tracing (does nothing when tracemalloc is not tracing).
+
+    Only the peak is reset when the stage starts, never the traces, so memory
+    held from earlier stages (snapshot, model, HTML copies) counts: 'peak_bytes'
+    is the traced high-water mark while the stage ran, 'retained_bytes' what
+    the stage added by its end, 'run_peak_bytes' the run's peak so far and
+    'top_allocations' where the memory held at the end was allocated. The
+    result is appended to memory_stages() and to the run profile's 'memory'
+    section.
+    """
+    global _run_peak
+    import tracemalloc
+    if not tracemalloc.is_tracing():
+        yield
+        return
+    from config import Config
+    from run_profile import record_memory
+    top = Config.MEMORY_PROFILE_TOP if top is None else top
+
+    # The peak since the last stage covers the gap before this one
+    baseline, gap_peak = tracemalloc.get_traced_memory()
+    _run_peak = max(_run_peak, gap_peak)
+    tracemalloc.reset_peak()
+    try:
+        yield
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+        _run_peak = max(_run_peak, peak)
+        started = time.perf_counter()
+        snapshot = tracemalloc.take_snapshot()
+        stage = {
+            'stage': name,
+            'peak_bytes': peak,
+            'retained_bytes': current - baseline,
+            'run_peak_bytes': _run_peak,
+            'top_allocations': top_allocations(snapshot, top),
+        }
+        del snapshot
+        stage['snapshot_seconds'] = round(time.perf_counter() - started, 3)
+        _stages.append(stage)
+        record_memory(stage)
+
+
+def _mib(nbytes):
+    return f"{nbytes / 1024 / 1024:.1f} MiB"
+
+
+def print_memory_report(stages):
+    """Log peak/added memory per stage with its top allocation sites"""
+    if not stages:
+        return
+    log.info("\n🧠 Memory by stage (tracemalloc):")
+    for stage in stages:
+        log.info(f"   {stage['stage']:<22} peak {_mib(stage['peak_bytes']):>10}   added {_mib(stage['retained_bytes']):>10}")
+        for site in stage['top_allocations']:
+            log.info(f"      {_mib(site['bytes']):>10}  {site['site']} ({site['blocks']:,} blocks)")
+    worst = max(stages, key=lambda s: s['peak_bytes'])
+    log.info(f"   Highest peak: {worst['stage']} ({_mib(worst['peak_bytes'])}); "
+             f"run peak {_mib(max(s['run_peak_bytes'] for s in stages))}")
@@ -0,0 +1,193 @@
+"""
+Organization Configuration
+Loads the organizations / projects / teams / sprint cadences the report
+covers from a JSON (or YAML) file, validates them once and indexes them so
+per-project lookups are dict lookups instead of nested searches.
+
+File layout (organizations.json):
+
+    {
+      "report_title": "IOL Pay & VCC",
+      "organizations": {
+        "IWTX": {
+          "name": "IWTX",
+          "projects": {
+            "IOL_X": {
+              "project_name": "IOL Pay",
+              "team_name": "Charlie Backend Team",
+              "tags": [],
+              "iteration_path": "IOL_X\\\\Charlie Backend Team Backlog\\\\Iteration-29",
+              "fallback_cadence": {"anchor_start": "2024-11-04", "anchor_number": 29,
+                                   "duration_weeks": 3, "name_prefix": "Iteration-"}
+            }
+          }
+        }
+      }
+    }
+
+YAML files (.yaml / .yml) with the same structure are read when PyYAML is
+installed.
+"""
+
+import json
+import os
+from datetime import datetime
+from run_profile import span
+
+# Loaded configs by absolute path: (mtime, OrgConfig); edits are picked up on next access
+_cache = {}
+
+
+class OrgConfig:
+    """Validated organization config plus lookup indexes"""
+
+    def __init__(self, organizations, report_title=None, source=None):
+        self.organizations = organizations
+        self.source = source
+        # (org name, project key) -> project config
+        self.projects_by_org = {}
+        # project key -> org names that define it (normally exactly one)
+        self.orgs_by_project = {}
+        for org_config in organizations.values():
+            for project_key, project_config in org_config['projects'].items():
+                self.projects_by_org[(org_config['name'], project_key)] = project_config
+                self.orgs_by_project.setdefault(project_key, []).append(org_config['name'])
+        self.report_title = report_title or default_report_title(self.projects_by_org)
+
+    def find_project(self, org_name, project_key):
+        """Project config for (org name, project key), or None"""
+        return self.projects_by_org.get((org_name, project_key))
+
+    def org_for_project(self, project_key):
+        """Name of the (first) organization defining project_key, or None"""
+        orgs = self.orgs_by_project.get(project_key)
+        return orgs[0] if orgs else None
+
+    def iter_projects(self):
+        """(org name, project key, project config) for every configured project"""
+        for (org_name, project_key), project_config in self.projects_by_org.items():
+            yield org_name, project_key, project_config
+
+
+def default_report_title(projects_by_org):
+    """Short title naming the projects, used when the file sets no report_title"""
+    names = [project.get('project_name') or key for (_, key), project in projects_by_org.items()]
+    if len(names) <= 3:
+        return ' & '.join(names)
+    return f"{len(names)} projects"
+
+
+def _validate_cadence(where, cadence, errors):
+    if not isinstance(cadence, dict):
+        errors.append(f"{where}.fallback_cadence: must be an object")
+        return
+    for field in ('anchor_start', 'anchor_number', 'duration_weeks'):
+        if field not in cadence:
+            errors.append(f"{where}.fallback_cadence.{field}: required")
+    try:
+        datetime.strptime(str(cadence.get('anchor_start', '')), '%Y-%m-%d')
+    except ValueError:
+        errors.append(f"{where}.fallback_cadence.anchor_start: expected YYYY-MM-DD")
+    for field in ('anchor_number', 'duration_weeks'):
+        value = cadence.get(field)
+        if field in cadence and (not isinstance(value, int) or isinstance(value, bool) or value < (1 if field == 'duration_weeks' else 0)):
+            errors.append(f"{where}.fallback_cadence.{field}: expected a {'positive' if field == 'duration_weeks' else 'non-negative'} integer")
+
+
+def validate_organizations(data):
+    """Check the raw file contents and fill defaults.
+
+    Returns (organizations, report_title); raises ValueError listing every problem.
+    """
+    errors = []
+    if not isinstance(data, dict) or not isinstance(data.get('organizations'), dict) or not data['organizations']:
+        raise ValueError("organizations: expected a non-empty object of organizations")
+
+    report_title = data.get('report_title')
+    if report_title is not None and not isinstance(report_title, str):
+        errors.append("report_title: expected a string")
+
+    organizations = {}
+    seen_names = set()
+    for org_key, org in data['organizations'].items():
+        where = f"organizations.{org_key}"
+        if not isinstance(org, dict):
+            errors.append(f"{where}: expected an object")
+            continue
+        name = org.get('name', org_key)
+        # Snapshot keys are "<org name>_<project key>", split at the first underscore
+        if not isinstance(name, str) or not name or '_' in name:
+            errors.append(f"{where}.name: expected a non-empty string without '_'")
+        elif name in seen_names:
+            errors.append(f"{where}.name: duplicate organization name {name!r}")
+        seen_names.add(name)
+
+        projects = {}
+        if not isinstance(org.get('projects'), dict) or not org['projects']:
+            errors.append(f"{where}.projects: expected a non-empty object of projects")
+        else:
+            for project_key, project in org['projects'].items():
+                project_where = f"{where}.projects.{project_key}"
+                if not isinstance(project, dict):
+                    errors.append(f"{project_where}: expected an object")
+                    continue
+                project = dict(project)
+                project.setdefault('project_name', project_key)
+                project.setdefault('team_name', None)
+                project.setdefault('tags', [])
+                for field in ('project_name', 'team_name', 'iteration_path', 'iteration_display'):
+                    if project.get(field) is not None and not isinstance(project[field], str):
+                        errors.append(f"{project_where}.{field}: expected a string")
+                if not isinstance(project['tags'], list) or not all(isinstance(t, str) for t in project['tags']):
+                    errors.append(f"{project_where}.tags: expected a list of strings")
+                if 'fallback_cadence' in project:
+                    _validate_cadence(project_where, project['fallback_cadence'], errors)
+                projects[project_key] = project
+        organizations[org_key] = {**org, 'name': name, 'projects': projects}
+
+    if errors:
+        raise ValueError("Invalid organization config:\n  " + "\n  ".join(errors))
+    return organizations, report_title
+
+
+def _read_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError(f"{path}: reading YAML requires PyYAML (pip install pyyaml), or use JSON")
+            try:
+                return yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(f"{path}: invalid YAML ({e})")
+        return json.load(f)
+
+
+def resolve_org_config_path(path):
+    """Relative paths are tried against the working directory, then this repo"""
+    if os.path.isabs(path) or os.path.exists(path):
+        return os.path.abspath(path)
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+
+
+def load_org_config(path):
+    """Load, validate and index the organization config file (cached until it changes)"""
+    path = resolve_org_config_path(path)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        raise ValueError(f"Organization config not found: {path}")
+    cached = _cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with span('config.load_org_config'):
+        try:
+            data = _read_file(path)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: invalid JSON ({e})")
+        organizations, report_title = validate_organizations(data)
+        org_config = OrgConfig(organizations, report_title, source=path)
+    _cache[path] = (mtime, org_config)
+    return org_config
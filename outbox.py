@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Durable Email Outbox
+Fully built report messages are spooled to disk before the first delivery
+attempt. Recipients the SMTP server could not take right now stay in the
+spool and are retried with exponential backoff, so a mail-server outage
+never forces another Azure DevOps fetch or report render.
+
+Layout (EMAIL_OUTBOX_DIR, default outbox/):
+    pending/<id>.eml + <id>.json   waiting for (re)delivery
+    sent/<id>.json                 delivered (message body dropped)
+    dead/<id>.eml + <id>.json      gave up after EMAIL_OUTBOX_MAX_ATTEMPTS
+
+Usage:
+    python3 outbox.py                # deliver everything that is due, once
+    python3 outbox.py --watch        # keep retrying until the spool is empty
+    python3 outbox.py --list         # show spooled messages
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from config import Config
+from smtp_pool import RECONNECT_ERRORS, SMTPSessionPool, is_permanent_error, message_bytes
+from report_log import flush_logs, get_logger
+
+log = get_logger(__name__)
+
+PENDING, SENT, DEAD = 'pending', 'sent', 'dead'
+
+
+def _outbox_path(state, name='', outbox_dir=None):
+    return os.path.join(outbox_dir or Config.EMAIL_OUTBOX_DIR, state, name)
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _save_entry(entry, state=PENDING, outbox_dir=None):
+    _write_atomic(_outbox_path(state, f"{entry['id']}.json", outbox_dir),
+                  json.dumps(entry, indent=2, ensure_ascii=False).encode('utf-8'))
+
+
+def _move_entry(entry, state, outbox_dir=None, keep_message=True):
+    """Move an entry out of pending/ (message file first, then its envelope)"""
+    message_file = _outbox_path(PENDING, f"{entry['id']}.eml", outbox_dir)
+    if keep_message:
+        os.makedirs(_outbox_path(state, '', outbox_dir), exist_ok=True)
+        os.replace(message_file, _outbox_path(state, f"{entry['id']}.eml", outbox_dir))
+    elif os.path.exists(message_file):
+        os.remove(message_file)
+    entry['status'] = state
+    _save_entry(entry, state, outbox_dir)
+    os.remove(_outbox_path(PENDING, f"{entry['id']}.json", outbox_dir))
+
+
+def retry_delay_seconds(attempts):
+    """Exponential backoff: base, 2x base, 4x base ... capped at the maximum"""
+    base = Config.EMAIL_OUTBOX_RETRY_BASE_SECONDS
+    return min(base * (2 ** max(attempts - 1, 0)), Config.EMAIL_OUTBOX_RETRY_MAX_SECONDS)
+
+
+def enqueue_message(msg, from_addr, recipients, outbox_dir=None):
+    """Spool a built message for delivery; returns its envelope entry"""
+    now = datetime.now()
+    entry = {
+        'id': f"{now.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}",
+        'status': PENDING,
+        'subject': msg['Subject'],
+        'from': from_addr,
+        'recipients': list(recipients),
+        'delivered': [],
+        'refused': {},
+        'attempts': 0,
+        'created_at': now.isoformat(timespec='seconds'),
+        'next_attempt_at': now.isoformat(timespec='seconds'),
+        'last_error': None
+    }
+    # Message first: an envelope in pending/ always has its message next to it
+    _write_atomic(_outbox_path(PENDING, f"{entry['id']}.eml", outbox_dir), message_bytes(msg))
+    _save_entry(entry, PENDING, outbox_dir)
+    return entry
+
+
+def load_pending(outbox_dir=None, due_only=True, now=None):
+    """Pending entries (oldest first); due_only skips those still backing off"""
+    pending_dir = _outbox_path(PENDING, '', outbox_dir)
+    if not os.path.isdir(pending_dir):
+        return []
+    now = now or datetime.now()
+    entries = []
+    for name in sorted(os.listdir(pending_dir)):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(pending_dir, name), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning(f"   ⚠️ Skipping unreadable outbox entry {name}: {e}")
+            continue
+        if not due_only or datetime.fromisoformat(entry['next_attempt_at']) <= now:
+            entries.append(entry)
+    return entries
+
+
+def entry_state(entry_id, outbox_dir=None):
+    """PENDING, SENT or DEAD for a spooled entry id (None if unknown)"""
+    for state in (PENDING, SENT, DEAD):
+        if os.path.exists(_outbox_path(state, f"{entry_id}.json", outbox_dir)):
+            return state
+    return None
+
+
+def load_message_bytes(entry, outbox_dir=None):
+    with open(_outbox_path(PENDING, f"{entry['id']}.eml", outbox_dir), 'rb') as f:
+        return f.read()
+
+
+def record_attempt(entry, results=None, error=None, outbox_dir=None):
+    """Apply one delivery attempt to a spooled entry.
+
+    results is SMTPSessionPool.send() output. Accepted recipients are done;
+    5xx refusals are permanent; 4xx refusals and connection errors are
+    retried with backoff. A 5xx error for the whole message (authentication,
+    sender or DATA rejected) refuses its remaining recipients and moves it
+    to dead/ at once. Returns the entry's new status.
+    """
+    entry['attempts'] += 1
+    entry['last_error'] = str(error) if error else None
+    remaining = []
+    permanent = error is not None and is_permanent_error(error)
+    if permanent:
+        for recipient in entry['recipients']:
+            entry['refused'][recipient] = f"{error.smtp_code} {entry['last_error']}"
+    elif error is not None:
+        remaining = list(entry['recipients'])
+    else:
+        for result in results or []:
+            if result['accepted']:
+                entry['delivered'].append(result['recipient'])
+            elif result['code'] is not None and 500 <= result['code'] < 600:
+                entry['refused'][result['recipient']] = f"{result['code']} {result['message']}"
+            else:
+                remaining.append(result['recipient'])
+                entry['last_error'] = f"{result['code']} {result['message']}"
+    entry['recipients'] = remaining
+
+    if permanent:
+        _move_entry(entry, DEAD, outbox_dir)
+    elif not remaining:
+        _move_entry(entry, SENT, outbox_dir, keep_message=False)
+    elif entry['attempts'] >= Config.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        _move_entry(entry, DEAD, outbox_dir)
+    else:
+        entry['next_attempt_at'] = (datetime.now() + timedelta(seconds=retry_delay_seconds(entry['attempts']))).isoformat(timespec='seconds')
+        _save_entry(entry, PENDING, outbox_dir)
+    return entry['status']
+
+
+def process_outbox(session=None, outbox_dir=None, entry_ids=None, force=False):
+    """Try every due entry once over one SMTP session.
+
+    entry_ids limits the run to specific entries; force ignores backoff.
+    Returns the flattened per-recipient results of this pass.
+    """
+    entries = load_pending(outbox_dir, due_only=not force)
+    if entry_ids is not None:
+        entries = [e for e in entries if e['id'] in entry_ids]
+    if not entries:
+        return []
+
+    own_session = session is None
+    session = session or SMTPSessionPool.from_config()
+    results = []
+    unreachable = None
+    try:
+        for entry in entries:
+            try:
+                if unreachable is not None:
+                    # Server already unreachable this pass; defer without reconnecting again
+                    raise unreachable
+                entry_results = session.send(load_message_bytes(entry, outbox_dir), entry['from'], entry['recipients'])
+            except Exception as e:
+                # Only a transport failure says the server is unreachable; a
+                # refusal concerns this entry, so the next one is still tried
+                if isinstance(e, RECONNECT_ERRORS):
+                    unreachable = e
+                recipients = list(entry['recipients'])
+                status = record_attempt(entry, error=e, outbox_dir=outbox_dir)
+                results.extend({'recipient': r, 'accepted': False, 'code': getattr(e, 'smtp_code', None), 'message': str(e)}
+                               for r in recipients)
+            else:
+                status = record_attempt(entry, entry_results, outbox_dir=outbox_dir)
+                results.extend(entry_results)
+            if status == PENDING:
+                log.info(f"   📥 {entry['id']}: {len(entry['recipients'])} recipient(s) queued for retry at {entry['next_attempt_at']}")
+            elif status == DEAD:
+                log.warning(f"   ☠️ {entry['id']}: giving up after {entry['attempts']} attempts ({entry['last_error']})")
+    finally:
+        if own_session:
+            session.close()
+    return results
+
+
+def run_retry_worker(poll_seconds=None, max_runtime_seconds=None, outbox_dir=None):
+    """Keep delivering due entries until the spool is empty (or the runtime cap is hit)"""
+    poll_seconds = poll_seconds or Config.EMAIL_OUTBOX_POLL_SECONDS
+    started = time.monotonic()
+    while True:
+        process_outbox(outbox_dir=outbox_dir)
+        pending = load_pending(outbox_dir, due_only=False)
+        if not pending:
+            log.info("✅ Outbox empty")
+            return True
+        if max_runtime_seconds is not None and time.monotonic() - started >= max_runtime_seconds:
+            log.info(f"⏱️ Stopping retry worker with {len(pending)} message(s) still spooled")
+            return False
+        next_due = min(datetime.fromisoformat(e['next_attempt_at']) for e in pending)
+        time.sleep(max(1, min(poll_seconds, (next_due - datetime.now()).total_seconds())))
+
+
+def main():
+    """Deliver spooled report emails"""
+    parser = argparse.ArgumentParser(description='Deliver spooled report emails')
+    parser.add_argument('--watch', action='store_true', help='keep retrying with backoff until the outbox is empty')
+    parser.add_argument('--max-runtime', type=int, default=None, help='stop --watch after this many seconds')
+    parser.add_argument('--force', action='store_true', help='retry now, ignoring backoff')
+    parser.add_argument('--list', action='store_true', help='list spooled messages and exit')
+    args = parser.parse_args()
+
+    log.info("📮 Email Outbox")
+    log.info("=" * 40)
+
+    if args.list:
+        for entry in load_pending(due_only=False):
+            log.info(f"   {entry['id']}: {entry['subject']} → {', '.join(entry['recipients'])} "
+                  f"(attempts {entry['attempts']}, next {entry['next_attempt_at']})")
+        return True
+
+    if args.watch:
+        return run_retry_worker(max_runtime_seconds=args.max_runtime)
+
+    process_outbox(force=args.force)
+    remaining = load_pending(due_only=False)
+    log.info(f"📮 {len(remaining)} message(s) still spooled" if remaining else "✅ Outbox empty")
+    return not remaining
+
+
+if __name__ == "__main__":
+    ok = main()
+    flush_logs()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Personalized Per-Recipient Reports
+Routes each recipient to the projects / teams / engineers they care about,
+renders the filtered reports concurrently from one loaded snapshot, and sends
+them all through a single SMTP session.
+
+Routing map (EMAIL_ROUTING_FILE, default email_routing.json):
+    {
+      "default": {},                                   # recipients not listed: full report
+      "recipients": {
+        "lead@company.com":  {"projects": ["IOL_X"]},
+        "vcc@company.com":   {"orgs": ["IOLPulse"]},
+        "team@company.com":  {"teams": ["Charlie Backend Team"]},
+        "dev@company.com":   {"engineers": ["Jane Doe"]}
+      }
+    }
+Project-level filters (orgs, projects, teams) must all match; "engineers"
+then narrows each matching project to those engineers.
+"""
+
+import json
+import os
+import sys
+from config import Config
+from report_model import find_project_config, split_project_key
+from report_log import flush_logs, get_logger
+
+log = get_logger(__name__)
+
+ROUTE_KEYS = ('orgs', 'projects', 'teams', 'engineers')
+
+# Snapshot shared with worker processes (set once per worker by the initializer)
+_worker_sprint_data = None
+
+
+def load_routing_map(path=None):
+    """Load the routing map; missing file means everyone gets the full report"""
+    path = path or Config.EMAIL_ROUTING_FILE
+    if not path or not os.path.exists(path):
+        return {'default': {}, 'recipients': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        routing = json.load(f)
+
+    for recipient, route in routing.get('recipients', {}).items():
+        unknown = set(route) - set(ROUTE_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown routing keys for {recipient}: {', '.join(sorted(unknown))}")
+    routing.setdefault('default', {})
+    routing.setdefault('recipients', {})
+    return routing
+
+
+def resolve_routes(routing, recipients=None):
+    """Group recipients by identical route so each distinct report renders once.
+
+    Only the configured recipients are routed; the routing map narrows what
+    they see and never adds addresses. Returns a list of (route, [recipients]).
+    """
+    recipients = list(recipients if recipients is not None else Config.get_email_recipients())
+    unmatched = sorted(set(routing['recipients']) - set(recipients))
+    if unmatched:
+        log.warning(f"   ⚠️ Routing entries for {', '.join(unmatched)} match no configured recipient; ignoring them")
+
+    groups = {}
+    for recipient in recipients:
+        route = routing['recipients'].get(recipient, routing['default'])
+        key = json.dumps(route, sort_keys=True)
+        groups.setdefault(key, (route, []))[1].append(recipient)
+    return list(groups.values())
+
+
+def _project_matches(project_key, route):
+    org_name, project_id = split_project_key(project_key)
+    project_config = find_project_config(org_name, project_id) or {}
+    if route.get('orgs') and org_name not in route['orgs']:
+        return False
+    if route.get('projects') and not {project_key, project_id, project_config.get('project_name')} & set(route['projects']):
+        return False
+    if route.get('teams') and project_config.get('team_name') not in route['teams']:
+        return False
+    return True
+
+
+def filter_sprint_data(sprint_data, route):
+    """Subset of sprint_data visible to a route (same snapshot shape)"""
+    filtered = {}
+    engineers = set(route.get('engineers') or [])
+    for project_key, result in sprint_data.items():
+        if not _project_matches(project_key, route):
+            continue
+        if not engineers:
+            filtered[project_key] = result
+            continue
+        engineer_metrics = {name: m for name, m in result['engineer_metrics'].items() if name in engineers}
+        if engineer_metrics:
+            filtered[project_key] = dict(
+                result,
+                engineer_metrics=engineer_metrics,
+                total_items=sum(m.get('total_items', 0) for m in engineer_metrics.values())
+            )
+    return filtered
+
+
+def _init_worker(sprint_data):
+    global _worker_sprint_data
+    _worker_sprint_data = sprint_data
+
+
+def _render_route(route, max_bytes, source_json):
+    """Render one route's outputs; runs in a worker process"""
+    from generate_html_report_compact import render_report_outputs
+    filtered = filter_sprint_data(_worker_sprint_data, route)
+    if not filtered or sum(r.get('total_items', 0) for r in filtered.values()) == 0:
+        return None
+    return render_report_outputs(filtered, max_bytes, source_json=source_json)
+
+
+def render_personalized_reports(sprint_data, groups, max_bytes=None, max_workers=None, source_json=None):
+    """Render each route group's report concurrently from the one loaded snapshot.
+
+    Returns a list of (recipients, outputs or None) in group order.
+    """
+    max_workers = max_workers or Config.REPORT_RENDER_WORKERS
+    routes = [route for route, _ in groups]
+    if max_workers <= 1 or len(routes) <= 1:
+        _init_worker(sprint_data)
+        rendered = [_render_route(route, max_bytes, source_json) for route in routes]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(routes)),
+                                 initializer=_init_worker, initargs=(sprint_data,)) as pool:
+            rendered = list(pool.map(_render_route, routes, [max_bytes] * len(routes), [source_json] * len(routes)))
+    return [(recipients, outputs) for (_, recipients), outputs in zip(groups, rendered)]
+
+
+def send_personalized_reports(json_file, routing_file=None, recipients=None, force=False):
+    """Load once, render per-route reports in parallel, deliver over one SMTP session.
+
+    Routes whose filtered report was already sent today (send ledger) are
+    skipped before rendering unless force is set.
+    """
+    from generate_html_report_compact import load_sprint_data
+    from send_email_direct import build_report_message, report_has_data
+    from smtp_pool import SMTPSessionPool, summarize_outcomes
+    from outbox import enqueue_message, process_outbox
+    from send_ledger import already_sent, ledger_key, record_send, report_content_hash
+
+    sprint_data = load_sprint_data(json_file)
+    if sprint_data is None:
+        return False
+
+    groups = resolve_routes(load_routing_map(routing_file), recipients)
+    log.info(f"🧭 {sum(len(r) for _, r in groups)} recipients → {len(groups)} distinct reports")
+
+    ledger_keys = {}
+    pending_groups = []
+    for route, group_recipients in groups:
+        filtered = filter_sprint_data(sprint_data, route)
+        if not any(r.get('total_items', 0) for r in filtered.values()):
+            log.warning(f"   ⚠️ No matching data for {', '.join(group_recipients)}; skipping")
+            continue
+        key = ledger_key(report_content_hash(filtered), group_recipients)
+        previous = None if force else already_sent(key)
+        if previous:
+            log.info(f"   ⏭️ {', '.join(group_recipients)}: identical report already {previous['status']} today")
+            continue
+        ledger_keys[tuple(group_recipients)] = key
+        pending_groups.append((route, group_recipients))
+    groups = pending_groups
+    if not groups:
+        log.info("✅ Nothing new to send today (use --force to resend)")
+        return True
+
+    rendered = render_personalized_reports(sprint_data, groups, Config.EMAIL_MAX_HTML_BYTES, source_json=json_file)
+
+    messages = []
+    for group_recipients, outputs in rendered:
+        # Same empty-report check send_email_direct applies before sending
+        if outputs is None or not report_has_data(None, outputs['html'], outputs['metadata']):
+            log.warning(f"   ⚠️ No matching data for {', '.join(group_recipients)}; skipping")
+            continue
+        html_name = f"personalized_report_{outputs['metadata']['content_sha256'][:12]}.html"
+        msg = build_report_message(html_name, outputs['html'], group_recipients, outputs['full_html'], outputs['text'])
+        messages.append((msg, Config.EMAIL_FROM, group_recipients))
+        log.info(f"   📄 {', '.join(group_recipients)}: {outputs['metadata']['html_bytes']:,} bytes")
+
+    if not messages:
+        log.error("❌ No personalized reports to send")
+        return False
+
+    log.info(f"📤 Sending {len(messages)} messages over one SMTP session...")
+    if Config.EMAIL_OUTBOX_ENABLED:
+        # Spool everything first; anything the server can't take now is retried from outbox/
+        entry_ids = set()
+        for msg, from_addr, rcpts in messages:
+            entry = enqueue_message(msg, from_addr, rcpts)
+            entry_ids.add(entry['id'])
+            record_send(ledger_keys[tuple(rcpts)], 'queued', {'outbox_id': entry['id']})
+        results = process_outbox(entry_ids=entry_ids, force=True)
+    else:
+        with SMTPSessionPool.from_config() as session:
+            results = session.send_batch(messages)
+    summarize_outcomes(results)
+
+    accepted = {r['recipient'] for r in results if r['accepted']}
+    for _, _, rcpts in messages:
+        if accepted & set(rcpts):
+            record_send(ledger_keys[tuple(rcpts)], 'sent', {'accepted': sorted(accepted & set(rcpts))})
+    return any(r['accepted'] for r in results)
+
+
+def main():
+    """Send personalized reports for the latest snapshot"""
+    import argparse
+    from run_complete_workflow_updated import find_latest_json_file
+
+    parser = argparse.ArgumentParser(description='Send personalized per-recipient sprint reports')
+    parser.add_argument('--force', action='store_true', help='resend reports already sent today')
+    args = parser.parse_args()
+
+    log.info("🧭 Personalized Sprint Reports")
+    log.info("=" * 40)
+    json_file, message = find_latest_json_file()
+    if not json_file:
+        log.error(f"❌ {message}")
+        return False
+    log.info(f"📁 {message}")
+    return send_personalized_reports(json_file, force=args.force)
+
+
+if __name__ == "__main__":
+    ok = main()
+    flush_logs()
+    sys.exit(0 if ok else 1)
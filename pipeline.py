@@ -0,0 +1,325 @@
+"""
+In-Process Reporting Pipeline
+Runs the workflow as a small stage DAG in one interpreter:
+
+    resolve → extract → aggregate → render → deliver → archive
+
+Each completed stage writes a checkpoint (data/checkpoints/<run_id>/<stage>.json)
+holding a hash of its inputs and its JSON output. A rerun on the same run id
+skips every stage whose checkpoint is present and whose inputs are unchanged,
+so a failed email or commit resumes at that step instead of refetching from
+Azure DevOps. An extract cut short by the run deadline (run_deadline.py) is
+not checkpointed, so a rerun fetches the timed-out projects again. Each
+stage is timed; with MEMORY_PROFILE=true each stage's peak memory and top
+allocation sites are reported too (memory_profile.py).
+"""
+
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from config import Config
+from memory_profile import memory_stage, memory_stages, memory_tracing, print_memory_report
+from run_deadline import set_deadline, start_run_deadline
+from run_profile import project_usage, reset_run_profile, span, write_run_profile
+from report_log import flush_logs, get_logger
+
+log = get_logger(__name__)
+
+CHECKPOINT_DIR = os.path.join('data', 'checkpoints')
+
+
+def run_stage(name, timings, func, *args, **kwargs):
+    """Run one stage, recording its wall time in timings"""
+    log.info(f"\n▶️ {name}")
+    log.info("-" * 30)
+    flush_logs()
+    started = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        timings.append((name, time.perf_counter() - started))
+        flush_logs()
+
+
+def print_stage_timings(timings):
+    """Print a per-stage timing table"""
+    total = sum(seconds for _, seconds in timings)
+    log.info("\n⏱️ Stage timings:")
+    for name, seconds in timings:
+        share = seconds / total * 100 if total else 0
+        log.info(f"   {name:<22} {seconds:8.2f}s  {share:5.1f}%")
+    log.info(f"   {'Total':<22} {total:8.2f}s")
+
+
+def hash_json(value):
+    """Stable SHA-256 of a JSON-serializable value"""
+    canonical = json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def file_sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Stages: each takes (inputs, options) where inputs maps dependency name to
+# that stage's checkpointed output, and returns a JSON-serializable output
+# (or None on failure). options['handoff'] carries in-memory results (the
+# loaded snapshot and report model) to later stages of the same run.
+# ---------------------------------------------------------------------------
+
+def _stage_resolve(inputs, options):
+    from get_sprint_count import resolve_sprints
+    plan = resolve_sprints()
+    # Keep only what extraction needs; datetimes are not JSON
+    for entry in plan:
+        period = entry['sprint_period'] or {}
+        entry['sprint_period'] = {k: period.get(k) for k in ('start_date', 'end_date', 'iteration_name', 'iteration_path')}
+    # Sprints computed after failed calls are not worth reusing on a rerun
+    incomplete = [f"{entry['org_name']}_{entry['project_name']}" for entry in plan if entry.get('degraded')]
+    return {'plan': plan, 'incomplete': incomplete}
+
+
+def _stage_extract(inputs, options):
+    from api_budget import enforce_api_budget, merge_usage
+    from get_sprint_count import extract_sprint_data, mark_failed_projects, print_sprint_summary, save_sprint_data
+    plan = inputs['resolve']['plan']
+    worker_usage = {}
+    if Config.EXTRACT_WORKERS > 1 and len(plan) > 1:
+        from extraction_queue import run_sharded_extraction, unit_api_usage
+        # Fresh queue run per execution, so rerunning this stage refetches
+        queue_run_id = f"{options['run_id']}_{datetime.now().strftime('%H%M%S')}"
+        sprint_data, missing = run_sharded_extraction(plan, run_id=queue_run_id)
+        worker_usage = unit_api_usage(queue_run_id)
+        if missing:
+            log.warning(f"⚠️ Continuing without {len(missing)} project(s), marked partial: {', '.join(missing)}")
+    else:
+        from fetch_cost import record_fetch_costs
+        costs = {}
+        sprint_data = mark_failed_projects(extract_sprint_data(plan, costs), plan)
+        record_fetch_costs(costs)
+    if not sprint_data or not any(r.get('total_items', 0) for r in sprint_data.values()):
+        log.error("❌ No sprint data extracted")
+        return None
+    # Sprint resolution (this process) plus extraction (here or in the workers)
+    if not enforce_api_budget(merge_usage(project_usage(), worker_usage)):
+        return None
+    json_file = save_sprint_data(sprint_data)
+    print_sprint_summary(sprint_data)
+    # Placeholders for projects lost to the deadline, an open circuit or an org error
+    incomplete = sorted(key for key, result in sprint_data.items()
+                        if (result.get('partial') or {}).get('failed') or (result.get('partial') or {}).get('timed_out'))
+    return {'json_file': json_file, 'sha256': file_sha256(json_file), 'incomplete': incomplete}
+
+
+def _stage_aggregate(inputs, options):
+    from generate_html_report_compact import load_sprint_data
+    from report_model import build_report_model
+    from report_renderers import build_summary
+    from send_ledger import report_content_hash
+    json_file = inputs['extract']['json_file']
+    sprint_data = load_sprint_data(json_file)
+    if sprint_data is None:
+        return None
+    model = build_report_model(sprint_data)
+    options['handoff'].update(json_file=json_file, sprint_data=sprint_data, model=model)
+    summary = build_summary(model)
+    summary.pop('generated_at')
+    return {'summary': summary, 'report_content_hash': report_content_hash(sprint_data)}
+
+
+def _previous_send(inputs, options):
+    """(ledger key, earlier send record or None) for this report and the configured recipients"""
+    from send_ledger import already_sent, ledger_key
+    key = ledger_key(inputs['aggregate']['report_content_hash'], Config.get_email_recipients())
+    return key, None if options.get('force') else already_sent(key)
+
+
+def _stage_render(inputs, options):
+    from generate_html_report_compact import load_sprint_data, render_report_outputs, save_report_outputs
+    if options.get('send_email', True):
+        _, previous = _previous_send(inputs, options)
+        if previous:
+            log.info(f"⏭️ Identical report already {previous['status']} today ({previous['recorded_at']}); "
+                     f"skipping render and email")
+            return {'paths': {}, 'already_sent': True}
+    json_file = inputs['extract']['json_file']
+    handoff = options['handoff']
+    if handoff.get('json_file') == json_file:
+        # Aggregate ran in this process: reuse its snapshot and model
+        sprint_data, model = handoff['sprint_data'], handoff['model']
+    else:
+        sprint_data, model = load_sprint_data(json_file), None
+    outputs = render_report_outputs(sprint_data, Config.EMAIL_MAX_HTML_BYTES, source_json=json_file, model=model)
+    paths = save_report_outputs(outputs)
+    size_budget = outputs['metadata']['size_budget']
+    log.info(f"✅ Report generated: {paths['html']} ({size_budget['size_bytes']:,} bytes, level: {size_budget['level']})")
+    return {'paths': paths, 'content_sha256': outputs['metadata']['content_sha256']}
+
+
+def _stage_deliver(inputs, options):
+    from send_email_direct import send_email_directly
+    if not options.get('send_email', True):
+        log.info("📧 Email sending skipped")
+        return {'skipped': True}
+
+    recipients = Config.get_email_recipients()
+    key, previous = _previous_send(inputs, options)
+    if inputs['render'].get('already_sent'):
+        return {'ledger_key': key, 'skipped': True}
+    if previous:
+        log.info(f"⏭️ Identical report already {previous['status']} today ({previous['recorded_at']}); skipping")
+        return {'ledger_key': key, 'skipped': True}
+
+    paths = inputs['render']['paths']
+    contents = {}
+    for name in ('html', 'full_html', 'text'):
+        if paths.get(name):
+            with open(paths[name], 'r', encoding='utf-8') as f:
+                contents[name] = f.read()
+    if not send_email_directly(paths['html'], contents['html'], contents.get('full_html'), contents.get('text'),
+                               ledger_key=key):
+        return None
+    return {'ledger_key': key, 'recipients': recipients}
+
+
+def _stage_archive(inputs, options):
+    if not options.get('auto_commit', True):
+        log.info("🤖 Auto commit skipped")
+        return {'skipped': True}
+    from auto_commit_push import auto_commit_push
+    return {'committed': True} if auto_commit_push() else None
+
+
+# (name, dependencies, function, label, extra input fingerprint)
+STAGES = [
+    ('resolve', [], _stage_resolve, "Resolve sprints",
+     lambda options: {'organizations': Config.ORGANIZATIONS, 'date': options['run_id']}),
+    ('extract', ['resolve'], _stage_extract, "Extract work items", lambda options: {}),
+    ('aggregate', ['extract'], _stage_aggregate, "Aggregate", lambda options: {}),
+    ('render', ['extract', 'aggregate'], _stage_render, "Render report",
+     lambda options: {'recipients': Config.get_email_recipients(), 'send_email': options.get('send_email', True),
+                      'force': options.get('force', False)}),
+    ('deliver', ['aggregate', 'render'], _stage_deliver, "Deliver email",
+     lambda options: {'recipients': Config.get_email_recipients(), 'send_email': options.get('send_email', True)}),
+    ('archive', ['deliver'], _stage_archive, "Archive (auto commit)",
+     lambda options: {'auto_commit': options.get('auto_commit', True)}),
+]
+STAGE_NAMES = [stage[0] for stage in STAGES]
+
+
+def prune_checkpoints(keep):
+    """Delete all but the `keep` most recently written run directories under CHECKPOINT_DIR"""
+    import shutil
+    if not os.path.isdir(CHECKPOINT_DIR):
+        return []
+    run_dirs = [os.path.join(CHECKPOINT_DIR, name) for name in os.listdir(CHECKPOINT_DIR)]
+    run_dirs = sorted((d for d in run_dirs if os.path.isdir(d)), key=os.path.getmtime, reverse=True)
+    for run_dir in run_dirs[max(keep, 1):]:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    return run_dirs[max(keep, 1):]
+
+
+def checkpoint_path(run_id, stage):
+    return os.path.join(CHECKPOINT_DIR, run_id, f"{stage}.json")
+
+
+def load_checkpoint(run_id, stage):
+    try:
+        with open(checkpoint_path(run_id, stage), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_checkpoint(run_id, stage, input_hash, output):
+    path = checkpoint_path(run_id, stage)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'stage': stage, 'input_hash': input_hash, 'output': output,
+                   'completed_at': datetime.now().isoformat(timespec='seconds')}, f, indent=2, ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
+
+
+def _checkpoint_still_valid(stage, checkpoint):
+    """Artifacts a checkpoint points at must still exist on disk"""
+    output = checkpoint['output']
+    if stage == 'extract':
+        return os.path.exists(output['json_file']) and file_sha256(output['json_file']) == output['sha256']
+    if stage == 'render':
+        # A render skipped for an earlier send is rechecked against the ledger
+        return not output.get('already_sent') and all(os.path.exists(path) for path in output['paths'].values() if path)
+    return True
+
+
+def run_pipeline(send_email=True, auto_commit=True, force=False, run_id=None, resume=True, rerun_from=None,
+                 memory_profile=None):
+    """Run the stage DAG in-process, resuming from checkpoints.
+
+    run_id groups checkpoints (default: today's date, so same-day reruns
+    resume). resume=False ignores existing checkpoints; rerun_from forces
+    that stage and everything after it to run again. memory_profile runs the
+    stages under tracemalloc (default: MEMORY_PROFILE).
+    Returns a dict with 'success', 'timings' ([(stage, seconds)]), 'json_file',
+    'report_paths', 'stages' ({stage: 'ran' | 'skipped' | 'failed'}) and
+    'profile' (path of the JSON run profile, see run_profile.py).
+    """
+    options = {'send_email': send_email, 'auto_commit': auto_commit, 'force': force,
+               'run_id': run_id or datetime.now().strftime('%Y%m%d'), 'handoff': {}}
+    run_id = options['run_id']
+    forced = set(STAGE_NAMES[STAGE_NAMES.index(rerun_from):]) if rerun_from else set()
+
+    run = {'success': False, 'timings': [], 'json_file': None, 'report_paths': None, 'stages': {}}
+    reset_run_profile()
+    start_run_deadline()
+    timings = run['timings']
+    outputs = {}
+
+    try:
+        with memory_tracing(Config.MEMORY_PROFILE if memory_profile is None else memory_profile):
+            with span('stage.validate'), memory_stage('validate'):
+                config_ok = run_stage("Validate configuration", timings, Config.validate_config)
+            if not config_ok:
+                log.error("❌ Configuration validation failed")
+                return run
+
+            for name, deps, func, label, fingerprint in STAGES:
+                inputs = {dep: outputs[dep] for dep in deps}
+                input_hash = hash_json({'inputs': inputs, 'params': fingerprint(options)})
+                checkpoint = load_checkpoint(run_id, name) if resume and name not in forced else None
+
+                if checkpoint and checkpoint['input_hash'] == input_hash and _checkpoint_still_valid(name, checkpoint):
+                    log.info(f"\n⏭️ {label}: inputs unchanged, reusing checkpoint from {checkpoint['completed_at']}")
+                    outputs[name] = checkpoint['output']
+                    run['stages'][name] = 'skipped'
+                    continue
+
+                with span(f"stage.{name}"), memory_stage(name):
+                    output = run_stage(label, timings, func, inputs, options)
+                if output is None:
+                    log.error(f"❌ {label} failed; rerun to resume from this stage")
+                    run['stages'][name] = 'failed'
+                    return run
+                if output.get('incomplete'):
+                    log.warning(f"⏰ {label}: incomplete for {', '.join(output['incomplete'])}; not checkpointing, "
+                                f"so a rerun fetches them again")
+                else:
+                    save_checkpoint(run_id, name, input_hash, output)
+                outputs[name] = output
+                run['stages'][name] = 'ran'
+
+            run['json_file'] = outputs['extract']['json_file']
+            run['report_paths'] = outputs['render']['paths']
+            run['success'] = True
+            return run
+    finally:
+        set_deadline(None)
+        print_stage_timings(timings)
+        print_memory_report(memory_stages())
+        run['profile'] = write_run_profile('pipeline')
+        log.info(f"📅 Finished at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        flush_logs()
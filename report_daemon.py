@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Report Scheduler Daemon
+Stays resident and runs the reporting pipeline at the times in
+REPORT_SCHEDULE_TIMES, keeping the Azure DevOps HTTP session, iteration
+calendars and work item store warm between runs. Spooled emails in the
+outbox are retried while it idles.
+
+Usage:
+    python3 report_daemon.py                 # serve on the configured schedule
+    python3 report_daemon.py --run-now       # also run once at startup
+    python3 report_daemon.py --trigger       # ask a running daemon to run now
+
+A running daemon also runs immediately on SIGUSR1 or when the trigger file
+(DAEMON_TRIGGER_FILE) appears.
+"""
+
+import argparse
+import os
+import signal
+import sys
+import threading
+from datetime import datetime, timedelta
+from config import Config
+from report_log import flush_logs, get_logger
+
+log = get_logger(__name__)
+
+
+def parse_schedule(spec):
+    """'05:00,13:30' -> sorted [(5, 0), (13, 30)]"""
+    times = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        hour, minute = part.split(':')
+        hour, minute = int(hour), int(minute)
+        if not (0 <= hour < 24 and 0 <= minute < 60):
+            raise ValueError(f"Invalid schedule time: {part}")
+        times.append((hour, minute))
+    if not times:
+        raise ValueError("REPORT_SCHEDULE_TIMES is empty")
+    return sorted(times)
+
+
+def next_run_after(now, schedule):
+    """Next scheduled datetime strictly after now"""
+    for day_offset in (0, 1):
+        day = now + timedelta(days=day_offset)
+        for hour, minute in schedule:
+            candidate = day.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if candidate > now:
+                return candidate
+    raise ValueError("empty schedule")
+
+
+def request_run_now(trigger_file=None):
+    """Create the trigger file a running daemon polls for"""
+    trigger_file = trigger_file or Config.DAEMON_TRIGGER_FILE
+    os.makedirs(os.path.dirname(trigger_file) or '.', exist_ok=True)
+    with open(trigger_file, 'w', encoding='utf-8') as f:
+        f.write(datetime.now().isoformat(timespec='seconds'))
+    log.info(f"📨 Run requested via {trigger_file}")
+
+
+def warm_up():
+    """Enable the caches that survive between runs"""
+    from get_sprint_count import get_http_session
+    from work_item_store import enable_work_item_store
+    get_http_session()
+    enable_work_item_store()
+
+
+def run_report(reason):
+    """One pipeline run with fresh data; never raises"""
+    from pipeline import prune_checkpoints, run_pipeline
+    from work_item_store import get_work_item_store
+
+    log.info(f"\n🚀 Report run ({reason}) at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    try:
+        # A per-run id: checkpoints resume within a run, but every run fetches fresh data
+        run = run_pipeline(send_email=True, auto_commit=Config.DAEMON_AUTO_COMMIT,
+                           run_id=datetime.now().strftime('%Y%m%d_%H%M%S'))
+        pruned = prune_checkpoints(Config.DAEMON_KEEP_CHECKPOINT_RUNS)
+        if pruned:
+            log.debug(f"   🧹 Pruned {len(pruned)} old checkpoint run(s)")
+        stats = get_work_item_store().stats()
+        (log.info if run['success'] else log.error)(
+            f"{'✅' if run['success'] else '❌'} Run finished; work item store holds "
+            f"{stats['items']} items across {stats['projects']} projects")
+        return run['success']
+    except Exception as e:
+        log.error(f"❌ Report run crashed: {e}")
+        return False
+
+
+def retry_outbox():
+    """Deliver any spooled emails that are due; never raises"""
+    from outbox import load_pending, process_outbox
+    try:
+        if load_pending():
+            process_outbox()
+    except Exception as e:
+        log.warning(f"   ⚠️ Outbox retry failed: {e}")
+
+
+def serve(schedule, run_now=False, trigger_file=None, poll_seconds=None, max_runs=None):
+    """Run the schedule loop until interrupted (or max_runs runs have happened)"""
+    trigger_file = trigger_file or Config.DAEMON_TRIGGER_FILE
+    poll_seconds = poll_seconds or Config.DAEMON_POLL_SECONDS
+    wake = threading.Event()
+    if run_now:
+        wake.set()
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: wake.set())
+
+    warm_up()
+    runs = 0
+    next_run = next_run_after(datetime.now(), schedule)
+    log.info(f"🕐 Schedule: {', '.join(f'{h:02d}:{m:02d}' for h, m in schedule)} — next run at {next_run.strftime('%Y-%m-%d %H:%M')}")
+    log.info(f"   Trigger: kill -USR1 {os.getpid()}  or  python3 report_daemon.py --trigger")
+    flush_logs()
+
+    while max_runs is None or runs < max_runs:
+        wake.wait(timeout=poll_seconds)
+        reason = None
+        if wake.is_set():
+            wake.clear()
+            reason = 'triggered'
+        elif os.path.exists(trigger_file):
+            os.remove(trigger_file)
+            reason = 'triggered'
+        elif datetime.now() >= next_run:
+            reason = 'scheduled'
+
+        if reason:
+            run_report(reason)
+            runs += 1
+            next_run = next_run_after(datetime.now(), schedule)
+            log.info(f"🕐 Next scheduled run at {next_run.strftime('%Y-%m-%d %H:%M')}")
+            # Idle until the next run: nothing should sit in the log buffer
+            flush_logs()
+        else:
+            retry_outbox()
+    return True
+
+
+def main():
+    """Run the report scheduler daemon"""
+    parser = argparse.ArgumentParser(description='Run the sprint report on a schedule in a resident process')
+    parser.add_argument('--run-now', action='store_true', help='run once immediately at startup')
+    parser.add_argument('--trigger', action='store_true', help='ask a running daemon to run now, then exit')
+    parser.add_argument('--max-runs', type=int, default=None, help='exit after this many runs')
+    args = parser.parse_args()
+
+    if args.trigger:
+        request_run_now()
+        return True
+
+    log.info("🛰️ Sprint Report Daemon")
+    log.info("=" * 40)
+    try:
+        return serve(parse_schedule(Config.REPORT_SCHEDULE_TIMES), run_now=args.run_now, max_runs=args.max_runs)
+    except KeyboardInterrupt:
+        log.info("\n⏹️ Daemon stopped")
+        return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
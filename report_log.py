@@ -0,0 +1,132 @@
+"""
+Report Logging
+Leveled, buffered console logging for the sprint report scripts, on top of
+the standard logging module:
+
+    from report_log import get_logger
+    log = get_logger(__name__)
+    log.info(f"🔍 Querying {organization}/{project} project...")
+    log.debug(f"      📅 {iteration_name} ({start_date} to {end_date})")
+
+Settings (read on the first message; importing loads neither logging nor .env):
+- LOG_LEVEL: DEBUG / INFO (default) / WARNING / ERROR
+- LOG_QUIET=true: production mode, warnings and errors only
+- LOG_LEVELS: per-module overrides, e.g. "get_sprint_count=DEBUG,pipeline=WARNING"
+  (they also apply in quiet mode)
+- LOG_FORMAT: plain (the message as written, default) or json (one object per line)
+- LOG_BUFFER_LINES: lines held before writing (default 200; 0 = unbuffered).
+  A warning or error writes everything buffered before it immediately, so
+  problems are never delayed. flush_logs() writes the rest, e.g. at the end
+  of a stage.
+"""
+
+import json
+import sys
+from datetime import datetime
+
+ROOT_LOGGER = 'sprint_report'
+
+_configured = False
+
+
+def _parse_level(logging, name, default):
+    level = logging.getLevelName(str(name).strip().upper())
+    return level if isinstance(level, int) else default
+
+
+def _make_handlers(logging, log_format, buffer_lines):
+    import logging.handlers
+
+    class StdoutHandler(logging.StreamHandler):
+        """Writes to the current sys.stdout (so redirect_stdout and pytest capture apply)"""
+
+        @property
+        def stream(self):
+            return sys.stdout
+
+        @stream.setter
+        def stream(self, value):
+            pass
+
+    record_attrs = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+    class JsonFormatter(logging.Formatter):
+        """One JSON object per line: ts, level, logger, message plus any `extra` fields"""
+
+        def format(self, record):
+            entry = {
+                'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+                'level': record.levelname.lower(),
+                'logger': record.name.split('.', 1)[-1],
+                'message': record.getMessage().strip(),
+            }
+            entry.update({k: v for k, v in vars(record).items() if k not in record_attrs})
+            if record.exc_info:
+                entry['exception'] = self.formatException(record.exc_info)
+            return json.dumps(entry, ensure_ascii=False, default=str)
+
+    output = StdoutHandler()
+    output.setFormatter(JsonFormatter() if log_format == 'json' else logging.Formatter('%(message)s'))
+    if buffer_lines > 0:
+        return logging.handlers.MemoryHandler(buffer_lines, flushLevel=logging.WARNING, target=output)
+    return output
+
+
+def configure_logging(level=None, quiet=None, module_levels=None, log_format=None, buffer_lines=None):
+    """Set up handlers and levels; arguments default to the LOG_* settings"""
+    global _configured
+    import logging
+    from config import Config
+    level = _parse_level(logging, level or Config.LOG_LEVEL, logging.INFO)
+    if Config.LOG_QUIET if quiet is None else quiet:
+        level = max(level, logging.WARNING)
+    module_levels = Config.LOG_LEVELS if module_levels is None else module_levels
+    log_format = (log_format or Config.LOG_FORMAT).lower()
+    buffer_lines = Config.LOG_BUFFER_LINES if buffer_lines is None else buffer_lines
+
+    root = logging.getLogger(ROOT_LOGGER)
+    for handler in list(root.handlers):
+        handler.flush()
+        handler.close()
+        root.removeHandler(handler)
+    root.addHandler(_make_handlers(logging, log_format, buffer_lines))
+    root.setLevel(level)
+    root.propagate = False
+
+    for part in filter(None, (p.strip() for p in module_levels.split(','))):
+        module, _, module_level = part.partition('=')
+        logging.getLogger(f"{ROOT_LOGGER}.{module.strip()}").setLevel(_parse_level(logging, module_level, level))
+    _configured = True
+
+
+def flush_logs():
+    """Write any buffered log lines now"""
+    if _configured:
+        import logging
+        for handler in logging.getLogger(ROOT_LOGGER).handlers:
+            handler.flush()
+
+
+class _Logger:
+    """What get_logger returns: loads logging and the settings on first use"""
+
+    def __init__(self, name):
+        self._name = f"{ROOT_LOGGER}.{name}"
+
+    def __getattr__(self, attr):
+        if not _configured:
+            configure_logging()
+        import logging
+        value = getattr(logging.getLogger(self._name), attr)
+        # Cache bound methods (info, debug, ...) so later calls skip this lookup
+        setattr(self, attr, value)
+        return value
+
+
+def get_logger(name):
+    """Logger for a module (pass __name__); a logging.Logger once first used"""
+    if name == '__main__':
+        # Run as a script: use the file name so LOG_LEVELS=get_sprint_count=... still matches
+        import os
+        name = os.path.splitext(os.path.basename(getattr(sys.modules['__main__'], '__file__', '') or 'main'))[0]
+    return _Logger(name)
@@ -0,0 +1,135 @@
+"""
+Report Metadata Sidecars
+Small JSON files written next to each generated HTML report so validation
+and "latest valid report" selection never need to re-parse the HTML.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+METADATA_SUFFIX = '.meta.json'
+REPORT_PREFIXES = ('compact_sprint_report_', 'sprint_report_')
+
+
+def content_hash(html_content):
+    """Return the SHA-256 hex digest of the HTML report content"""
+    return hashlib.sha256(html_content.encode('utf-8')).hexdigest()
+
+
+def summarize_sprint_data(sprint_data):
+    """Compute the report totals straight from the loaded sprint data"""
+    return {
+        'total_work_items': sum(result.get('total_items', 0) for result in sprint_data.values()),
+        'project_count': len(sprint_data),
+        'engineer_count': sum(len(result.get('engineer_metrics', {})) for result in sprint_data.values())
+    }
+
+
+def build_report_metadata(sprint_data, html_content, source_json=None):
+    """Build the sidecar payload for a freshly generated report"""
+    metadata = summarize_sprint_data(sprint_data)
+    metadata.update({
+        'content_sha256': content_hash(html_content),
+        'html_bytes': len(html_content.encode('utf-8')),
+        'source_json': source_json,
+        'generated_at': datetime.now().isoformat(timespec='seconds')
+    })
+    return metadata
+
+
+def metadata_path_for(html_file):
+    """Map report.html -> report.meta.json"""
+    base, _ = os.path.splitext(html_file)
+    return base + METADATA_SUFFIX
+
+
+def html_path_for(metadata_file):
+    """Map report.meta.json -> report.html"""
+    return metadata_file[:-len(METADATA_SUFFIX)] + '.html'
+
+
+def write_report_metadata(html_file, metadata):
+    """Write the sidecar for html_file and return its path"""
+    metadata_file = metadata_path_for(html_file)
+    with open(metadata_file, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+    return metadata_file
+
+
+def load_report_metadata(html_file):
+    """Load the sidecar for html_file, or None if it is missing or unreadable"""
+    try:
+        with open(metadata_path_for(html_file), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def metadata_has_data(metadata):
+    """Same rule as validate_html_has_data, evaluated on the recorded counts"""
+    if not metadata:
+        return False
+    return all(metadata.get(key, 0) > 0 for key in ('total_work_items', 'project_count', 'engineer_count'))
+
+
+def metadata_matches_content(metadata, html_content):
+    """Check the sidecar still describes this exact HTML"""
+    return bool(metadata) and metadata.get('content_sha256') == content_hash(html_content)
+
+
+def save_report(html_content, metadata, output_file=None):
+    """Write the HTML report plus its sidecar; returns the HTML path"""
+    if not output_file:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_file = f'compact_sprint_report_{timestamp}.html'
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    if metadata is not None:
+        write_report_metadata(output_file, metadata)
+    return output_file
+
+
+def find_latest_valid_report(directory='.'):
+    """Return (html_file, metadata) for the newest report whose sidecar has data.
+
+    Only sidecars are read; HTML files are never opened here.
+    """
+    for prefix in REPORT_PREFIXES:
+        sidecars = [
+            os.path.join(directory, f) for f in os.listdir(directory)
+            if f.startswith(prefix) and f.endswith(METADATA_SUFFIX)
+        ]
+        sidecars.sort(key=os.path.getmtime, reverse=True)
+
+        for metadata_file in sidecars:
+            html_file = html_path_for(metadata_file)
+            if not os.path.exists(html_file):
+                continue
+            try:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if metadata_has_data(metadata):
+                return html_file, metadata
+
+    return None, None
+
+
+def reports_without_metadata(directory='.'):
+    """HTML reports that have no sidecar (written before sidecars existed), newest first.
+
+    Compact reports come before regular ones; .full.html copies are left out.
+    """
+    reports = []
+    for prefix in REPORT_PREFIXES:
+        html_files = [
+            os.path.join(directory, f) for f in os.listdir(directory)
+            if f.startswith(prefix) and f.endswith('.html') and not f.endswith('.full.html')
+            and not os.path.exists(metadata_path_for(os.path.join(directory, f)))
+        ]
+        reports.extend(sorted(html_files, key=os.path.getmtime, reverse=True))
+    return reports
@@ -0,0 +1,148 @@
+"""
+Report Model
+Aggregates a sprint_count_*.json snapshot once into an in-memory model that
+every output format (HTML, plain text, CSV, JSON summary) renders from.
+"""
+
+from datetime import datetime
+from config import Config
+
+# Display order for status summaries (remaining categories follow by count)
+PREFERRED_STATUS_ORDER = ['In Progress', 'To Do', 'Done', 'Ready for QA', 'QA in Progress', 'Ready for Release']
+PENDING_CATEGORIES = ['To Do', 'In Progress', 'Ready for QA', 'QA in Progress', 'Ready for Release']
+
+
+def _status_sort_key(item):
+    status, count = item
+    in_order = status in PREFERRED_STATUS_ORDER
+    return (PREFERRED_STATUS_ORDER.index(status) if in_order else len(PREFERRED_STATUS_ORDER), -count, status)
+
+
+def _resolve_sprint_window(sprint_data):
+    """Overall sprint start/end, taken from the snapshot so the header matches the data"""
+    periods = [
+        r.get('sprint_period') for r in sprint_data.values()
+        if r.get('sprint_period') and r['sprint_period'].get('start_date') and r['sprint_period'].get('end_date')
+    ]
+    if periods:
+        try:
+            parsed_starts = [datetime.strptime(p['start_date'], '%d-%b-%Y') for p in periods]
+            parsed_ends = [datetime.strptime(p['end_date'], '%d-%b-%Y') for p in periods]
+            return min(parsed_starts).strftime('%d-%b-%Y'), max(parsed_ends).strftime('%d-%b-%Y')
+        except (ValueError, TypeError):
+            return periods[0]['start_date'], max(p['end_date'] for p in periods)
+
+    # Snapshot predates sprint periods: ask Azure DevOps (loads the fetch stack only here)
+    from get_sprint_count import get_current_sprint_period
+    overall_sprint_period = get_current_sprint_period()
+    return overall_sprint_period.get('start_date', ''), overall_sprint_period.get('end_date', '')
+
+
+def split_project_key(project_key):
+    """Split a snapshot key ("IWTX_IOL_X", "IOLPulse_VCCWallet") into (org_name, project_id)"""
+    org_project = project_key.split('_', 1)
+    if len(org_project) == 2:
+        return org_project[0], org_project[1]
+    return "Unknown", project_key
+
+
+def find_project_config(org_name, project_id):
+    """Look up a project's configuration by organization name and project key"""
+    return Config.get_org_config().find_project(org_name, project_id)
+
+
+def _iteration_display(result, project_config):
+    sprint_info = result.get('sprint_period')
+    if sprint_info:
+        start_date = sprint_info.get('start_date', '')
+        end_date = sprint_info.get('end_date', '')
+        if sprint_info.get('iteration_name'):
+            return f"{sprint_info['iteration_name']} ({start_date} to {end_date})"
+        return f"Current Sprint ({start_date} to {end_date})"
+    return project_config.get('iteration_display', 'Current Sprint') if project_config else "Current Sprint"
+
+
+def _build_engineer(name, metrics):
+    total_items = metrics.get('total_items', 0)
+
+    categories = {}
+    for state, count in metrics.get('states', {}).items():
+        category = Config.get_state_category(state)
+        categories[category] = categories.get(category, 0) + count
+    sorted_categories = sorted(categories.items(), key=lambda x: x[1], reverse=True)
+
+    pending_tasks = []
+    completed_tasks = []
+    pending_counts = {cat: 0 for cat in PENDING_CATEGORIES}
+    for task in metrics.get('tasks', []):
+        category = Config.get_state_category(task['state'])
+        entry = {'title': task['title'], 'state': task['state'], 'category': category, 'tags': task.get('tags', '')}
+        if category == 'Done':
+            completed_tasks.append(entry)
+        else:
+            pending_tasks.append(entry)
+            if category in pending_counts:
+                pending_counts[category] += 1
+    pending_tasks.sort(key=lambda t: t['title'].lower())
+    completed_tasks.sort(key=lambda t: t['title'].lower())
+
+    done = categories.get('Done', 0)
+    return {
+        'name': name,
+        'total_items': total_items,
+        'status_counts': sorted_categories,
+        'completed_count': done,
+        'completion_percentage': round(done / total_items * 100) if total_items > 0 else 0,
+        'top_status': sorted_categories[0] if sorted_categories else None,
+        'has_tasks': bool(metrics.get('tasks')),
+        'pending_counts': {cat: count for cat, count in pending_counts.items() if count > 0},
+        'pending_tasks': pending_tasks,
+        'completed_tasks': completed_tasks
+    }
+
+
+def build_report_model(sprint_data):
+    """Aggregate loaded sprint data into the shared report model (one pass)"""
+    sprint_start, sprint_end = _resolve_sprint_window(sprint_data)
+
+    projects = []
+    global_status_counts = {}
+    for project_key, result in sprint_data.items():
+        org_name, project_id = split_project_key(project_key)
+        project_config = find_project_config(org_name, project_id)
+        tags = project_config['tags'] if project_config else []
+
+        engineers = [_build_engineer(name, metrics) for name, metrics in result['engineer_metrics'].items()]
+        status_counts = {}
+        for engineer in engineers:
+            for category, count in engineer['status_counts']:
+                status_counts[category] = status_counts.get(category, 0) + count
+                global_status_counts[category] = global_status_counts.get(category, 0) + count
+
+        projects.append({
+            'key': project_key,
+            'org_name': org_name,
+            'project_id': project_id,
+            'display_name': project_config['project_name'] if project_config else project_id,
+            'tags': tags,
+            'tag_display': f"Filtered by: {', '.join(tags)}" if tags else "All work items",
+            'iteration_display': _iteration_display(result, project_config),
+            'sprint_period': result.get('sprint_period'),
+            'total_items': result['total_items'],
+            # Set when extraction could not fetch everything (see get_sprint_count.mark_failed_projects)
+            'partial': result.get('partial'),
+            'status_counts': sorted(status_counts.items(), key=_status_sort_key),
+            'engineers': engineers
+        })
+
+    return {
+        'generated_at': datetime.now(),
+        'report_title': Config.REPORT_TITLE,
+        'sprint_start': sprint_start,
+        'sprint_end': sprint_end,
+        'total_work_items': sum(p['total_items'] for p in projects),
+        'project_count': len(projects),
+        'engineer_count': sum(len(p['engineers']) for p in projects),
+        'status_counts': sorted(global_status_counts.items(), key=_status_sort_key),
+        'projects': projects
+    }
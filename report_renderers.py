@@ -0,0 +1,108 @@
+"""
+Report Renderers
+Plain-text digest, task CSV and JSON summary outputs, all rendered from the
+shared report model built by report_model.build_report_model.
+"""
+
+import csv
+import io
+import json
+
+CSV_COLUMNS = ['organization', 'project', 'engineer', 'title', 'state', 'category', 'tags']
+
+
+def render_text_digest(model, max_tasks_per_engineer=None):
+    """Plain-text digest used as the email text/plain part"""
+    generated_at = model['generated_at']
+    lines = [
+        f"Sprint Report - Daily - {generated_at.strftime('%B %d, %Y')} - {model['report_title']}",
+        f"Sprint Period: {model['sprint_start']} - {model['sprint_end']}",
+        f"Generated on {generated_at.strftime('%B %d, %Y at %I:%M %p')}",
+        "",
+        f"Total Work Items: {model['total_work_items']} | Projects: {model['project_count']} | Engineers: {model['engineer_count']}",
+    ]
+    if model['status_counts']:
+        lines.append("Status: " + ", ".join(f"{status} {count}" for status, count in model['status_counts']))
+
+    for project in model['projects']:
+        lines += [
+            "",
+            "=" * 60,
+            f"{project['display_name']} - {project['iteration_display']}",
+            f"{project['tag_display']} | Total: {project['total_items']}",
+        ]
+        if project['partial']:
+            lines.append(f"WARNING: incomplete data ({project['partial']['reason']})")
+        if project['status_counts']:
+            lines.append("Status: " + ", ".join(f"{status} {count}" for status, count in project['status_counts']))
+        lines.append("-" * 60)
+
+        for engineer in project['engineers']:
+            pending = engineer['pending_tasks']
+            lines.append(
+                f"{engineer['name']}: {engineer['total_items']} tasks, "
+                f"{engineer['completion_percentage']}% done, {len(pending)} pending"
+            )
+            shown = pending if max_tasks_per_engineer is None else pending[:max_tasks_per_engineer]
+            for task in shown:
+                lines.append(f"    - {task['title']} ({task['category']})")
+            if len(pending) > len(shown):
+                lines.append(f"    +{len(pending) - len(shown)} more")
+
+    lines += ["", "Generated by Azure DevOps AI Agent", ""]
+    return "\n".join(lines)
+
+
+def render_tasks_csv(model):
+    """One row per task across all projects and engineers"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for project in model['projects']:
+        for engineer in project['engineers']:
+            for task in engineer['pending_tasks'] + engineer['completed_tasks']:
+                writer.writerow([
+                    project['org_name'], project['display_name'], engineer['name'],
+                    task['title'], task['state'], task['category'], task['tags']
+                ])
+    return buffer.getvalue()
+
+
+def build_summary(model):
+    """Compact summary dict: totals plus per-project and per-engineer counts (no task lists)"""
+    return {
+        'generated_at': model['generated_at'].isoformat(timespec='seconds'),
+        'sprint_start': model['sprint_start'],
+        'sprint_end': model['sprint_end'],
+        'total_work_items': model['total_work_items'],
+        'project_count': model['project_count'],
+        'engineer_count': model['engineer_count'],
+        'status_counts': dict(model['status_counts']),
+        'projects': [
+            {
+                'key': project['key'],
+                'display_name': project['display_name'],
+                'iteration': project['iteration_display'],
+                'total_items': project['total_items'],
+                'partial': project['partial'],
+                'status_counts': dict(project['status_counts']),
+                'engineers': [
+                    {
+                        'name': engineer['name'],
+                        'total_items': engineer['total_items'],
+                        'completed': engineer['completed_count'],
+                        'pending': len(engineer['pending_tasks']),
+                        'completion_percentage': engineer['completion_percentage'],
+                        'status_counts': dict(engineer['status_counts'])
+                    }
+                    for engineer in project['engineers']
+                ]
+            }
+            for project in model['projects']
+        ]
+    }
+
+
+def render_json_summary(model):
+    """JSON text of build_summary"""
+    return json.dumps(build_summary(model), indent=2, ensure_ascii=False)
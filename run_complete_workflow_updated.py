@@ -6,11 +6,13 @@ Automatically handles: data extraction, HTML generation, and email delivery
 
 import os
 import json
-from datetime import datetime
 from config import Config
 from get_sprint_count import main as extract_data
-from generate_html_report_compact import generate_compact_html_report
-from send_email_direct import send_email_directly
+from generate_html_report_compact import generate_report_outputs, save_report_outputs
+from report_log import flush_logs, get_logger
+from send_email_direct import check_send_ledger, send_email_directly
+
+log = get_logger(__name__)
 
 def check_csv_data_format(json_file):
     """Check if data follows the expected format"""
@@ -58,116 +60,135 @@ def find_latest_json_file():
     latest_file = max(json_files, key=lambda x: os.path.getctime(x))
     return latest_file, f"Using file: {latest_file}"
 
-def main():
-    """Complete workflow for Azure DevOps sprint reporting"""
-    print("🚀 Complete Azure DevOps Sprint Reporting Workflow")
-    print("=" * 60)
-    print()
+def main(force=False):
+    """Complete workflow for Azure DevOps sprint reporting (force resends an unchanged report)"""
+    log.info("🚀 Complete Azure DevOps Sprint Reporting Workflow")
+    log.info("=" * 60)
+    log.info("")
     
     # Step 1: Validate Configuration
-    print("🔧 Step 1: Validating Configuration...")
+    log.info("🔧 Step 1: Validating Configuration...")
     if not Config.validate_config():
-        print("❌ Configuration validation failed")
+        log.error("❌ Configuration validation failed")
         return False
     
-    print("✅ Configuration validated successfully")
-    print()
+    log.info("✅ Configuration validated successfully")
+    log.info("")
     
     # Step 2: Extract Sprint Data
-    print("📊 Step 2: Extracting Sprint Data from Azure DevOps...")
+    log.info("📊 Step 2: Extracting Sprint Data from Azure DevOps...")
     try:
-        extract_data()
-        print("✅ Sprint data extracted successfully")
+        extracted_file = extract_data()
+        log.info("✅ Sprint data extracted successfully")
     except Exception as e:
-        print(f"❌ Failed to extract sprint data: {str(e)}")
+        log.error(f"❌ Failed to extract sprint data: {str(e)}")
         return False
     
-    print()
+    log.info("")
     
     # Step 3: Validate Extracted Data
-    print("🔍 Step 3: Validating Extracted Data...")
-    json_file, message = find_latest_json_file()
+    log.info("🔍 Step 3: Validating Extracted Data...")
+    if extracted_file:
+        json_file, message = extracted_file, f"Using file: {extracted_file}"
+    else:
+        json_file, message = find_latest_json_file()
     if not json_file:
-        print(f"❌ {message}")
+        log.error(f"❌ {message}")
         return False
     
-    print(f"✅ {message}")
+    log.info(f"✅ {message}")
     
     # Validate data format
     is_valid, validation_message = check_csv_data_format(json_file)
     if not is_valid:
-        print(f"❌ Data format validation failed: {validation_message}")
+        log.error(f"❌ Data format validation failed: {validation_message}")
         return False
     
-    print(f"✅ {validation_message}")
-    print()
+    log.info(f"✅ {validation_message}")
+    
+    # Look up the send ledger now so an unchanged report is never mailed twice
+    with open(json_file, 'r', encoding='utf-8') as f:
+        ledger_key, previous_send = check_send_ledger(json.load(f), force=force)
+    if previous_send:
+        log.info(f"⏭️ Identical report already {previous_send['status']} today ({previous_send['recorded_at']}); "
+                 f"skipping render and email. Rerun with --force to resend.")
+        return True
+    log.info("")
     
     # Step 4: Generate HTML Report
-    print("🎨 Step 4: Generating HTML Report...")
+    log.info("🎨 Step 4: Generating HTML Report...")
     try:
-        html_content = generate_compact_html_report(json_file)
-        if not html_content:
-            print("❌ HTML report generation failed")
+        outputs = generate_report_outputs(json_file, Config.EMAIL_MAX_HTML_BYTES)
+        if not outputs:
+            log.error("❌ HTML report generation failed")
             return False
+        html_content = outputs['html']
+        metadata = outputs['metadata']
         
-        # Save HTML report
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_file = f'compact_sprint_report_{timestamp}.html'
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        # Save HTML report with its metadata sidecar plus text/CSV/JSON outputs
+        output_paths = save_report_outputs(outputs)
+        output_file = output_paths['html']
         
-        print(f"✅ Compact HTML report generated: {output_file}")
-        print(f"📊 Report size: {len(html_content)} characters")
-        print("🌐 Open the HTML file in your browser to view the report")
-        print("📧 Ready to send via email!")
-        print()
+        log.info(f"✅ Compact HTML report generated: {output_file}")
+        size_budget = metadata['size_budget']
+        log.info(f"📊 Report size: {size_budget['size_bytes']:,} bytes (level: {size_budget['level']})")
+        log.info("🌐 Open the HTML file in your browser to view the report")
+        log.info("📧 Ready to send via email!")
+        log.info("")
         
         # Step 5: Send Email (Optional)
+        flush_logs()
         email_choice = input("📧 Do you want to send the report via email? (y/n): ").lower().strip()
         if email_choice in ['y', 'yes']:
-            print("📧 Step 5: Sending Email...")
+            log.info("📧 Step 5: Sending Email...")
             
             try:
                 # Update email credentials if needed
                 if not Config.SMTP_PASSWORD:
+                    flush_logs()
                     smtp_password = input("Enter your Gmail App Password for SMTP_PASSWORD: ").strip()
                     Config.SMTP_PASSWORD = smtp_password
                 
-                result = send_email_directly(output_file, html_content)
+                result = send_email_directly(output_file, html_content, outputs['full_html'], outputs['text'],
+                                             ledger_key=ledger_key)
                 if result:
-                    print("✅ Email sent successfully!")
+                    log.info("✅ Email sent successfully!")
                 else:
-                    print("❌ Email sending failed")
+                    log.error("❌ Email sending failed")
                 
             except KeyboardInterrupt:
-                print("\n⏹️ Email sending cancelled by user")
+                log.info("\n⏹️ Email sending cancelled by user")
             except Exception as e:
-                print(f"❌ Email sending error: {str(e)}")
+                log.error(f"❌ Email sending error: {str(e)}")
         else:
-            print("📧 Email sending skipped")
+            log.info("📧 Email sending skipped")
         
-        print()
+        log.info("")
         
         # Final Summary
-        print("🎯 Workflow Summary:")
-        print("✅ Configuration validated")
-        print("✅ Sprint data extracted from Azure DevOps") 
-        print("✅ HTML report generated")
-        print("✅ Report ready for viewing/sending")
-        print()
-        print(f"📁 Generated files:")
-        print(f"   📊 Data: {json_file}")
-        print(f"   🎨 Report: {output_file}")
-        print()
-        print("🎉 Complete Azure DevOps Sprint Reporting Workflow Finished Successfully!")
+        log.info("🎯 Workflow Summary:")
+        log.info("✅ Configuration validated")
+        log.info("✅ Sprint data extracted from Azure DevOps")
+        log.info("✅ HTML report generated")
+        log.info("✅ Report ready for viewing/sending")
+        log.info("")
+        log.info(f"📁 Generated files:")
+        log.info(f"   📊 Data: {json_file}")
+        log.info(f"   🎨 Report: {output_file}")
+        log.info(f"   📄 Digest/CSV/Summary: {output_paths['text']}, {output_paths['csv']}, {output_paths['summary']}")
+        log.info("")
+        log.info("🎉 Complete Azure DevOps Sprint Reporting Workflow Finished Successfully!")
         
         return True
         
     except Exception as e:
-        print(f"❌ HTML report generation failed: {str(e)}")
+        log.error(f"❌ HTML report generation failed: {str(e)}")
         return False
 
 if __name__ == "__main__":
-    success = main()
+    import argparse
+    parser = argparse.ArgumentParser(description='Extract, render and optionally email the sprint report')
+    parser.add_argument('--force', action='store_true', help='offer to send even if this exact report was already sent today')
+    success = main(force=parser.parse_args().force)
+    flush_logs()
     exit(0 if success else 1)
@@ -0,0 +1,110 @@
+"""
+Run Deadline
+The report is due at a fixed time, so extraction gets a deadline and stops
+in time to render and send whatever it has:
+
+    RUN_DEADLINE_AT=10:25            # local clock time, today
+    RUN_DEADLINE_SECONDS=1200        # or a budget from the start of the run
+    RUN_DEADLINE_RESERVE_SECONDS=120 # kept back for render + deliver
+
+When both are set the earlier one wins; a clock time already past at the start
+is ignored. Azure DevOps requests are capped to the extraction time left and
+refused once it runs out. Projects not started by then are skipped, and
+sharded workers still running are stopped. Every project that did not
+finish is marked partial with timed_out in the snapshot, and the report goes
+out with the projects that did.
+
+While sprints are resolved each organization only gets a share of that time
+(deadline_share), so one hung organization cannot use it all before the
+others are even asked.
+"""
+
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from config import Config
+from report_log import get_logger
+
+log = get_logger(__name__)
+
+# Partial-marker reason for projects cut off by the deadline
+DEADLINE_REASON = "run deadline reached before extraction finished"
+
+# Wall-clock deadline (epoch seconds) of the current run, or None
+_deadline = None
+
+# End of the current deadline_share block (epoch seconds), or None
+_share_end = None
+
+
+def parse_clock_deadline(text, now=None):
+    """'10:25' -> today's datetime at 10:25 (None if empty)"""
+    text = (text or '').strip()
+    if not text:
+        return None
+    hour, minute = (int(part) for part in text.split(':'))
+    now = now or datetime.now()
+    return now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+
+def start_run_deadline(now=None):
+    """Set the current run's deadline from the RUN_DEADLINE_* settings; returns it (epoch) or None"""
+    now = now or datetime.now()
+    candidates = []
+    if Config.RUN_DEADLINE_SECONDS > 0:
+        candidates.append(now + timedelta(seconds=Config.RUN_DEADLINE_SECONDS))
+    clock = parse_clock_deadline(Config.RUN_DEADLINE_AT, now)
+    if clock and clock > now:
+        candidates.append(clock)
+    elif clock:
+        log.warning(f"⏰ RUN_DEADLINE_AT {Config.RUN_DEADLINE_AT} has already passed; ignoring it for this run")
+    deadline = min(candidates) if candidates else None
+    set_deadline(deadline.timestamp() if deadline else None)
+    if deadline:
+        log.info(f"⏰ Run deadline {deadline.strftime('%H:%M:%S')} "
+                 f"(extraction stops {Config.RUN_DEADLINE_RESERVE_SECONDS}s earlier)")
+    return _deadline
+
+
+def set_deadline(deadline):
+    """Set the deadline (epoch seconds, or None for no deadline), e.g. in a worker process"""
+    global _deadline
+    _deadline = deadline
+
+
+def get_deadline():
+    return _deadline
+
+
+def extraction_time_left():
+    """Seconds extraction may still use (None without a deadline)"""
+    if _deadline is None:
+        return None
+    now = time.time()
+    left = _deadline - Config.RUN_DEADLINE_RESERVE_SECONDS - now
+    return left if _share_end is None else min(left, _share_end - now)
+
+
+@contextmanager
+def deadline_share(fraction):
+    """Inside the block, only `fraction` of the extraction time left now may be used.
+
+    Does nothing without a deadline.
+    """
+    global _share_end
+    left = extraction_time_left()
+    if left is None:
+        yield
+        return
+    previous = _share_end
+    _share_end = time.time() + max(0, left) * fraction
+    try:
+        yield
+    finally:
+        _share_end = previous
+
+
+def extraction_expired():
+    """True once extraction has used up its time"""
+    left = extraction_time_left()
+    return left is not None and left <= 0
@@ -0,0 +1,239 @@
+"""
+Run Profile
+Lightweight timing spans and HTTP request records for one run, written as
+a JSON profile (data/profiles/<name>_<timestamp>_<pid>.json) and, optionally, as a
+Prometheus textfile for node_exporter's textfile collector.
+
+    with span('render.minify'):
+        ...
+    record_request('wiql', 'POST', 200, 0.42, 1830)
+    write_run_profile('pipeline')
+
+Recording is a couple of list appends per span/request, so it stays on in
+production; RUN_PROFILE_ENABLED=false only skips writing the files.
+"""
+
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from report_log import get_logger
+
+log = get_logger(__name__)
+
+# Azure DevOps endpoint families, matched in order against the URL path
+ENDPOINT_FAMILIES = [
+    ('iterations', '/work/teamsettings/iterations'),
+    ('teams', '/teams'),
+    ('wiql', '/wit/wiql'),
+    ('workitems', '/wit/workitems'),
+]
+
+# Project key for requests made outside any project span (e.g. config-wide lookups)
+UNATTRIBUTED = 'unattributed'
+
+_run = None
+
+
+def _new_run():
+    return {'started_at': datetime.now(), 'started': time.perf_counter(), 'spans': [], 'requests': [],
+            'project_stack': [], 'memory': []}
+
+
+def reset_run_profile():
+    """Start a fresh profile (long-running processes call this per run)"""
+    global _run
+    _run = _new_run()
+
+
+def _current():
+    if _run is None:
+        reset_run_profile()
+    return _run
+
+
+def project_label(project, org=None):
+    """Snapshot-style key ("<org>_<project>") that requests are attributed to"""
+    return f"{org}_{project}" if org else project
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time the enclosed block under name (dotted, e.g. 'azure.get_current_iteration').
+
+    With project= (and org=), requests made inside are attributed to that project.
+    """
+    run = _current()
+    project = attrs.get('project')
+    if project:
+        run['project_stack'].append(project_label(project, attrs.get('org')))
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        run['spans'].append((name, time.perf_counter() - started, attrs))
+        if project:
+            run['project_stack'].pop()
+
+
+def endpoint_family(url):
+    """Coarse Azure DevOps endpoint family for a request URL"""
+    path = url.split('?', 1)[0]
+    for family, marker in ENDPOINT_FAMILIES:
+        if marker in path:
+            return family
+    return 'other'
+
+
+def record_request(family, method, status, seconds, nbytes):
+    """Record one HTTP request (status None when no response arrived)"""
+    run = _current()
+    project = run['project_stack'][-1] if run['project_stack'] else None
+    run['requests'].append((family, method, status, seconds, nbytes, project))
+
+
+def record_memory(stage):
+    """Record one stage's tracemalloc measurement (see memory_profile.py)"""
+    _current()['memory'].append(stage)
+
+
+def project_usage():
+    """Requests so far by project: {project: {'count', 'bytes', 'families': {family: count}}}.
+
+    Requests made outside any project span are under 'unattributed'.
+    """
+    usage = {}
+    for family, _, _, _, nbytes, project in _current()['requests']:
+        stats = usage.setdefault(project or UNATTRIBUTED, {'count': 0, 'bytes': 0, 'families': {}})
+        stats['count'] += 1
+        stats['bytes'] += nbytes
+        stats['families'][family] = stats['families'].get(family, 0) + 1
+    return usage
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an unsorted list (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def _latency_summary(seconds):
+    return {
+        'p50': round(percentile(seconds, 0.50), 4),
+        'p90': round(percentile(seconds, 0.90), 4),
+        'p99': round(percentile(seconds, 0.99), 4),
+        'max': round(max(seconds), 4) if seconds else 0.0,
+    }
+
+
+def build_run_profile(name='run'):
+    """Aggregate the recorded spans and requests into a JSON-serializable profile"""
+    run = _current()
+    spans = {}
+    for span_name, seconds, _ in run['spans']:
+        spans.setdefault(span_name, []).append(seconds)
+    requests = {}
+    for family, method, status, seconds, nbytes, _ in run['requests']:
+        stats = requests.setdefault(family, {'count': 0, 'errors': 0, 'bytes': 0, 'seconds': []})
+        stats['count'] += 1
+        stats['bytes'] += nbytes
+        stats['seconds'].append(seconds)
+        if status is None or status >= 400:
+            stats['errors'] += 1
+
+    return {
+        'name': name,
+        'started_at': run['started_at'].isoformat(timespec='seconds'),
+        'duration_seconds': round(time.perf_counter() - run['started'], 4),
+        'spans': {
+            span_name: {'count': len(values), 'total_seconds': round(sum(values), 4), **_latency_summary(values)}
+            for span_name, values in spans.items()
+        },
+        'requests': {
+            family: {'count': s['count'], 'errors': s['errors'], 'bytes': s['bytes'],
+                     'total_seconds': round(sum(s['seconds']), 4), 'latency_seconds': _latency_summary(s['seconds'])}
+            for family, s in requests.items()
+        },
+        'request_count': len(run['requests']),
+        'projects': project_usage(),
+        **({'memory': run['memory']} if run['memory'] else {}),
+    }
+
+
+def render_prometheus(profile):
+    """Prometheus text exposition of a profile (gauges describing the last run)"""
+    lines = []
+
+    def metric(metric_name, help_text, samples):
+        lines.append(f"# HELP {metric_name} {help_text}")
+        lines.append(f"# TYPE {metric_name} gauge")
+        for labels, value in samples:
+            label_text = ','.join(f'{k}="{v}"' for k, v in labels.items())
+            lines.append(f"{metric_name}{{{label_text}}} {value}" if label_text else f"{metric_name} {value}")
+
+    job = {'run': profile['name']}
+    metric('sprint_report_last_run_timestamp_seconds', 'Start time of the last run',
+           [(job, int(datetime.fromisoformat(profile['started_at']).timestamp()))])
+    metric('sprint_report_run_duration_seconds', 'Wall time of the last run',
+           [(job, profile['duration_seconds'])])
+    metric('sprint_report_span_seconds', 'Total time spent in each span during the last run',
+           [({**job, 'span': name}, s['total_seconds']) for name, s in sorted(profile['spans'].items())])
+    metric('sprint_report_requests', 'Azure DevOps requests made during the last run',
+           [({**job, 'family': family}, r['count']) for family, r in sorted(profile['requests'].items())])
+    metric('sprint_report_request_errors', 'Failed Azure DevOps requests during the last run',
+           [({**job, 'family': family}, r['errors']) for family, r in sorted(profile['requests'].items())])
+    metric('sprint_report_response_bytes', 'Azure DevOps response bytes received during the last run',
+           [({**job, 'family': family}, r['bytes']) for family, r in sorted(profile['requests'].items())])
+    metric('sprint_report_project_requests', 'Azure DevOps requests per project during the last run',
+           [({**job, 'project': project}, p['count']) for project, p in sorted(profile.get('projects', {}).items())])
+    metric('sprint_report_project_response_bytes', 'Azure DevOps response bytes per project during the last run',
+           [({**job, 'project': project}, p['bytes']) for project, p in sorted(profile.get('projects', {}).items())])
+    if profile.get('memory'):
+        metric('sprint_report_stage_peak_memory_bytes', 'Peak traced Python memory per stage in the last run',
+               [({**job, 'stage': m['stage']}, m['peak_bytes']) for m in profile['memory']])
+    metric('sprint_report_request_latency_seconds', 'Azure DevOps request latency quantiles in the last run',
+           [({**job, 'family': family, 'quantile': q}, r['latency_seconds'][key])
+            for family, r in sorted(profile['requests'].items())
+            for q, key in (('0.5', 'p50'), ('0.9', 'p90'), ('0.99', 'p99'))])
+    return '\n'.join(lines) + '\n'
+
+
+def _write_atomic(path, text):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _prune_profiles(profile_dir, keep):
+    """Keep only the newest `keep` profiles"""
+    paths = [os.path.join(profile_dir, f) for f in os.listdir(profile_dir) if f.endswith('.json')]
+    paths.sort(key=os.path.getmtime)
+    for path in paths[:-keep] if keep > 0 else []:
+        os.remove(path)
+
+
+def write_run_profile(name='run'):
+    """Write the JSON profile (and Prometheus textfile, if configured); returns the profile path or None"""
+    from config import Config
+    if not Config.RUN_PROFILE_ENABLED:
+        return None
+    profile = build_run_profile(name)
+    try:
+        profile_dir = Config.RUN_PROFILE_DIR
+        stamp = _current()['started_at'].strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(profile_dir, f"{name}_{stamp}_{os.getpid()}.json")
+        _write_atomic(path, json.dumps(profile, indent=2))
+        _prune_profiles(profile_dir, Config.RUN_PROFILE_KEEP)
+        if Config.PROMETHEUS_TEXTFILE:
+            _write_atomic(Config.PROMETHEUS_TEXTFILE, render_prometheus(profile))
+    except OSError as e:
+        log.warning(f"   ⚠️ Could not write run profile: {e}")
+        return None
+    log.info(f"📈 Run profile: {path} ({profile['request_count']} requests, {profile['duration_seconds']:.2f}s)")
+    return path
@@ -3,15 +3,40 @@ import os
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from datetime import datetime
-from dotenv import load_dotenv
 from config import Config
+from email_budget import build_full_report_attachment, html_size_bytes
+from smtp_pool import SMTPSessionPool, summarize_outcomes
+from outbox import enqueue_message, process_outbox
+from run_profile import span, write_run_profile
+from send_ledger import already_sent, ledger_key as build_ledger_key, record_send, report_content_hash
+from report_metadata import (
+    find_latest_valid_report,
+    load_report_metadata,
+    metadata_has_data,
+    metadata_matches_content,
+    reports_without_metadata,
+)
+from report_log import flush_logs, get_logger
 
-# Load .env file for local development (if it exists)
-# GitHub Actions will use repository secrets instead
-load_dotenv()
+log = get_logger(__name__)
+
+def report_has_data(html_filename, html_content, metadata=None):
+    """Validate a report using its metadata sidecar, falling back to HTML scanning.
+
+    metadata skips reading the sidecar (e.g. a report rendered in memory). It is
+    only trusted when its content hash matches html_content.
+    """
+    if metadata is None and html_filename:
+        metadata = load_report_metadata(html_filename)
+    if metadata_matches_content(metadata, html_content):
+        return metadata_has_data(metadata)
+    return validate_html_has_data(html_content)
 
 def validate_html_has_data(html_content):
-    """Validate that HTML content contains actual sprint data (not just zeros)"""
+    """Validate that HTML content contains actual sprint data (not just zeros).
+
+    Legacy path for reports without a metadata sidecar; prefer report_has_data.
+    """
     # Check for empty data indicators in HTML
     import re
     
@@ -44,12 +69,21 @@ def validate_html_has_data(html_content):
     
     return True
 
-def send_email_directly(html_filename, html_content):
-    """Send email directly using Gmail credentials from environment variables"""
+def send_email_directly(html_filename, html_content, full_html_content=None, text_content=None, session=None, recipients=None,
+                        ledger_key=None):
+    """Send email directly using Gmail credentials from environment variables.
+
+    When full_html_content is given (the body was trimmed to fit the size budget)
+    and EMAIL_ATTACH_FULL_REPORT is enabled, the untrimmed report is attached gzipped.
+    text_content is the plain-text digest; without it a short stub is sent.
+    session is an open SMTPSessionPool to reuse across several sends.
+    recipients overrides Config.get_email_recipients().
+    ledger_key records the send in the send ledger (see check_send_ledger).
+    """
     
     # Validate HTML content has data before sending
-    if not validate_html_has_data(html_content):
-        print("❌ HTML content contains no data (all zeros). Refusing to send empty email.")
+    if not report_has_data(html_filename, html_content):
+        log.error("❌ HTML content contains no data (all zeros). Refusing to send empty email.")
         return False
     
     # Get email configuration from Config
@@ -62,32 +96,64 @@ def send_email_directly(html_filename, html_content):
     SMTP_PASSWORD = Config.SMTP_PASSWORD
     
     # Get recipients (single or multiple)
-    recipients = Config.get_email_recipients()
+    recipients = recipients or Config.get_email_recipients()
     
     if not all([EMAIL_FROM, SMTP_USERNAME, SMTP_PASSWORD]) or not recipients:
-        print("❌ Missing required email credentials in environment variables")
-        print("Please set EMAIL_FROM, EMAIL_TO (or EMAIL_TO_MULTIPLE), SMTP_USERNAME, and SMTP_PASSWORD")
+        log.error("❌ Missing required email credentials in environment variables")
+        log.error("Please set EMAIL_FROM, EMAIL_TO (or EMAIL_TO_MULTIPLE), SMTP_USERNAME, and SMTP_PASSWORD")
         return False
     
-    print(f"📧 Sending email with credentials from environment...")
-    print(f"   From: {EMAIL_FROM}")
-    print(f"   To: {', '.join(recipients)}")
-    print(f"   SMTP: {SMTP_SERVER}:{SMTP_PORT}")
+    log.info(f"📧 Sending email with credentials from environment...")
+    log.info(f"   From: {EMAIL_FROM}")
+    log.info(f"   To: {', '.join(recipients)}")
+    log.info(f"   SMTP: {SMTP_SERVER}:{SMTP_PORT}")
     
-    # Create message
-    msg = MIMEMultipart('alternative')
+    with span('email.build_message'):
+        msg = build_report_message(html_filename, html_content, recipients, full_html_content, text_content)
+    with span('email.deliver', recipients=len(recipients)):
+        return deliver_message(msg, recipients, session, ledger_key)
+
+def build_report_message(html_filename, html_content, recipients, full_html_content=None, text_content=None):
+    """Build the MIME message for a report (text + HTML, optional gzipped full report)"""
+    EMAIL_FROM = Config.EMAIL_FROM
+    
+    # Create message (mixed when the full report rides along as an attachment)
+    attach_full_report = bool(full_html_content) and Config.EMAIL_ATTACH_FULL_REPORT
+    msg = MIMEMultipart('mixed' if attach_full_report else 'alternative')
     msg['From'] = EMAIL_FROM
     msg['To'] = ', '.join(recipients)  # Multiple recipients
-    msg['Subject'] = f"Sprint Report - Daily - {datetime.now().strftime('%B %d, %Y')} - IOL Pay & VCC"
+    msg['Subject'] = f"Sprint Report - Daily - {datetime.now().strftime('%B %d, %Y')} - {Config.REPORT_TITLE}"
+    
+    # Create text body (digest rendered alongside the HTML, or a stub)
+    text_body = text_content or build_text_stub()
     
+    # Create HTML body
+    html_body = MIMEText(html_content, 'html')
+    
+    # Attach both text and HTML
+    body = MIMEMultipart('alternative') if attach_full_report else msg
+    body.attach(MIMEText(text_body, 'plain'))
+    body.attach(html_body)
+    
+    log.info(f"   📏 HTML body size: {html_size_bytes(html_content):,} bytes")
+    if attach_full_report:
+        msg.attach(body)
+        attachment, attachment_size = build_full_report_attachment(full_html_content, os.path.basename(html_filename))
+        msg.attach(attachment)
+        log.info(f"   📎 Full report attached (gzip): {attachment_size:,} bytes")
+    
+    return msg
+
+def build_text_stub():
+    """Minimal text/plain part used when no digest was rendered"""
     # Resolve overall sprint period dynamically for email text body
-    overall_period = Config.get_current_sprint_period()
+    from get_sprint_count import get_current_sprint_period
+    overall_period = get_current_sprint_period()
     overall_start = overall_period.get('start_date', '')
     overall_end = overall_period.get('end_date', '')
 
-    # Create text body
-    text_body = f"""
-Sprint Report - Daily - {datetime.now().strftime('%B %d, %Y')} - IOL Pay & VCC
+    return f"""
+Sprint Report - Daily - {datetime.now().strftime('%B %d, %Y')} - {Config.REPORT_TITLE}
 
 This report contains sprint data for the current period.
 
@@ -97,90 +163,110 @@ Sprint Period: {overall_start} - {overall_end}
 
 For full formatted report, please view this email in HTML format.
     """
-    
-    # Create HTML body
-    html_body = MIMEText(html_content, 'html')
-    
-    # Attach both text and HTML
-    msg.attach(MIMEText(text_body, 'plain'))
-    msg.attach(html_body)
+
+def deliver_message(msg, recipients, session=None, ledger_key=None):
+    """Send a fully built message, reusing session (an SMTPSessionPool) when given.
+
+    ledger_key (see send_ledger.py) is recorded once the message is accepted,
+    or as soon as it is spooled when the outbox is enabled.
+    """
+    EMAIL_FROM = Config.EMAIL_FROM
+    SMTP_USERNAME = Config.SMTP_USERNAME
+    SMTP_PASSWORD = Config.SMTP_PASSWORD
     
     try:
-        print(f"   🔄 Connecting to Gmail SMTP...")
-        
-        # Connect to Gmail SMTP
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        
-        print(f"   🔐 Authenticating with Gmail...")
-        server.login(SMTP_USERNAME, SMTP_PASSWORD)
+        log.info(f"   📤 Sending email...")
+        if Config.EMAIL_OUTBOX_ENABLED:
+            # Spool first so a failed send is retried from outbox/ instead of rerunning the pipeline
+            entry = enqueue_message(msg, EMAIL_FROM, recipients)
+            if ledger_key:
+                record_send(ledger_key, 'queued', {'outbox_id': entry['id']})
+            results = process_outbox(session, entry_ids={entry['id']}, force=True)
+            if not any(r['accepted'] for r in results) and results:
+                raise smtplib.SMTPException(results[0]['message'])
+        elif session is None:
+            log.info(f"   🔄 Connecting to SMTP and authenticating...")
+            with SMTPSessionPool.from_config() as own_session:
+                results = own_session.send(msg, EMAIL_FROM, recipients)
+        else:
+            results = session.send(msg, EMAIL_FROM, recipients)
         
-        print(f"   📤 Sending email...")
-        text = msg.as_string()
-        server.sendmail(EMAIL_FROM, recipients, text)
-        server.quit()
+        all_accepted = summarize_outcomes(results)
+        if not any(r['accepted'] for r in results):
+            log.error(f"   ❌ No recipients accepted the email")
+            return False
         
-        print(f"   ✅ Email sent successfully!")
+        if ledger_key:
+            record_send(ledger_key, 'sent', {'accepted': [r['recipient'] for r in results if r['accepted']]})
+        if all_accepted:
+            log.info(f"   ✅ Email sent successfully!")
+        else:
+            log.warning(f"   ⚠️ Email sent, but some recipients were refused")
         return True
         
     except Exception as e:
-        print(f"   ❌ Failed to send email: {str(e)}")
+        log.error(f"   ❌ Failed to send email: {str(e)}")
         
         if "Application-specific password required" in str(e):
-            print(f"\n💡 Gmail requires an App Password for security.")
-            print(f"   To fix this:")
-            print(f"   1. Go to https://myaccount.google.com/")
-            print(f"   2. Navigate to Security → 2-Step Verification")
-            print(f"   3. Scroll down to 'App passwords'")
-            print(f"   4. Generate a new app password for 'Mail'")
-            print(f"   5. Use that password instead of your regular password")
+            log.warning(f"\n💡 Gmail requires an App Password for security.")
+            log.warning(f"   To fix this:")
+            log.warning(f"   1. Go to https://myaccount.google.com/")
+            log.warning(f"   2. Navigate to Security → 2-Step Verification")
+            log.warning(f"   3. Scroll down to 'App passwords'")
+            log.warning(f"   4. Generate a new app password for 'Mail'")
+            log.warning(f"   5. Use that password instead of your regular password")
         
         elif "Username and Password not accepted" in str(e):
-            print(f"\n💡 Gmail authentication failed.")
-            print(f"   Please check:")
-            print(f"   1. Username: {SMTP_USERNAME}")
-            print(f"   2. Password: {SMTP_PASSWORD}")
-            print(f"   3. 2-Step Verification is enabled")
+            log.warning(f"\n💡 Gmail authentication failed.")
+            log.warning(f"   Please check:")
+            log.warning(f"   1. Username: {SMTP_USERNAME}")
+            log.warning(f"   2. Password: (set, {len(SMTP_PASSWORD)} characters)")
+            log.warning(f"   3. 2-Step Verification is enabled")
         
         return False
 
+def check_send_ledger(sprint_data, recipients=None, force=False):
+    """Return (ledger_key, previous_record) for this report and recipient set.
+
+    previous_record is None when the report has not been sent today or when
+    force is set, so callers can skip identical sends before rendering.
+    """
+    recipients = recipients or Config.get_email_recipients()
+    key = build_ledger_key(report_content_hash(sprint_data), recipients)
+    previous = None if force else already_sent(key)
+    return key, previous
+
 def find_non_empty_html_report():
-    """Find the most recent HTML report that has actual data"""
-    # Find the most recent HTML report (prefer compact version)
-    html_files = [f for f in os.listdir('.') if f.startswith('compact_sprint_report_') and f.endswith('.html')]
-    if not html_files:
-        # Fallback to regular sprint reports
-        html_files = [f for f in os.listdir('.') if f.startswith('sprint_report_') and f.endswith('.html')]
-    if not html_files:
-        return None, "No HTML reports found"
-    
-    # Sort by modification time (most recent first)
-    html_files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
+    """Find the most recent HTML report that has actual data.
+
+    Reports with a metadata sidecar are checked from the sidecar alone; older
+    reports without one are scanned as HTML, as before sidecars existed.
+    """
+    html_file, metadata = find_latest_valid_report('.')
+    candidates = [html_file] if html_file else reports_without_metadata('.')
     
-    # Try each HTML file until we find one with data
-    for html_file in html_files:
+    for html_file in candidates:
         try:
             with open(html_file, 'r', encoding='utf-8') as f:
                 html_content = f.read()
-            
-            if validate_html_has_data(html_content):
-                return html_file, html_content
         except Exception as e:
-            print(f"   ⚠️ Error reading {html_file}: {str(e)}")
+            log.warning(f"   ⚠️ Error reading {html_file}: {str(e)}")
             continue
+        if metadata or validate_html_has_data(html_content):
+            return html_file, html_content
     
     return None, "No HTML reports with data found"
 
-def main():
-    """Main function to send email directly"""
-    print("📧 Direct Email Sender with Environment Variables")
-    print("=" * 60)
+def main(force=False):
+    """Main function to send email directly (force resends an unchanged report)"""
+    log.info("📧 Direct Email Sender with Environment Variables")
+    log.info("=" * 60)
     
     # ALWAYS regenerate HTML from latest JSON to ensure fresh data
-    print("🔄 Regenerating HTML report from latest JSON data...")
+    log.info("🔄 Regenerating HTML report from latest JSON data...")
     
     try:
-        from generate_html_report_compact import generate_compact_html_report
+        from generate_html_report_compact import generate_report_outputs, save_report_outputs
         import json
         
         # Find latest JSON file
@@ -196,7 +282,7 @@ def main():
                 latest_json = max(json_files, key=lambda x: os.path.getmtime(x))
                 latest_json_path = latest_json
             else:
-                print(f"❌ No JSON data files found. Run get_sprint_count.py first.")
+                log.error(f"❌ No JSON data files found. Run get_sprint_count.py first.")
                 return
         else:
             latest_json = max(json_files, key=lambda x: os.path.getmtime(os.path.join(data_dir, x)))
@@ -208,69 +294,81 @@ def main():
         
         # Validate JSON has actual data (not empty dict or empty projects)
         if not json_data:
-            print(f"❌ JSON file {latest_json} is empty. No sprint data available.")
+            log.error(f"❌ JSON file {latest_json} is empty. No sprint data available.")
             return
         
         # Check if any project has work items
         total_items = sum(result.get('total_items', 0) for result in json_data.values())
         if total_items == 0:
-            print(f"❌ JSON file {latest_json} contains no work items (all zeros).")
-            print(f"💡 Please ensure sprint data is available in Azure DevOps.")
+            log.error(f"❌ JSON file {latest_json} contains no work items (all zeros).")
+            log.warning(f"💡 Please ensure sprint data is available in Azure DevOps.")
+            return
+        
+        log.info(f"📁 Found JSON data: {latest_json}")
+        log.info(f"📊 Total work items: {total_items}")
+        
+        # Skip before rendering or connecting if this exact report already went out today
+        ledger_key, previous = check_send_ledger(json_data, force=force)
+        if previous:
+            log.info(f"⏭️ Identical report already {previous['status']} today ({previous['recorded_at']}); skipping. Use --force to resend.")
             return
         
-        print(f"📁 Found JSON data: {latest_json}")
-        print(f"📊 Total work items: {total_items}")
-        print(f"🔄 Generating HTML report...")
+        log.info(f"🔄 Generating HTML report...")
         
-        html_content = generate_compact_html_report(latest_json_path)
+        # One aggregation pass renders the HTML body, text digest, CSV and summary
+        outputs = generate_report_outputs(latest_json_path, Config.EMAIL_MAX_HTML_BYTES)
         
-        if not html_content:
-            print(f"❌ Failed to generate HTML report.")
+        if not outputs:
+            log.error(f"❌ Failed to generate HTML report.")
             return
+        html_content = outputs['html']
+        metadata = outputs['metadata']
         
-        # Validate HTML content has data
-        if not validate_html_has_data(html_content):
-            print(f"❌ Generated HTML report contains no data (all zeros).")
-            print(f"💡 This might indicate a problem with the HTML generation.")
+        # Validate report has data using the counts the generator recorded
+        if not metadata_has_data(metadata):
+            log.error(f"❌ Generated HTML report contains no data (all zeros).")
+            log.warning(f"💡 This might indicate a problem with the HTML generation.")
             return
         
-        # Save the regenerated HTML
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        html_file = f'compact_sprint_report_{timestamp}.html'
-        with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        print(f"✅ Generated HTML report: {html_file}")
+        # Save the regenerated HTML with its metadata sidecar
+        html_file = save_report_outputs(outputs)['html']
+        log.info(f"✅ Generated HTML report: {html_file}")
         
     except FileNotFoundError as e:
-        print(f"❌ JSON file not found: {str(e)}")
-        print(f"💡 Please run get_sprint_count.py first to fetch sprint data.")
+        log.error(f"❌ JSON file not found: {str(e)}")
+        log.warning(f"💡 Please run get_sprint_count.py first to fetch sprint data.")
         return
     except json.JSONDecodeError as e:
-        print(f"❌ Invalid JSON file: {str(e)}")
+        log.error(f"❌ Invalid JSON file: {str(e)}")
         return
     except Exception as e:
-        print(f"❌ Error generating report: {str(e)}")
+        log.error(f"❌ Error generating report: {str(e)}")
         import traceback
         traceback.print_exc()
         return
     
-    print(f"📁 Using report: {html_file}")
+    log.info(f"📁 Using report: {html_file}")
     
-    print(f"\n📧 Email Details:")
-    print(f"   Subject: Sprint Report - Daily - {datetime.now().strftime('%B %d, %Y')} - IOL Pay & VCC")
-    print(f"   Content: HTML report in email body")
-    print(f"   Size: {len(html_content)} characters")
+    log.info(f"\n📧 Email Details:")
+    log.info(f"   Subject: Sprint Report - Daily - {datetime.now().strftime('%B %d, %Y')} - {Config.REPORT_TITLE}")
+    log.info(f"   Content: HTML report in email body")
+    log.info(f"   Size: {html_size_bytes(html_content):,} bytes (level: {metadata['size_budget']['level']})")
     
     # Send the email
-    success = send_email_directly(html_file, html_content)
+    success = send_email_directly(html_file, html_content, outputs['full_html'], outputs['text'], ledger_key=ledger_key)
     
     if success:
-        print(f"\n🎉 Email sent successfully!")
-        print(f"📧 Check your email at: {os.getenv('EMAIL_TO', 'your email')}")
-        print(f"💻 The HTML report is now in the email body!")
+        log.info(f"\n🎉 Email sent successfully!")
+        log.info(f"📧 Check your email at: {Config.EMAIL_TO}")
+        log.info(f"💻 The HTML report is now in the email body!")
     else:
-        print(f"\n❌ Email sending failed.")
-        print(f"💡 Please check your environment variables and try again.")
+        log.error(f"\n❌ Email sending failed.")
+        log.warning(f"💡 Please check your environment variables and try again.")
+    write_run_profile('email')
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description='Regenerate the latest report and email it')
+    parser.add_argument('--force', action='store_true', help='send even if this exact report was already sent today')
+    main(force=parser.parse_args().force)
+    flush_logs()
@@ -0,0 +1,78 @@
+"""
+Send Ledger
+Records every delivered report as (date, recipient set, report content hash)
+so reruns can skip an identical send before regenerating anything or
+opening an SMTP connection.
+
+The content hash is taken over the snapshot data plus the settings that
+shape the rendered report, not over the HTML itself (the HTML embeds its
+generation time and would never match).
+"""
+
+import hashlib
+import json
+import os
+from datetime import date, datetime, timedelta
+from config import Config
+
+DEFAULT_RETENTION_DAYS = 30
+
+
+def report_content_hash(sprint_data):
+    """Hash of everything that determines the report's content"""
+    payload = {
+        'data': sprint_data,
+        'render': {
+            'max_html_bytes': Config.EMAIL_MAX_HTML_BYTES,
+            'attach_full_report': Config.EMAIL_ATTACH_FULL_REPORT,
+            'minify': Config.HTML_MINIFY,
+            'target_clients': Config.get_email_target_clients(),
+            'report_title': Config.REPORT_TITLE
+        }
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def ledger_key(content_hash, recipients, day=None):
+    """(date, recipient set, content hash) as a stable string"""
+    day = (day or date.today()).isoformat()
+    recipient_set = ','.join(sorted({r.strip().lower() for r in recipients}))
+    return f"{day}|{recipient_set}|{content_hash}"
+
+
+def load_ledger(ledger_file=None):
+    try:
+        with open(ledger_file or Config.EMAIL_SEND_LEDGER_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def already_sent(key, ledger_file=None):
+    """Ledger record for key, or None if this exact report was not sent.
+
+    A 'queued' record counts while its outbox entry may still be delivered;
+    once the outbox gave up on it (dead/), the report can be sent again.
+    """
+    record = load_ledger(ledger_file).get(key)
+    if record and record.get('status') == 'queued' and record.get('outbox_id'):
+        from outbox import DEAD, entry_state
+        if entry_state(record['outbox_id']) == DEAD:
+            return None
+    return record
+
+
+def record_send(key, status='sent', details=None, ledger_file=None):
+    """Record (or update) a send; entries older than the retention window are dropped"""
+    ledger_file = ledger_file or Config.EMAIL_SEND_LEDGER_FILE
+    cutoff = (date.today() - timedelta(days=DEFAULT_RETENTION_DAYS)).isoformat()
+    ledger = {k: v for k, v in load_ledger(ledger_file).items() if k.split('|', 1)[0] >= cutoff}
+    ledger[key] = dict(details or {}, status=status, recorded_at=datetime.now().isoformat(timespec='seconds'))
+
+    os.makedirs(os.path.dirname(ledger_file) or '.', exist_ok=True)
+    tmp_file = ledger_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(ledger, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, ledger_file)
+    return ledger[key]
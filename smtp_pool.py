@@ -0,0 +1,197 @@
+"""
+Reusable SMTP Session
+Keeps one authenticated SMTP connection open across a batch of messages,
+pipelines MAIL/RCPT when the server advertises PIPELINING, reconnects when
+the server drops the session, and reports the outcome per recipient.
+
+Works against any SMTP server, including a local stand-in for testing:
+    python3 -m aiosmtpd -n -l localhost:8025
+    SMTP_SERVER=localhost SMTP_PORT=8025 SMTP_STARTTLS=false ...
+"""
+
+import smtplib
+from config import Config
+from report_log import get_logger
+
+log = get_logger(__name__)
+
+# Transport failures: the session is gone, but the server never refused the
+# message. Not OSError as a whole: every SMTPException is an OSError
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+def is_transient_error(error):
+    """True for errors worth a reconnect and resend: transport failures and 4xx replies (e.g. 421).
+
+    Authentication failures, 5xx replies and refused recipients are final;
+    resending would repeat what the server already rejected.
+    """
+    if isinstance(error, RECONNECT_ERRORS):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and 400 <= error.smtp_code < 500
+
+
+def is_permanent_error(error):
+    """True for 5xx replies (authentication failure, rejected sender or DATA): retrying will not help"""
+    return isinstance(error, smtplib.SMTPResponseException) and 500 <= error.smtp_code < 600
+
+
+def message_bytes(msg):
+    """Serialize a message with CRLF line endings, as smtplib.send_message does"""
+    if not hasattr(msg, 'as_bytes'):
+        return msg
+    return msg.as_bytes(policy=msg.policy.clone(linesep='\r\n'))
+
+
+class SMTPSessionPool:
+    """A single reusable, authenticated SMTP session shared by a batch of sends"""
+
+    def __init__(self, host, port, username=None, password=None, use_starttls=True,
+                 timeout=30, max_reconnects=2):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_starttls = use_starttls
+        self.timeout = timeout
+        self.max_reconnects = max_reconnects
+        self.server = None
+        self.connections_opened = 0
+
+    @classmethod
+    def from_config(cls):
+        """Build a session from Config's SMTP settings"""
+        return cls(
+            Config.SMTP_SERVER,
+            Config.SMTP_PORT,
+            Config.SMTP_USERNAME,
+            Config.SMTP_PASSWORD,
+            use_starttls=Config.SMTP_STARTTLS,
+            timeout=Config.SMTP_TIMEOUT
+        )
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def connect(self):
+        """Open, secure and authenticate the session (no-op if already open)"""
+        if self.server is not None:
+            return self.server
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            server.ehlo()
+            if self.use_starttls:
+                server.starttls()
+                server.ehlo()
+            if self.username and self.password:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        self.server = server
+        self.connections_opened += 1
+        return server
+
+    def close(self):
+        """QUIT the session, tolerating a server that already hung up"""
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            self.server.close()
+        self.server = None
+
+    def _reset(self):
+        if self.server is not None:
+            try:
+                self.server.close()
+            except OSError:
+                pass
+        self.server = None
+
+    def _envelope(self, server, from_addr, recipients):
+        """Send MAIL FROM + RCPT TO; returns {recipient: (code, message)}"""
+        if server.has_extn('pipelining'):
+            # One write for the whole envelope, then read the replies in order
+            commands = [f"MAIL FROM:<{from_addr}>"] + [f"RCPT TO:<{r}>" for r in recipients]
+            server.send(''.join(f"{c}\r\n" for c in commands))
+            replies = [server.getreply() for _ in commands]
+            mail_code, mail_message = replies[0]
+            if mail_code != 250:
+                raise smtplib.SMTPSenderRefused(mail_code, mail_message, from_addr)
+            rcpt_replies = replies[1:]
+        else:
+            mail_code, mail_message = server.mail(from_addr)
+            if mail_code != 250:
+                raise smtplib.SMTPSenderRefused(mail_code, mail_message, from_addr)
+            rcpt_replies = [server.rcpt(r) for r in recipients]
+        return {r: (code, message.decode('utf-8', 'replace') if isinstance(message, bytes) else message)
+                for r, (code, message) in zip(recipients, rcpt_replies)}
+
+    def _send_once(self, msg, from_addr, recipients):
+        server = self.connect()
+        outcomes = self._envelope(server, from_addr, recipients)
+        accepted = [r for r, (code, _) in outcomes.items() if code in (250, 251)]
+        if not accepted:
+            server.rset()
+            return outcomes
+        code, message = server.data(message_bytes(msg))
+        if code != 250:
+            # DATA rejected: every accepted recipient failed with the DATA reply
+            outcomes.update({r: (code, message.decode('utf-8', 'replace') if isinstance(message, bytes) else message)
+                             for r in accepted})
+        return outcomes
+
+    def send(self, msg, from_addr, recipients):
+        """Send one message on the shared session, reconnecting if it was dropped.
+
+        Returns a list of {'recipient', 'accepted', 'code', 'message'} dicts.
+        """
+        attempts = 0
+        while True:
+            try:
+                outcomes = self._send_once(msg, from_addr, recipients)
+                break
+            except (smtplib.SMTPException, OSError) as e:
+                if not is_transient_error(e) or attempts >= self.max_reconnects:
+                    raise
+            attempts += 1
+            log.info(f"   🔁 SMTP session dropped; reconnecting ({attempts}/{self.max_reconnects})...")
+            self._reset()
+
+        return [
+            {'recipient': r, 'accepted': code in (250, 251), 'code': code, 'message': message}
+            for r, (code, message) in outcomes.items()
+        ]
+
+    def send_batch(self, messages):
+        """Send (msg, from_addr, recipients) tuples over one session.
+
+        A failure on one message is recorded for its recipients and the batch
+        continues. Returns the flattened per-recipient outcome list.
+        """
+        results = []
+        for msg, from_addr, recipients in messages:
+            try:
+                results.extend(self.send(msg, from_addr, recipients))
+            except (smtplib.SMTPException, OSError) as e:
+                code = getattr(e, 'smtp_code', None)
+                results.extend(
+                    {'recipient': r, 'accepted': False, 'code': code, 'message': str(e)} for r in recipients
+                )
+        return results
+
+
+def summarize_outcomes(results):
+    """Log per-recipient outcomes; returns True if every recipient was accepted"""
+    for result in results:
+        icon = '✅' if result['accepted'] else '❌'
+        detail = '' if result['accepted'] else f" ({result['code']} {result['message']})"
+        (log.info if result['accepted'] else log.warning)(f"      {icon} {result['recipient']}{detail}")
+    return bool(results) and all(r['accepted'] for r in results)
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Synthetic Sprint Dataset
+Generates realistic sprint data at any scale for scale tests and benchmarks:
+
+- raw Azure DevOps payloads (WIQL results and work item batches, in the
+  exact shapes get_engineer_metrics receives)
+- sprint_count_*.json snapshots, summarized by the same code the extractor
+  uses (get_sprint_count.summarize_work_items)
+
+Everything is derived from --seed, so the same arguments always produce the
+same data. azure_devops_standin.py serves its work items from here too.
+
+Usage:
+    python3 synthetic_dataset.py snapshot --projects 10 --engineers 500 --items 50000
+    python3 synthetic_dataset.py snapshot --states "Active=5,Closed=3,QA Testing=2" --title-words 6-30
+    python3 synthetic_dataset.py payloads --projects 2 --items 2000 --out-dir data/synthetic
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import zlib
+from datetime import datetime, timedelta
+
+# Relative weights, using state names that map onto every report category
+DEFAULT_STATES = {
+    'New': 10, 'To Do': 8, 'Active': 14, 'In Progress': 12, 'Code Review': 5, 'Ready for QA': 6,
+    'QA Testing': 6, 'Ready for Release': 4, 'Resolved': 10, 'Closed': 25,
+}
+DEFAULT_TAGS = ['backend', 'frontend', 'bug', 'tech-debt', 'infra', 'security', 'performance', 'customer']
+FIRST_NAMES = ['Aarav', 'Priya', 'Rohan', 'Ananya', 'Vikram', 'Meera', 'Kabir', 'Isha', 'Arjun', 'Diya',
+               'Karan', 'Nisha', 'Rahul', 'Sneha', 'Aditya', 'Pooja', 'Nikhil', 'Tanvi', 'Siddharth', 'Kavya']
+LAST_NAMES = ['Sharma', 'Verma', 'Iyer', 'Gupta', 'Nair', 'Reddy', 'Mehta', 'Kapoor', 'Rao', 'Das',
+              'Joshi', 'Menon', 'Bose', 'Pillai', 'Chopra']
+TITLE_WORDS = ['payment', 'wallet', 'refund', 'settlement', 'webhook', 'retry', 'ledger', 'invoice', 'card',
+               'limit', 'report', 'API', 'timeout', 'migration', 'dashboard', 'alert', 'cache', 'audit',
+               'reconciliation', 'onboarding', 'KYC', 'merchant', 'payout', 'currency', 'validation', 'error']
+TITLE_VERBS = ['Fix', 'Add', 'Implement', 'Investigate', 'Refactor', 'Update', 'Remove', 'Handle', 'Support']
+BATCH_SIZE = 200
+
+
+def parse_weights(text):
+    """"Active=5,Closed=3" → {'Active': 5.0, 'Closed': 3.0}"""
+    weights = {}
+    for part in filter(None, (p.strip() for p in text.split(','))):
+        name, _, weight = part.rpartition('=')
+        if not name:
+            raise ValueError(f"expected NAME=WEIGHT, got {part!r}")
+        weights[name.strip()] = float(weight)
+    if not weights or sum(weights.values()) <= 0:
+        raise ValueError("weights must contain at least one positive entry")
+    return weights
+
+
+def parse_range(text):
+    """"4-12" → (4, 12); "8" → (8, 8)"""
+    low, _, high = text.partition('-')
+    low, high = int(low), int(high or low)
+    if low < 1 or high < low:
+        raise ValueError(f"invalid range {text!r}")
+    return low, high
+
+
+def engineer_names(count, offset=0):
+    """count distinct, realistic display names (numbered once the combinations run out)"""
+    combinations = len(FIRST_NAMES) * len(LAST_NAMES)
+    names = []
+    for index in range(offset, offset + count):
+        first = FIRST_NAMES[index % len(FIRST_NAMES)]
+        last = LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]
+        round_number = index // combinations
+        names.append(f"{first} {last}" + (f" {round_number + 1}" if round_number else ''))
+    return names
+
+
+def _title(rng, title_words):
+    words = [rng.choice(TITLE_WORDS) for _ in range(rng.randint(*title_words) - 1)]
+    return ' '.join([rng.choice(TITLE_VERBS)] + words)
+
+
+def generate_work_items(rng, project, count, engineers, states=None, title_words=(4, 12), tags=None,
+                        tag_rate=0.4, unassigned_rate=0.05, start_id=1, iteration_path=None,
+                        changed_between=None):
+    """count raw work items ({'id', 'rev', 'fields'}) as returned by the workitems API.
+
+    engineers: display names to assign from; workload is skewed so a few
+    people carry more items, as in real teams.
+    iteration_path: a path, or a callable rng → path.
+    changed_between: (start datetime, end datetime) for System.ChangedDate.
+    """
+    states = states or DEFAULT_STATES
+    tags = DEFAULT_TAGS if tags is None else tags
+    state_names, state_weights = list(states), list(states.values())
+    workload = [1 / (rank + 1) ** 0.5 for rank in range(len(engineers))]
+    changed_start, changed_end = changed_between or (datetime.now() - timedelta(days=14), datetime.now())
+    window = max(1, int((changed_end - changed_start).total_seconds()))
+
+    items = []
+    for item_id in range(start_id, start_id + count):
+        fields = {
+            'System.Id': item_id,
+            'System.TeamProject': project,
+            'System.IterationPath': iteration_path(rng) if callable(iteration_path) else (iteration_path or project),
+            'System.State': rng.choices(state_names, state_weights)[0],
+            'System.Title': _title(rng, title_words),
+            'System.Tags': '; '.join(sorted(rng.sample(tags, rng.randint(1, min(3, len(tags))))))
+                           if tags and rng.random() < tag_rate else '',
+            'System.ChangedDate': (changed_start + timedelta(seconds=rng.randrange(window))).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        }
+        if engineers and rng.random() >= unassigned_rate:
+            name = rng.choices(engineers, workload)[0]
+            fields['System.AssignedTo'] = {'displayName': name,
+                                           'uniqueName': f"{name.lower().replace(' ', '.')}@example.com"}
+        items.append({'id': item_id, 'rev': 1, 'fields': fields})
+    return items
+
+
+def wiql_payload(work_items):
+    """WIQL response body listing work_items"""
+    return {'queryType': 'flat', 'asOf': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'workItems': [{'id': item['id'], 'url': f"/_apis/wit/workItems/{item['id']}"} for item in work_items]}
+
+
+def workitems_payloads(work_items, batch_size=BATCH_SIZE):
+    """workitems response bodies, one per batch of batch_size ids"""
+    return [{'count': len(batch), 'value': batch}
+            for batch in (work_items[i:i + batch_size] for i in range(0, len(work_items), batch_size))]
+
+
+def _split(total, parts):
+    return [total // parts + (1 if index < total % parts else 0) for index in range(parts)]
+
+
+def generate_projects(projects=2, engineers=20, items=400, orgs=1, seed=0, sprint_start=None,
+                      duration_days=14, **item_options):
+    """Synthetic projects: [{'org_name', 'project_name', 'sprint_period', 'work_items'}].
+
+    Engineers and items are split evenly across projects; org names contain
+    no '_' so snapshot keys split like real ones.
+    """
+    sprint_start = sprint_start or datetime.combine(datetime.now().date() - timedelta(days=duration_days // 2),
+                                                    datetime.min.time())
+    sprint_end = sprint_start + timedelta(days=duration_days - 1)
+    engineer_counts = _split(engineers, projects)
+    item_counts = _split(items, projects)
+    generated = []
+    next_id = 1000
+    for index in range(projects):
+        org_name = f"SynOrg{index % orgs + 1}"
+        project_name = f"Project_{index + 1:03d}"
+        rng = random.Random(zlib.crc32(f"{seed}/{org_name}/{project_name}".encode()))
+        iteration_name = f"Sprint {40 + index % 7}"
+        team = engineer_names(engineer_counts[index], offset=sum(engineer_counts[:index]))
+        work_items = generate_work_items(rng, project_name, item_counts[index], team, start_id=next_id,
+                                         iteration_path=f"{project_name}\\{iteration_name}",
+                                         changed_between=(sprint_start, min(datetime.now(), sprint_end + timedelta(days=1))),
+                                         **item_options)
+        next_id += item_counts[index]
+        generated.append({
+            'org_name': org_name,
+            'project_name': project_name,
+            'sprint_period': {
+                'start_date': sprint_start.strftime('%d-%b-%Y'),
+                'end_date': sprint_end.strftime('%d-%b-%Y'),
+                'iteration_name': iteration_name,
+                'iteration_path': f"{project_name}\\{iteration_name}",
+            },
+            'work_items': work_items,
+        })
+    return generated
+
+
+def build_snapshot(generated):
+    """sprint_count_*.json contents for generated projects"""
+    from get_sprint_count import summarize_work_items
+    snapshot = {}
+    for project in generated:
+        result = summarize_work_items(project['work_items'])
+        result['sprint_period'] = project['sprint_period']
+        snapshot[f"{project['org_name']}_{project['project_name']}"] = result
+    return snapshot
+
+
+def write_json(path, data, indent=None):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+    return path
+
+
+def write_payloads(generated, out_dir):
+    """<out_dir>/<org>_<project>/wiql.json + workitems_NNN.json; returns files written"""
+    written = 0
+    for project in generated:
+        project_dir = os.path.join(out_dir, f"{project['org_name']}_{project['project_name']}")
+        write_json(os.path.join(project_dir, 'wiql.json'), wiql_payload(project['work_items']))
+        for number, payload in enumerate(workitems_payloads(project['work_items']), start=1):
+            write_json(os.path.join(project_dir, f"workitems_{number:03d}.json"), payload)
+        written += 1 + (len(project['work_items']) + BATCH_SIZE - 1) // BATCH_SIZE
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic sprint snapshots and Azure DevOps payloads')
+    parser.add_argument('command', choices=['snapshot', 'payloads'])
+    parser.add_argument('--projects', type=int, default=2)
+    parser.add_argument('--orgs', type=int, default=1, help='organizations the projects are spread over')
+    parser.add_argument('--engineers', type=int, default=20, help='engineers in total, split across projects')
+    parser.add_argument('--items', type=int, default=400, help='work items in total, split across projects')
+    parser.add_argument('--states', default=None, help='state weights, e.g. "Active=5,Closed=3" (default: realistic mix)')
+    parser.add_argument('--title-words', default='4-12', help='title length range in words (default: 4-12)')
+    parser.add_argument('--tags', default=None, help='comma-separated tag vocabulary ("" for no tags)')
+    parser.add_argument('--tag-rate', type=float, default=0.4, help='fraction of items carrying tags')
+    parser.add_argument('--unassigned-rate', type=float, default=0.05, help='fraction of items without assignee')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=None, help='snapshot path (default: <out-dir>/sprint_count_<stamp>.json)')
+    parser.add_argument('--out-dir', default=os.path.join('data', 'synthetic'),
+                        help='output directory (default: data/synthetic, away from real snapshots)')
+    args = parser.parse_args()
+
+    if args.projects < 1 or args.orgs < 1 or args.items < 0 or args.engineers < 0:
+        parser.error('--projects and --orgs must be at least 1; --items and --engineers not negative')
+    try:
+        item_options = {
+            'states': parse_weights(args.states) if args.states else None,
+            'title_words': parse_range(args.title_words),
+            'tags': [t.strip() for t in args.tags.split(',') if t.strip()] if args.tags is not None else None,
+            'tag_rate': args.tag_rate,
+            'unassigned_rate': args.unassigned_rate,
+        }
+    except ValueError as e:
+        parser.error(str(e))
+
+    generated = generate_projects(args.projects, args.engineers, args.items, args.orgs, args.seed, **item_options)
+    if args.command == 'payloads':
+        written = write_payloads(generated, args.out_dir)
+        print(f"🧪 Wrote {written} payload files for {args.projects} projects to {args.out_dir}")
+        return True
+
+    snapshot = build_snapshot(generated)
+    # Kept out of data/ so the report and email steps never pick it up as the latest snapshot
+    out = args.out or os.path.join(args.out_dir, f"sprint_count_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    write_json(out, snapshot, indent=2)
+    engineers = sum(len(result['engineer_metrics']) for result in snapshot.values())
+    print(f"🧪 Synthetic snapshot: {out} ({len(snapshot)} projects, {engineers} engineers, "
+          f"{sum(r['total_items'] for r in snapshot.values())} items)")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
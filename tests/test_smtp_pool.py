@@ -0,0 +1,118 @@
+"""
+SMTPSessionPool against a local aiosmtpd stand-in: pipelined envelopes,
+per-recipient outcomes and a transparent reconnect after a dropped session.
+"""
+
+import socket
+from email.mime.text import MIMEText
+
+import pytest
+
+pytest.importorskip('aiosmtpd')
+from aiosmtpd.controller import Controller
+
+from smtp_pool import SMTPSessionPool
+
+SENDER = 'reports@example.com'
+
+
+class StandInHandler:
+    """Advertises PIPELINING, refuses *@refused.example and can drop the session after a message"""
+
+    def __init__(self):
+        self.messages = []
+        self.drop_after_next = False
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        session.host_name = hostname
+        return responses[:-1] + ['250-PIPELINING', responses[-1]]
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.endswith('@refused.example'):
+            return '550 5.1.1 No such user'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((envelope.mail_from, list(envelope.rcpt_tos)))
+        if self.drop_after_next:
+            self.drop_after_next = False
+            # Hang up right after acknowledging, like a server closing an idle session
+            server.loop.call_soon(server.transport.close)
+        return '250 Message accepted'
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_standin():
+    handler = StandInHandler()
+    controller = Controller(handler, hostname='127.0.0.1', port=_free_port())
+    controller.start()
+    try:
+        yield handler, controller
+    finally:
+        controller.stop()
+
+
+def _message(subject, recipients):
+    msg = MIMEText(f"<p>{subject}</p>", 'html')
+    msg['Subject'] = subject
+    msg['From'] = SENDER
+    msg['To'] = ', '.join(recipients)
+    return msg
+
+
+def _pool(controller):
+    return SMTPSessionPool(controller.hostname, controller.port, use_starttls=False, timeout=5)
+
+
+def test_batch_reports_outcome_per_recipient(smtp_standin):
+    handler, controller = smtp_standin
+    first = ['a@example.com', 'nobody@refused.example']
+    second = ['b@example.com', 'c@example.com']
+
+    with _pool(controller) as pool:
+        results = pool.send_batch([
+            (_message('first', first), SENDER, first),
+            (_message('second', second), SENDER, second),
+        ])
+
+    assert [(r['recipient'], r['accepted'], r['code']) for r in results] == [
+        ('a@example.com', True, 250),
+        ('nobody@refused.example', False, 550),
+        ('b@example.com', True, 250),
+        ('c@example.com', True, 250),
+    ]
+    assert handler.messages == [(SENDER, ['a@example.com']), (SENDER, second)]
+    assert pool.connections_opened == 1
+
+
+def test_dropped_session_reconnects_and_resends(smtp_standin):
+    handler, controller = smtp_standin
+    handler.drop_after_next = True
+
+    with _pool(controller) as pool:
+        first = pool.send(_message('first', ['a@example.com']), SENDER, ['a@example.com'])
+        second = pool.send(_message('second', ['b@example.com', 'x@refused.example']), SENDER,
+                           ['b@example.com', 'x@refused.example'])
+
+    assert [r['accepted'] for r in first] == [True]
+    assert [(r['recipient'], r['accepted']) for r in second] == [('b@example.com', True), ('x@refused.example', False)]
+    assert handler.messages == [(SENDER, ['a@example.com']), (SENDER, ['b@example.com'])]
+    assert pool.connections_opened == 2
+
+
+def test_all_recipients_refused_skips_data(smtp_standin):
+    handler, controller = smtp_standin
+    recipients = ['x@refused.example', 'y@refused.example']
+
+    with _pool(controller) as pool:
+        results = pool.send(_message('nobody', recipients), SENDER, recipients)
+
+    assert [(r['accepted'], r['code']) for r in results] == [(False, 550), (False, 550)]
+    assert handler.messages == []
@@ -0,0 +1,97 @@
+"""
+Trend History
+Small per-run aggregate records written at extraction time. The history file
+keeps a bounded rolling window, so trend reports read one small file no
+matter how many sprint_count_*.json snapshots have piled up in data/.
+"""
+
+import json
+import os
+from datetime import datetime
+from config import Config, load_environment
+from report_log import get_logger
+
+log = get_logger(__name__)
+
+HISTORY_FILE = os.path.join('data', 'trend_history.json')
+DEFAULT_MAX_RUNS = 120
+
+
+def build_run_aggregate(all_results, run_at=None):
+    """Reduce one extraction's results to the counts trend reports need"""
+    run_at = run_at or datetime.now()
+    projects = {}
+    for project_key, result in all_results.items():
+        if result.get('partial'):
+            # Incomplete counts would show up as a false drop in the trend
+            continue
+        status_counts = {}
+        engineers = {}
+        for engineer, metrics in result.get('engineer_metrics', {}).items():
+            done = 0
+            for state, count in metrics.get('states', {}).items():
+                category = Config.get_state_category(state)
+                status_counts[category] = status_counts.get(category, 0) + count
+                if category == 'Done':
+                    done += count
+            engineers[engineer] = {'total': metrics.get('total_items', 0), 'done': done}
+
+        total = result.get('total_items', 0)
+        done = status_counts.get('Done', 0)
+        sprint_period = result.get('sprint_period') or {}
+        projects[project_key] = {
+            'iteration': sprint_period.get('iteration_name') or f"{sprint_period.get('start_date', '')}..{sprint_period.get('end_date', '')}",
+            'total': total,
+            'done': done,
+            'completion_percentage': round(done / total * 100) if total else 0,
+            'status_counts': status_counts,
+            'engineers': engineers
+        }
+
+    return {'run_at': run_at.isoformat(timespec='seconds'), 'projects': projects}
+
+
+def load_history(history_file=HISTORY_FILE):
+    """Load the rolling list of run aggregates (oldest first)"""
+    try:
+        with open(history_file, 'r', encoding='utf-8') as f:
+            return json.load(f).get('runs', [])
+    except (OSError, ValueError):
+        return []
+
+
+def save_history(runs, history_file=HISTORY_FILE, max_runs=None):
+    """Persist runs, trimmed to the most recent max_runs"""
+    load_environment()
+    max_runs = max_runs or int(os.getenv('TREND_HISTORY_MAX_RUNS', str(DEFAULT_MAX_RUNS)))
+    runs = sorted(runs, key=lambda r: r['run_at'])[-max_runs:]
+    os.makedirs(os.path.dirname(history_file) or '.', exist_ok=True)
+    tmp_file = history_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({'runs': runs}, f, ensure_ascii=False)
+    os.replace(tmp_file, history_file)
+    return runs
+
+
+def record_run_aggregate(all_results, run_at=None, history_file=HISTORY_FILE):
+    """Append this run's aggregate to the rolling history; returns the record"""
+    record = build_run_aggregate(all_results, run_at)
+    runs = [r for r in load_history(history_file) if r['run_at'] != record['run_at']]
+    runs.append(record)
+    save_history(runs, history_file)
+    return record
+
+
+def rebuild_history_from_snapshots(data_dir='data', history_file=HISTORY_FILE):
+    """One-off backfill: rebuild the history from existing sprint_count_*.json files"""
+    runs = []
+    for name in sorted(os.listdir(data_dir)):
+        if not (name.startswith('sprint_count_') and name.endswith('.json')):
+            continue
+        try:
+            run_at = datetime.strptime(name[len('sprint_count_'):-len('.json')], '%Y%m%d_%H%M%S')
+            with open(os.path.join(data_dir, name), 'r', encoding='utf-8') as f:
+                runs.append(build_run_aggregate(json.load(f), run_at))
+        except (OSError, ValueError) as e:
+            log.warning(f"   ⚠️ Skipping {name}: {e}")
+    return save_history(runs, history_file)
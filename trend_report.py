@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Multi-Sprint Trend Report
+Burn-up, completion percentage and per-engineer throughput over the last N
+runs or sprints, rendered from the rolling aggregates in data/trend_history.json.
+
+Usage:
+    python3 trend_report.py                  # last 10 runs
+    python3 trend_report.py --by sprint      # last 10 sprints (final run of each)
+    python3 trend_report.py --last 20
+    python3 trend_report.py --rebuild        # backfill history from data/sprint_count_*.json
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from report_model import find_project_config, split_project_key
+from trend_history import HISTORY_FILE, load_history, rebuild_history_from_snapshots
+
+
+def select_trend_series(runs, last_n=10, by='run'):
+    """Build per-project series of trend points from run aggregates (oldest first).
+
+    by='run' keeps every run; by='sprint' keeps the final run of each iteration.
+    Each point carries scope, done, completion and per-engineer throughput
+    (items completed since the previous point in the same iteration).
+    """
+    series = {}
+    for run in runs:
+        for project_key, project in run['projects'].items():
+            point = dict(project, run_at=run['run_at'])
+            points = series.setdefault(project_key, [])
+            if by == 'sprint' and points and points[-1]['iteration'] == point['iteration']:
+                points[-1] = point
+            else:
+                points.append(point)
+
+    for project_key, points in series.items():
+        # Throughput needs each point's predecessor, so trim only afterwards
+        previous = None
+        for point in points:
+            same_sprint = previous is not None and previous['iteration'] == point['iteration']
+            point['label'] = point['iteration'] if by == 'sprint' else datetime.fromisoformat(point['run_at']).strftime('%d-%b %H:%M')
+            point['throughput'] = {
+                engineer: max(0, counts['done'] - (previous['engineers'].get(engineer, {}).get('done', 0) if same_sprint else 0))
+                for engineer, counts in point['engineers'].items()
+            }
+            previous = point
+        series[project_key] = points[-last_n:]
+    return series
+
+
+def _bar(percentage, color):
+    width = max(0, min(100, percentage))
+    return (f'<div style="background: #e9ecef; border-radius: 4px; width: 100%; height: 8px;">'
+            f'<div style="background: {color}; border-radius: 4px; width: {width}%; height: 8px;"></div></div>')
+
+
+def render_trend_html(series, by='run'):
+    """Email-friendly HTML trend report"""
+    generated_at = datetime.now()
+    cell = 'padding: 6px 8px; border-bottom: 1px solid #e9ecef; text-align: center; font-size: 13px;'
+    head_cell = 'padding: 6px 8px; border-bottom: 2px solid #0078d4; text-align: center; font-size: 12px; color: #0078d4; font-weight: 600;'
+    label_cell = 'padding: 6px 8px; border-bottom: 1px solid #e9ecef; text-align: left; font-size: 13px; font-weight: 600; color: #333;'
+
+    html_content = f"""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Sprint Trend Report - {generated_at.strftime('%B %d, %Y')}</title>
+</head>
+<body style="font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f5f5f5; color: #333;">
+    <table style="width: 100%; max-width: 900px; margin: 0 auto; background: white; border-collapse: collapse;">
+        <tr>
+            <td style="background: #0078d4; color: white; padding: 20px; text-align: center;">
+                <h1 style="margin: 0; font-size: 24px; font-weight: 600;">Sprint Trend Report - Last {max((len(p) for p in series.values()), default=0)} {'Sprints' if by == 'sprint' else 'Runs'}</h1>
+                <p style="margin: 5px 0 0 0; font-size: 14px;">Generated on {generated_at.strftime('%B %d, %Y at %I:%M %p')}</p>
+            </td>
+        </tr>
+"""
+    for project_key, points in series.items():
+        org_name, project_id = split_project_key(project_key)
+        project_config = find_project_config(org_name, project_id)
+        display_name = project_config['project_name'] if project_config else project_id
+
+        header = ''.join(f'<th style="{head_cell}">{p["label"]}</th>' for p in points)
+        scope = ''.join(f'<td style="{cell}">{p["total"]}</td>' for p in points)
+        done = ''.join(f'<td style="{cell} color: #155724; font-weight: 600;">{p["done"]}</td>' for p in points)
+        completion = ''.join(
+            f'<td style="{cell}">{p["completion_percentage"]}%{_bar(p["completion_percentage"], "#28a745")}</td>' for p in points
+        )
+
+        engineers = sorted({e for p in points for e in p['engineers']})
+        engineer_rows = ''.join(
+            f'<tr><td style="{label_cell} font-weight: 400;">{engineer}</td>'
+            + ''.join(f'<td style="{cell}">{p["throughput"].get(engineer, 0) if engineer in p["engineers"] else "–"}</td>' for p in points)
+            + '</tr>'
+            for engineer in engineers
+        )
+
+        html_content += f"""
+        <!-- Trend Section: {display_name} -->
+        <tr>
+            <td style="padding: 20px; border-top: 2px solid #e9ecef;">
+                <h2 style="margin: 0 0 10px 0; color: #0078d4; font-size: 22px; font-weight: 600;">{display_name}</h2>
+                <table style="width: 100%; border-collapse: collapse; margin-bottom: 15px;">
+                    <tr><th style="{head_cell} text-align: left;">Burn-up</th>{header}</tr>
+                    <tr><td style="{label_cell}">Scope</td>{scope}</tr>
+                    <tr><td style="{label_cell}">Done</td>{done}</tr>
+                    <tr><td style="{label_cell}">Completion</td>{completion}</tr>
+                </table>
+                <table style="width: 100%; border-collapse: collapse;">
+                    <tr><th style="{head_cell} text-align: left;">Throughput (items completed)</th>{header}</tr>
+                    {engineer_rows}
+                </table>
+            </td>
+        </tr>
+"""
+
+    html_content += """
+        <tr>
+            <td style="background: #f8f9fa; padding: 20px; text-align: center; color: #333; font-size: 14px; font-weight: 500;">
+                Generated by <span style="color: #0078d4; font-weight: 600;">Azure DevOps AI Agent</span>
+            </td>
+        </tr>
+    </table>
+</body>
+</html>"""
+    return html_content
+
+
+def generate_trend_report(last_n=10, by='run', history_file=HISTORY_FILE):
+    """Render the trend report HTML, or None if there is no history yet"""
+    runs = load_history(history_file)
+    if not runs:
+        print(f"❌ No trend history found in {history_file}. Run get_sprint_count.py (or --rebuild) first.")
+        return None
+    series = select_trend_series(runs, last_n, by)
+    print(f"✅ Loaded {len(runs)} run aggregates for {len(series)} projects")
+    return render_trend_html(series, by)
+
+
+def main():
+    """Main function to generate the trend report"""
+    parser = argparse.ArgumentParser(description='Generate a multi-sprint trend report')
+    parser.add_argument('--last', type=int, default=10, help='number of runs/sprints to include')
+    parser.add_argument('--by', choices=['run', 'sprint'], default='run', help='one point per run or per sprint')
+    parser.add_argument('--rebuild', action='store_true', help='backfill history from data/sprint_count_*.json first')
+    args = parser.parse_args()
+
+    print("📈 Sprint Trend Report Generator")
+    print("=" * 40)
+
+    if args.rebuild:
+        runs = rebuild_history_from_snapshots()
+        print(f"🔄 Rebuilt trend history from {len(runs)} snapshots")
+
+    html_content = generate_trend_report(args.last, args.by)
+    if not html_content:
+        return False
+
+    output_file = f"trend_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    print(f"✅ Trend report generated: {output_file}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,84 @@
+"""
+Work Item Store
+In-memory cache of fetched work item details, per organization/project.
+A long-running process (report_daemon.py) enables it so repeat runs only
+refetch the items Azure DevOps reports as changed since the last sync.
+One-shot scripts leave it disabled and always fetch everything.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+# ChangedDate and our clock can disagree slightly; resync a little earlier
+SYNC_SKEW = timedelta(minutes=2)
+
+_store = None
+
+
+class WorkItemStore:
+    """Work item payloads by (organization, project) and id, plus last sync time"""
+
+    def __init__(self):
+        self.projects = {}
+
+    def _project(self, organization, project):
+        return self.projects.setdefault((organization, project), {'synced_at': None, 'items': {}})
+
+    def synced_at(self, organization, project):
+        """UTC datetime the project was last synced, or None if never"""
+        return self._project(organization, project)['synced_at']
+
+    def ids_to_fetch(self, organization, project, work_item_ids, changed_ids):
+        """Ids missing from the store or changed since the last sync.
+
+        changed_ids=None means the changes are unknown, so everything is refetched.
+        """
+        items = self._project(organization, project)['items']
+        if changed_ids is None:
+            return list(work_item_ids)
+        return [i for i in work_item_ids if i not in items or i in changed_ids]
+
+    def update(self, organization, project, work_items, sync_started_at):
+        """Store freshly fetched items and move the sync watermark.
+
+        sync_started_at=None (some fetches failed) clears the watermark so the
+        next sync refetches everything.
+        """
+        state = self._project(organization, project)
+        for work_item in work_items:
+            state['items'][work_item['id']] = work_item
+        state['synced_at'] = sync_started_at - SYNC_SKEW if sync_started_at else None
+
+    def get_many(self, organization, project, work_item_ids):
+        """Stored payloads for work_item_ids (ids never fetched are skipped)"""
+        items = self._project(organization, project)['items']
+        return [items[i] for i in work_item_ids if i in items]
+
+    def retain(self, organization, project, work_item_ids):
+        """Drop stored items that are no longer in the project's current id set"""
+        items = self._project(organization, project)['items']
+        keep = set(work_item_ids)
+        for work_item_id in [i for i in items if i not in keep]:
+            del items[work_item_id]
+
+    def stats(self):
+        return {
+            'projects': len(self.projects),
+            'items': sum(len(state['items']) for state in self.projects.values())
+        }
+
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+
+def enable_work_item_store():
+    """Turn on the process-wide store (idempotent); returns it"""
+    global _store
+    if _store is None:
+        _store = WorkItemStore()
+    return _store
+
+
+def get_work_item_store():
+    """The process-wide store, or None when it has not been enabled"""
+    return _store